@@ -0,0 +1,167 @@
+"""Load-test the API against the offline Riot stand-in (mock_riot.py).
+
+    python benchmark.py                                  # in-process app, mock Riot API
+    python benchmark.py --concurrency 1,10,50 --requests 300 --cold
+    python benchmark.py --url http://localhost:8000      # a running server (start it with RIOT_MOCK=true)
+
+Reports throughput and p50/p95/p99 latency for /api/match-stats,
+/api/last-5-matches and /api/compare-players at each concurrency level.
+Mock latency, 429 injection and rate limits come from the RIOT_MOCK_*
+environment variables.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from typing import Dict, List, Optional
+import numpy as np
+import httpx
+
+# In-process runs always use the mock, a throwaway match store and no cache snapshot from earlier runs
+os.environ.setdefault("RIOT_MOCK", "true")
+os.environ.setdefault("MATCH_STORE_PATH", os.path.join(tempfile.mkdtemp(prefix="lol-bench-"), "match_store.sqlite3"))
+os.environ.setdefault("CACHE_SNAPSHOT_PATH", "")
+
+from mock_riot import mock_riot_id, RIOT_MOCK_PLAYERS
+
+ENDPOINTS = {
+    "match-stats": ("/api/match-stats", 2),
+    "last-5-matches": ("/api/last-5-matches", 1),
+    "compare-players": ("/api/compare-players", 5),
+}
+
+
+def request_body(rng: random.Random, players: int, per_request: int) -> dict:
+    picked = rng.sample(range(players), per_request)
+    return {"players": [
+        {"game_name": game_name, "tag_line": tag_line}
+        for game_name, tag_line in (mock_riot_id(i) for i in picked)
+    ]}
+
+
+async def run_round(client: httpx.AsyncClient, endpoint: str, concurrency: int, requests: int,
+                    players: int, seed: int) -> dict:
+    """Send `requests` POSTs to one endpoint from `concurrency` workers"""
+    path, per_request = ENDPOINTS[endpoint]
+    rng = random.Random(seed)
+    bodies = [request_body(rng, players, per_request) for _ in range(requests)]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    next_body = iter(bodies)
+
+    async def worker():
+        for body in next_body:
+            started = time.perf_counter()
+            try:
+                response = await client.post(path, json=body)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {
+        "endpoint": endpoint,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": requests - statuses.get(200, 0),
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "throughput": round(requests / elapsed, 1),
+        "p50Ms": round(float(p50), 1),
+        "p95Ms": round(float(p95), 1),
+        "p99Ms": round(float(p99), 1),
+    }
+
+
+def reset_app_state(main):
+    """Forget everything the app has cached so the next round starts cold"""
+    from cache import TTLCache
+    from match_store import MatchStore
+    from player_stats import PlayerStatsStore
+    from startup import Lazy
+    for value in vars(main).values():
+        if isinstance(value, TTLCache):
+            value.entries.clear()
+    path = os.path.join(tempfile.mkdtemp(prefix="lol-bench-"), "match_store.sqlite3")
+    main.app.state.match_store.close()
+    main.app.state.match_store = MatchStore(path)
+    main.app.state.player_stats.close()
+    main.app.state.player_stats = Lazy(lambda: PlayerStatsStore(path))
+
+
+async def benchmark(args) -> List[dict]:
+    endpoints = args.endpoints.split(",")
+    levels = [int(c) for c in args.concurrency.split(",")]
+    results = []
+
+    async def rounds(client: httpx.AsyncClient, main=None):
+        for endpoint in endpoints:
+            for concurrency in levels:
+                if main is not None and args.cold:
+                    reset_app_state(main)
+                upstream_before = main.app.state.riot.transport.requests if main is not None else None
+                result = await run_round(client, endpoint, concurrency, args.requests, args.players, args.seed)
+                if main is not None:
+                    result["upstreamCalls"] = main.app.state.riot.transport.requests - upstream_before
+                results.append(result)
+                print_result(result)
+
+    print_header()
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            await rounds(client)
+    else:
+        import main
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+                await rounds(client, main)
+    return results
+
+
+def print_header():
+    print(f"{'endpoint':<16} {'conc':>5} {'reqs':>6} {'errors':>6} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'upstream':>9}")
+
+
+def print_result(result: dict):
+    upstream = result.get("upstreamCalls")
+    print(f"{result['endpoint']:<16} {result['concurrency']:>5} {result['requests']:>6} {result['errors']:>6} "
+          f"{result['throughput']:>8} {result['p50Ms']:>8} {result['p95Ms']:>8} {result['p99Ms']:>8} "
+          f"{upstream if upstream is not None else '-':>9}")
+
+
+def main_cli(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="benchmark a running server instead of the in-process app")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset of %(default)s")
+    parser.add_argument("--concurrency", default="1,10,50", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint and concurrency level")
+    parser.add_argument("--players", type=int, default=min(50, RIOT_MOCK_PLAYERS),
+                        help="distinct mock players to draw from (fewer = warmer caches)")
+    parser.add_argument("--cold", action="store_true", help="clear caches and the match store before every round")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--json", dest="json_path", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(benchmark(args))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+    if any(r["errors"] for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
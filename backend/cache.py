@@ -0,0 +1,202 @@
+import os
+import time
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Hashable, List, Tuple
+from rate_limiter import priority_lane, SharedLane, BACKGROUND
+
+# Cache TTLs in seconds (override via environment)
+PUUID_CACHE_TTL = float(os.getenv("PUUID_CACHE_TTL", str(7 * 86400)))
+RANK_CACHE_TTL = float(os.getenv("RANK_CACHE_TTL", "120"))
+RANK_CACHE_STALE_TTL = float(os.getenv("RANK_CACHE_STALE_TTL", "600"))
+MATCH_CACHE_TTL = float(os.getenv("MATCH_CACHE_TTL", "600"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "500"))
+MATCH_IDS_CACHE_TTL = float(os.getenv("MATCH_IDS_CACHE_TTL", "60"))
+MATCH_IDS_CACHE_STALE_TTL = float(os.getenv("MATCH_IDS_CACHE_STALE_TTL", "300"))
+# Whole responses per player set (0 disables); a new game for any player always bypasses it
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "500"))
+# How long a player's newest match ID (the ids?count=1 probe) is trusted
+LATEST_MATCH_CACHE_TTL = float(os.getenv("LATEST_MATCH_CACHE_TTL", "15"))
+
+
+class TTLCache:
+    """In-process LRU cache with a per-tier TTL and single-flight loading.
+
+    Concurrent misses for the same key share one loader call, which runs in
+    the most urgent lane of the callers waiting on it. With a
+    stale_ttl, expired entries are still served for that long while a
+    background refresh runs (stale-while-revalidate). With a shared tier
+    (see shared_state.SharedCache), misses first look for a value another
+    worker process loaded, and loaded values are written through to it.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = CACHE_MAX_ENTRIES, stale_ttl: float = 0,
+                 shared=None):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        self.entries = OrderedDict()  # key -> (value, expires_at)
+        self.inflight = {}  # key -> asyncio.Task
+        self.lanes = {}  # key -> SharedLane of the in-flight load
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.shared_hits = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        """Return the cached value for key, calling loader at most once on a miss"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            now = time.monotonic()
+            if now < expires_at:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return value
+            if now < expires_at + self.stale_ttl:
+                self.stale_hits += 1
+                self.entries.move_to_end(key)
+                if key not in self.inflight:
+                    self._start_load(key, loader, refresh=True).add_done_callback(_consume_exception)
+                return value
+
+        self.misses += 1
+        task = self.inflight.get(key)
+        if task is None:
+            task = self._start_load(key, loader)
+        else:
+            self.coalesced += 1
+            self.lanes[key].join(priority_lane.get())
+        # Shield so one cancelled caller doesn't cancel the load for the others
+        return await asyncio.shield(task)
+
+    async def refresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        """Reload key now regardless of freshness (still sharing any in-flight load)"""
+        task = self.inflight.get(key)
+        if task is None:
+            task = self._start_load(key, loader, use_shared=False)
+        else:
+            self.lanes[key].join(priority_lane.get())
+        return await asyncio.shield(task)
+
+    def _start_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], refresh: bool = False,
+                    use_shared: bool = True) -> asyncio.Task:
+        # Nobody is waiting on a revalidation - let user requests go first, unless one joins it
+        lane = SharedLane(BACKGROUND if refresh else priority_lane.get())
+
+        async def run():
+            priority_lane.set(lane)
+            try:
+                if self.shared and use_shared:
+                    found = await asyncio.to_thread(self.shared.get, self.name, key)
+                    # A revalidation only takes a fresh value (another worker's refresh) - the stale
+                    # one in the shared tier is usually this worker's own
+                    max_age = self.ttl if refresh else self.ttl + self.stale_ttl
+                    if found is not None and found[1] < max_age:
+                        value, age = found
+                        self.shared_hits += 1
+                        # Keep the other worker's load time, so stale values still get revalidated
+                        self._store(key, value, time.monotonic() + self.ttl - age)
+                        return value
+                value = await loader()
+                self.set(key, value)
+                if self.shared:
+                    await asyncio.to_thread(self.shared.put, self.name, key, value, self.ttl + self.stale_ttl)
+                return value
+            finally:
+                self.inflight.pop(key, None)
+                self.lanes.pop(key, None)
+
+        task = asyncio.ensure_future(run())
+        self.inflight[key] = task
+        self.lanes[key] = lane
+        return task
+
+    def peek(self, key: Hashable):
+        """The cached value if still fresh, else None - no loading, no stats"""
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() >= entry[1]:
+            return None
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any):
+        self._store(key, value, time.monotonic() + self.ttl)
+
+    def _store(self, key: Hashable, value: Any, expires_at: float):
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def snapshot(self) -> List[Tuple[Hashable, Any, float]]:
+        """(key, value, age in seconds) of every entry that could still be served, least recent first"""
+        now = time.monotonic()
+        return [
+            (key, value, now - expires_at + self.ttl)
+            for key, (value, expires_at) in self.entries.items()
+            if now < expires_at + self.stale_ttl
+        ]
+
+    def restore(self, items: List[Tuple[Hashable, Any, float]]) -> int:
+        """Load entries from snapshot() (e.g. a previous process's), keeping their age.
+
+        Entries past ttl + stale_ttl are skipped and loaded keys are never
+        overwritten. Returns how many entries were restored.
+        """
+        now = time.monotonic()
+        restored = 0
+        for key, value, age in items:
+            if age < self.ttl + self.stale_ttl and key not in self.entries:
+                self._store(key, value, now + self.ttl - age)
+                restored += 1
+        return restored
+
+    def invalidate(self, key: Hashable):
+        self.entries.pop(key, None)
+        if self.shared:
+            self.shared.delete(self.name, key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "staleHits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "sharedHits": self.shared_hits,
+            "hitRate": round((self.hits + self.stale_hits) / lookups * 100, 1) if lookups > 0 else 0,
+        }
+
+
+def _consume_exception(task: asyncio.Task):
+    # Background refresh failures keep serving the stale value; mark them retrieved
+    if not task.cancelled():
+        task.exception()
+
+
+class KeyedLocks:
+    """One asyncio.Lock per key, dropped again once nobody holds or waits on it"""
+
+    def __init__(self):
+        self.locks = {}
+        self.users = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable):
+        lock = self.locks.setdefault(key, asyncio.Lock())
+        self.users[key] = self.users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self.users[key] -= 1
+            if not self.users[key]:
+                del self.users[key]
+                del self.locks[key]
@@ -0,0 +1,74 @@
+import os
+import time
+
+# Per-host circuit breaker (override via environment)
+RIOT_BREAKER_THRESHOLD = int(os.getenv("RIOT_BREAKER_THRESHOLD", "5"))
+RIOT_BREAKER_COOLDOWN = float(os.getenv("RIOT_BREAKER_COOLDOWN", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class RiotUnavailable(Exception):
+    """Raised instead of calling a Riot host whose circuit is open"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Riot API ({host}) is unavailable, please try again shortly")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fails fast while a Riot routing host is down.
+
+    After `threshold` consecutive failures (5xx or no response) the circuit
+    opens and calls fail immediately for `cooldown` seconds. Then a single
+    probe is let through (half-open): success closes the circuit again,
+    failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, host: str, threshold: int = RIOT_BREAKER_THRESHOLD, cooldown: float = RIOT_BREAKER_COOLDOWN):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.trips = 0
+
+    def check(self):
+        """Raise RiotUnavailable unless a call may go through now"""
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN and now >= self.opened_at + self.cooldown:
+            self.state = HALF_OPEN
+            self.probing = False
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return
+        raise RiotUnavailable(self.host, max(self.opened_at + self.cooldown - now, 1))
+
+    def record_success(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+    def abandon(self):
+        """A call ended without an outcome (e.g. cancelled) - let another probe through"""
+        if self.state == HALF_OPEN:
+            self.probing = False
+
+    def status(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "trips": self.trips}
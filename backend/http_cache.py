@@ -0,0 +1,116 @@
+import os
+import gzip
+import hashlib
+from typing import Optional
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+
+# Response compression and revalidation (override via environment)
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "500"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# Default for JSON responses that don't set their own: cacheable, but always revalidated
+API_CACHE_CONTROL = os.getenv("API_CACHE_CONTROL", "private, no-cache")
+
+# For payloads that can never change (finished matches)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def etag_for(body: bytes) -> str:
+    # Weak: the same entity may be sent gzip-, brotli- or un-encoded
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (br wins at equal weight)"""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0
+        weights[coding.strip()] = q
+    candidates = [c for c in ("br", "gzip") if weights.get(c, weights.get("*", 0)) > 0]
+    return max(candidates, key=lambda c: weights.get(c, weights.get("*", 0)), default=None)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class HTTPCacheMiddleware:
+    """ETags, 304 revalidation and gzip/brotli compression for JSON responses.
+
+    Successful JSON responses get a content-hash ETag (unless the endpoint
+    already set one) and a default Cache-Control; a matching If-None-Match
+    turns them into a bodiless 304. Bodies over COMPRESS_MIN_SIZE are
+    compressed with the client's preferred encoding. Anything else,
+    including NDJSON streams, passes through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start = None
+        chunks = []
+
+        async def buffered_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if headers.get("content-type", "").startswith("application/json") and "content-encoding" not in headers:
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._send(start, b"".join(chunks), request_headers, send)
+                return
+            await send(message)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _send(self, start: dict, body: bytes, request_headers: Headers, send):
+        status = start["status"]
+        headers = MutableHeaders(raw=list(start["headers"]))
+
+        if status == 200:
+            etag = headers.get("etag") or etag_for(body)
+            headers["ETag"] = etag
+            headers.setdefault("Cache-Control", API_CACHE_CONTROL)
+            if etag_matches(request_headers.get("if-none-match"), etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        headers.add_vary_header("Accept-Encoding")
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", "")) if len(body) >= self.minimum_size else None
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        headers["Content-Length"] = str(len(body))
+        await send({"type": "http.response.start", "status": status, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,142 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+from rate_limiter import priority_lane, BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+# Background ingestion configuration (override via environment)
+# TRACKED_PLAYERS is a comma-separated list of Riot IDs, e.g. "Faker#KR1,Player#LAS@la2"
+TRACKED_PLAYERS = os.getenv("TRACKED_PLAYERS", "")
+INGEST_INTERVAL = float(os.getenv("INGEST_INTERVAL", "300"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "100"))
+INGEST_MAX_BACKOFF = float(os.getenv("INGEST_MAX_BACKOFF", "3600"))
+# Also fetch (once) and store the timelines of tracked players' recent games
+INGEST_TIMELINES = os.getenv("INGEST_TIMELINES", "true").lower() in ("1", "true", "yes")
+
+
+def parse_tracked_players(value: str, default_platform: str) -> List[Tuple[str, str, str]]:
+    """Parse "Name#TAG[@platform],..." into (game_name, tag_line, platform) tuples"""
+    players = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if "#" not in entry:
+            continue
+        riot_id, _, platform = entry.partition("@")
+        game_name, _, tag_line = riot_id.rpartition("#")
+        players.append((game_name, tag_line, (platform or default_platform).lower()))
+    return players
+
+
+class TrackedPlayer:
+    """Polling state for one tracked Riot ID"""
+
+    def __init__(self, game_name: str, tag_line: str, platform: str):
+        self.game_name = game_name
+        self.tag_line = tag_line
+        self.platform = platform
+        self.next_poll = 0.0
+        self.failures = 0
+        self.last_success: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.latest_match: Optional[str] = None
+        self.queued = False
+
+    def status(self) -> dict:
+        now = time.time()
+        return {
+            "riotId": f"{self.game_name}#{self.tag_line}",
+            "platform": self.platform,
+            "latestMatch": self.latest_match,
+            "lastSuccessAgo": round(now - self.last_success, 1) if self.last_success else None,
+            "nextPollIn": round(max(self.next_poll - time.monotonic(), 0), 1),
+            "failures": self.failures,
+            "lastError": self.last_error,
+        }
+
+
+class Ingester:
+    """Background worker that keeps tracked players' data warm.
+
+    Every INGEST_INTERVAL seconds each tracked player is queued (bounded
+    queue) for a refresh of their recent match IDs and league entry, and
+    any new match details are prefetched into the local stores. All Riot
+    calls run in the scheduler's background lane. Failing players back off
+    exponentially up to INGEST_MAX_BACKOFF.
+    """
+
+    def __init__(self, players: List[Tuple[str, str, str]], refresh_player: Callable[[str, str, str], Awaitable[str]]):
+        self.players = [TrackedPlayer(*p) for p in players]
+        # refresh_player(game_name, tag_line, platform) -> latest match ID
+        self.refresh_player = refresh_player
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+        self.tasks: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.started_at: Optional[float] = None
+
+    def start(self):
+        self.started_at = time.time()
+        self.tasks.append(asyncio.create_task(self._schedule()))
+        for _ in range(INGEST_WORKERS):
+            self.tasks.append(asyncio.create_task(self._work()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    async def _schedule(self):
+        while True:
+            now = time.monotonic()
+            for player in self.players:
+                if player.queued or now < player.next_poll:
+                    continue
+                try:
+                    self.queue.put_nowait(player)
+                    player.queued = True
+                except asyncio.QueueFull:
+                    self.dropped += 1
+            await asyncio.sleep(min(INGEST_INTERVAL, 5))
+
+    async def _work(self):
+        priority_lane.set(BACKGROUND)
+        while True:
+            player = await self.queue.get()
+            try:
+                player.latest_match = await self.refresh_player(player.game_name, player.tag_line, player.platform)
+                player.failures = 0
+                player.last_error = None
+                player.last_success = time.time()
+                player.next_poll = time.monotonic() + INGEST_INTERVAL
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                player.failures += 1
+                player.last_error = getattr(e, "detail", None) or str(e)
+                player.next_poll = time.monotonic() + min(INGEST_INTERVAL * 2 ** player.failures, INGEST_MAX_BACKOFF)
+                self.failed += 1
+                logger.warning("Ingest failed for %s#%s: %s", player.game_name, player.tag_line, player.last_error)
+            finally:
+                player.queued = False
+                self.queue.task_done()
+
+    def status(self) -> dict:
+        return {
+            "enabled": True,
+            "running": bool(self.tasks),
+            "interval": INGEST_INTERVAL,
+            "workers": INGEST_WORKERS,
+            "queued": self.queue.qsize(),
+            "queueSize": INGEST_QUEUE_SIZE,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "players": [p.status() for p in self.players],
+        }
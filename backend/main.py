@@ -1,16 +1,188 @@
+import time
+# Taken before the imports below, so the measured startup time includes them
+IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import httpx
 import os
-from typing import List, Optional
+import math
+import logging
+import httpx
+import orjson
+from typing import Awaitable, Callable, List, Optional, Tuple
 from datetime import datetime
 import asyncio
+from contextlib import asynccontextmanager
+from itertools import takewhile
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="LoL Dashboard API")
+from riot_client import RiotClient
+from circuit_breaker import RiotUnavailable
+from mock_riot import MockRiotTransport, RIOT_MOCK
+from match_store import MatchStore
+from cache import (
+    TTLCache, KeyedLocks, PUUID_CACHE_TTL, RANK_CACHE_TTL, RANK_CACHE_STALE_TTL,
+    MATCH_CACHE_TTL, MATCH_CACHE_MAX_ENTRIES, MATCH_IDS_CACHE_TTL, MATCH_IDS_CACHE_STALE_TTL,
+    RESPONSE_CACHE_TTL, RESPONSE_CACHE_MAX_ENTRIES, LATEST_MATCH_CACHE_TTL
+)
+from scoring import ParticipantTable, window_totals
+from player_stats import PlayerStatsStore, LEADERBOARD_WINDOWS
+from timeline_store import TimelineStore, Timeline, OBJECTIVES, downsample
+from startup import (
+    Lazy, Startup, load_snapshot, save_snapshot, CACHE_SNAPSHOT_PATH, STARTUP_WARM_MATCHES, READY_MAX_RATE_WAIT
+)
+from match_record import MatchRecord, RANKED_FLEX_QUEUE
+from ingester import Ingester, TRACKED_PLAYERS, INGEST_TIMELINES, parse_tracked_players
+from http_cache import HTTPCacheMiddleware, IMMUTABLE_CACHE_CONTROL, etag_for
+from metrics import MetricsMiddleware, StatsCollector
+from shared_state import SharedCache, SharedRateLedger, acquire_leadership, SHARED_STATE_PATH, WEB_CONCURRENCY
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+logger = logging.getLogger(__name__)
+
+# Riot API Configuration
+RIOT_API_KEY = os.getenv("RIOT_API_KEY", "RGAPI-your-key-here")
+DEFAULT_PLATFORM = os.getenv("RIOT_PLATFORM", "la2")
+MAX_BATCH_GROUPS = int(os.getenv("MAX_BATCH_GROUPS", "50"))
+MAX_MATCH_HISTORY = int(os.getenv("MAX_MATCH_HISTORY", "100"))
+
+# Match ID sync paging: a small probe for new games, full pages (Riot's max) after that
+MATCH_SYNC_PROBE_SIZE = int(os.getenv("MATCH_SYNC_PROBE_SIZE", "5"))
+MATCH_IDS_PAGE_SIZE = 100
+
+# Most points per series the timeline endpoint returns (a game has one frame per minute)
+MAX_TIMELINE_POINTS = 120
+
+# Platform (league-v4) -> regional routing value (account-v1 / match-v5)
+PLATFORM_REGIONS = {
+    "br1": "americas", "la1": "americas", "la2": "americas", "na1": "americas",
+    "eun1": "europe", "euw1": "europe", "me1": "europe", "ru": "europe", "tr1": "europe",
+    "jp1": "asia", "kr": "asia",
+    "oc1": "sea", "ph2": "sea", "sg2": "sea", "th2": "sea", "tw2": "sea", "vn2": "sea",
+}
+
+def resolve_platform(platform: Optional[str]) -> str:
+    """Normalize a requested platform, defaulting to RIOT_PLATFORM"""
+    platform = (platform or DEFAULT_PLATFORM).lower()
+    if platform not in PLATFORM_REGIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown platform '{platform}'")
+    return platform
+
+def resolve_count(count: int) -> int:
+    """Validate the requested match history depth"""
+    if count < 1 or count > MAX_MATCH_HISTORY:
+        raise HTTPException(status_code=400, detail=f"count must be between 1 and {MAX_MATCH_HISTORY}")
+    return count
+
+def platform_url(platform: str) -> str:
+    return f"https://{platform}.api.riotgames.com"
+
+def region_url(platform: str, account: bool = False) -> str:
+    region = PLATFORM_REGIONS[platform]
+    # account-v1 has no SEA cluster; those accounts are served from asia
+    if account and region == "sea":
+        region = "asia"
+    return f"https://{region}.api.riotgames.com"
+
+def match_platform(match_id: str) -> str:
+    """Platform a match was played on, from its ID prefix (e.g. LA2_123 -> la2)"""
+    platform = match_id.split("_", 1)[0].lower()
+    return platform if platform in PLATFORM_REGIONS else DEFAULT_PLATFORM
+
+def backfill_player_stats() -> int:
+    """Record every stored match in a new or reset player stats store (blocking - run in a thread)"""
+    matches = (MatchRecord.from_stored(payload) for _, payload in app.state.match_store.iter_all())
+    return app.state.player_stats.open().backfill(match for match in matches if match is not None)
+
+async def warm_up(app: FastAPI, startup: Startup):
+    """Warm the instance while it already serves: reload caches from disk, open the lazy stores, start the ingester"""
+    try:
+        if CACHE_SNAPSHOT_PATH:
+            with startup.phase("cacheSnapshot"):
+                restored = load_snapshot(CACHE_SNAPSHOT_PATH, PERSISTED_CACHES)
+            logger.info("Restored %d cache entries from %s", restored, CACHE_SNAPSHOT_PATH)
+        if STARTUP_WARM_MATCHES > 0:
+            with startup.phase("matchCache"):
+                # Decode off the event loop; older compact layouts come back as None and are refetched later
+                recent = await asyncio.to_thread(lambda: [
+                    (match_id, MatchRecord.from_stored(payload))
+                    for match_id, payload in app.state.match_store.recent(STARTUP_WARM_MATCHES)
+                ])
+                for match_id, match in recent:
+                    if match is not None:
+                        match_cache.set(match_id, match)
+        with startup.phase("playerStats"):
+            await asyncio.to_thread(app.state.player_stats.open)
+    except Exception:
+        # A cold cache is slower, not broken
+        logger.exception("Warm-up failed, serving with cold caches")
+    startup.finish()
+    try:
+        added = await asyncio.to_thread(backfill_player_stats)
+        if added:
+            logger.info("Backfilled %d player games from the match store", added)
+    except Exception:
+        logger.exception("Player stats backfill failed, games are recorded as matches are read instead")
+    if app.state.ingester:
+        app.state.ingester.start()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Only what every request needs is set up before serving; the rest is lazy or warmed in the background
+    startup = app.state.startup = Startup(IMPORT_STARTED)
+    startup.record("imports", time.perf_counter() - IMPORT_STARTED)
+    with startup.phase("init"):
+        # With several workers, caches and the Riot rate limit budget are shared through one SQLite file
+        shared_cache = SharedCache() if SHARED_STATE_PATH else None
+        rate_ledger = SharedRateLedger() if SHARED_STATE_PATH else None
+        for cache in PERSISTED_CACHES:
+            cache.shared = shared_cache
+        # One pooled Riot client shared by every request
+        app.state.riot = RiotClient(RIOT_API_KEY, transport=MockRiotTransport() if RIOT_MOCK else None,
+                                    rate_ledger=rate_ledger)
+        # Finished matches never change - keep them on disk across restarts (shared by all workers)
+        app.state.match_store = MatchStore()
+        # Pre-scored games and rolling per-player aggregates behind comparisons and the leaderboard
+        # (opening it clears every stored score after an MVP weight change, so it happens during warm-up)
+        app.state.player_stats = Lazy(PlayerStatsStore)
+        # Match timelines as NumPy arrays on disk
+        app.state.timeline_store = Lazy(TimelineStore)
+        # Optional background pre-warming of tracked players - in one worker only, started once warm
+        tracked_players = parse_tracked_players(TRACKED_PLAYERS, DEFAULT_PLATFORM)
+        leader_lock = acquire_leadership(SHARED_STATE_PATH + "-ingester.lock") if SHARED_STATE_PATH and tracked_players else None
+        run_ingester = tracked_players and (leader_lock or not SHARED_STATE_PATH)
+        app.state.ingester = Ingester(tracked_players, ingest_player) if run_ingester else None
+        app.state.ingester_elsewhere = bool(tracked_players) and not run_ingester
+    startup.record("serving", time.perf_counter() - IMPORT_STARTED)
+    warm_task = asyncio.create_task(warm_up(app, startup))
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        await asyncio.gather(warm_task, return_exceptions=True)
+        if app.state.ingester:
+            await app.state.ingester.stop()
+        if CACHE_SNAPSHOT_PATH and startup.warm:
+            try:
+                save_snapshot(CACHE_SNAPSHOT_PATH, PERSISTED_CACHES)
+            except OSError:
+                logger.exception("Could not save the cache snapshot to %s", CACHE_SNAPSHOT_PATH)
+        await app.state.riot.aclose()
+        app.state.match_store.close()
+        app.state.player_stats.close()
+        for shared in (shared_cache, rate_ledger, leader_lock):
+            if shared:
+                shared.close()
+
+# orjson for every JSON body; the big endpoints return ORJSONResponse directly to skip jsonable_encoder
+app = FastAPI(title="LoL Dashboard API", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# ETag/304 and gzip/brotli for JSON responses (NDJSON streams pass through)
+app.add_middleware(HTTPCacheMiddleware)
 
 # CORS configuration for React frontend
 app.add_middleware(
@@ -19,12 +191,60 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
-# Riot API Configuration
-RIOT_API_KEY = os.getenv("RIOT_API_KEY", "RGAPI-your-key-here")
-PLATFORM_URL = "https://la2.api.riotgames.com"
-REGION_URL = "https://americas.api.riotgames.com"
+# Outermost, so route timings include compression and CORS
+app.add_middleware(MetricsMiddleware)
+
+# In-process caches - Riot IDs almost never change, rank only moves after a game,
+# and concurrent requests for the same key share one upstream call
+puuid_cache = TTLCache("puuid", ttl=PUUID_CACHE_TTL)
+rank_cache = TTLCache("rank", ttl=RANK_CACHE_TTL, stale_ttl=RANK_CACHE_STALE_TTL)
+match_cache = TTLCache("match", ttl=MATCH_CACHE_TTL, max_entries=MATCH_CACHE_MAX_ENTRIES)
+# Serialized /api/matches/{id} bodies (and their ETags) - finished matches never change
+match_payload_cache = TTLCache("matchPayload", ttl=MATCH_CACHE_TTL, max_entries=MATCH_CACHE_MAX_ENTRIES)
+timeline_cache = TTLCache("timeline", ttl=MATCH_CACHE_TTL, max_entries=MATCH_CACHE_MAX_ENTRIES)
+# Serialized timeline bodies per (match, points) - kept apart so the many `points` variants
+# never push match bodies out of match_payload_cache
+timeline_payload_cache = TTLCache("timelinePayload", ttl=MATCH_CACHE_TTL, max_entries=MATCH_CACHE_MAX_ENTRIES)
+latest_match_cache = TTLCache("latestMatch", ttl=LATEST_MATCH_CACHE_TTL)
+response_cache = TTLCache("response", ttl=RESPONSE_CACHE_TTL, max_entries=RESPONSE_CACHE_MAX_ENTRIES)
+match_ids_cache = TTLCache("matchIds", ttl=MATCH_IDS_CACHE_TTL, stale_ttl=MATCH_IDS_CACHE_STALE_TTL)
+match_sync_locks = KeyedLocks()
+# Saved to CACHE_SNAPSHOT_PATH on shutdown and restored on startup (also the ones shared between workers)
+PERSISTED_CACHES = (puuid_cache, rank_cache, match_ids_cache)
+
+def raise_for_rate_limit(response):
+    """Surface a Riot 429 (after the client's retries) instead of masking it as not found"""
+    if response.status_code == 429:
+        raise HTTPException(
+            status_code=429,
+            detail="Riot API rate limit reached, please try again shortly",
+            headers={"Retry-After": response.headers.get("Retry-After", "1")}
+        )
+
+def raise_for_riot_error(response, not_found: str):
+    """Map a failed Riot response to our status: 404 stays not found, 429 and 5xx don't"""
+    raise_for_rate_limit(response)
+    if response.status_code in (400, 404):
+        raise HTTPException(status_code=404, detail=not_found)
+    if response.status_code != 200:
+        raise HTTPException(status_code=502, detail=f"Riot API error ({response.status_code})")
+
+async def riot_get(url: str, method: str):
+    """GET from the Riot API, surfacing outages as 503/504/502 instead of a generic 500"""
+    try:
+        return await app.state.riot.get(url, method)
+    except RiotUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except httpx.TimeoutException:
+        raise HTTPException(status_code=504, detail="Riot API timed out")
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Could not reach the Riot API ({type(e).__name__})")
+
+# Streamed records should reach the browser as they are written, not when a proxy buffer fills
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 class PlayerInput(BaseModel):
     game_name: str
@@ -32,26 +252,56 @@ class PlayerInput(BaseModel):
 
 class MatchRequest(BaseModel):
     players: List[PlayerInput]
+    platform: Optional[str] = None
+    count: int = 5  # how many recent ranked flex games to look at
+    slim: bool = False  # last-5-matches: only the requested player's row per match
 
-async def get_puuid(game_name: str, tag_line: str):
-    """Get PUUID from Riot ID"""
-    async with httpx.AsyncClient() as client:
-        headers = {"X-Riot-Token": RIOT_API_KEY}
-        url = f"{REGION_URL}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
-        response = await client.get(url, headers=headers)
-        if response.status_code != 200:
-            raise HTTPException(status_code=404, detail=f"Player {game_name}#{tag_line} not found")
+class PlayerGroup(BaseModel):
+    name: Optional[str] = None
+    players: List[PlayerInput]
+    platform: Optional[str] = None
+    count: int = 5
+
+class BatchRequest(BaseModel):
+    groups: List[PlayerGroup]
+
+class RequestScope:
+    """Memo of in-flight fetches shared across one request, so overlapping
+    players and matches are only fetched once"""
+
+    def __init__(self):
+        self.tasks = {}
+
+    def run(self, key, factory):
+        if key not in self.tasks:
+            self.tasks[key] = asyncio.ensure_future(factory())
+        return self.tasks[key]
+
+    def close(self):
+        for task in self.tasks.values():
+            task.cancel()
+
+async def get_puuid(game_name: str, tag_line: str, platform: str = DEFAULT_PLATFORM):
+    """Get PUUID from Riot ID (cached - Riot IDs are case-insensitive and rarely change)"""
+    async def load():
+        url = f"{region_url(platform, account=True)}/riot/account/v1/accounts/by-riot-id/{game_name}/{tag_line}"
+        response = await riot_get(url, "account-v1.by-riot-id")
+        raise_for_riot_error(response, f"Player {game_name}#{tag_line} not found")
         return response.json()["puuid"]
 
-async def get_summoner_data(puuid: str):
-    """Get summoner data including rank - uses PUUID for league entries"""
-    async with httpx.AsyncClient() as client:
-        headers = {"X-Riot-Token": RIOT_API_KEY}
+    return await puuid_cache.get_or_load((game_name.lower(), tag_line.lower()), load)
 
+async def get_summoner_data(puuid: str, platform: str = DEFAULT_PLATFORM, refresh: bool = False):
+    """Get summoner data including rank - uses PUUID for league entries"""
+    async def load():
         # Get ranked data directly using PUUID (newer API method)
-        ranked_url = f"{PLATFORM_URL}/lol/league/v4/entries/by-puuid/{puuid}"
-        ranked_response = await client.get(ranked_url, headers=headers)
-        ranked_data = ranked_response.json() if ranked_response.status_code == 200 else []
+        ranked_url = f"{platform_url(platform)}/lol/league/v4/entries/by-puuid/{puuid}"
+        ranked_response = await riot_get(ranked_url, "league-v4.entries-by-puuid")
+        if ranked_response.status_code == 404:
+            ranked_data = []
+        else:
+            raise_for_riot_error(ranked_response, "Summoner not found")
+            ranked_data = ranked_response.json()
 
         # Find RANKED_FLEX_SR queue
         flex_rank = next((r for r in ranked_data if r["queueType"] == "RANKED_FLEX_SR"), None)
@@ -60,462 +310,1087 @@ async def get_summoner_data(puuid: str):
             "rank": flex_rank
         }
 
-async def get_last_match(puuid: str):
+    if refresh:
+        return await rank_cache.refresh((platform, puuid), load)
+    return await rank_cache.get_or_load((platform, puuid), load)
+
+async def get_summoner_data_or_unknown(puuid: str, platform: str = DEFAULT_PLATFORM):
+    """get_summoner_data for display - a failed rank lookup shows no rank rather than failing the page"""
+    try:
+        return await get_summoner_data(puuid, platform)
+    except HTTPException as e:
+        logger.warning("Rank lookup failed for %s on %s: %s %s", puuid, platform, e.status_code, e.detail)
+        return {"rank": None, "error": e.detail}
+
+async def get_last_match(puuid: str, platform: str = DEFAULT_PLATFORM):
     """Get the most recent ranked flex match ID"""
-    async with httpx.AsyncClient() as client:
-        headers = {"X-Riot-Token": RIOT_API_KEY}
-        # Get ranked flex matches (queue=440)
-        url = f"{REGION_URL}/lol/match/v5/matches/by-puuid/{puuid}/ids?queue=440&count=1"
-        response = await client.get(url, headers=headers)
-        if response.status_code != 200 or not response.json():
-            raise HTTPException(status_code=404, detail="No recent ranked flex matches found")
-        return response.json()[0]
-
-async def get_last_n_matches(puuid: str, count: int = 5):
-    """Get the last N ranked flex match IDs"""
-    async with httpx.AsyncClient() as client:
-        headers = {"X-Riot-Token": RIOT_API_KEY}
-        # Get ranked flex matches (queue=440)
-        url = f"{REGION_URL}/lol/match/v5/matches/by-puuid/{puuid}/ids?queue=440&count={count}"
-        response = await client.get(url, headers=headers)
-        if response.status_code != 200 or not response.json():
+    # Shares the cached recent-matches list with the other endpoints
+    match_ids = await get_last_n_matches(puuid, count=5, platform=platform)
+    return match_ids[0]
+
+async def fetch_match_id_page(puuid: str, platform: str, start: int, count: int):
+    """One page of a player's ranked flex match IDs, newest first"""
+    url = (f"{region_url(platform)}/lol/match/v5/matches/by-puuid/{puuid}/ids"
+           f"?queue={RANKED_FLEX_QUEUE}&start={start}&count={count}")
+    response = await riot_get(url, "match-v5.ids-by-puuid")
+    raise_for_riot_error(response, "No recent ranked flex matches found")
+    return response.json()
+
+async def sync_match_ids(puuid: str, count: int, platform: str):
+    """Bring a player's stored match ID list up to date and return the newest `count` IDs.
+
+    Pages from the top only until an already known ID shows up, so a refresh
+    costs one small call plus the genuinely new games. Older games are only
+    paged in when the requested window reaches past what is stored.
+    """
+    store = app.state.match_store
+    async with match_sync_locks.hold(puuid):
+        known, complete = await asyncio.to_thread(store.known_match_ids, puuid)
+        known_set = set(known)
+
+        # New games since the last sync (none if a newest-match probe just saw our newest game)
+        newer = []
+        start = 0
+        page_size = MATCH_SYNC_PROBE_SIZE if known else min(count, MATCH_IDS_PAGE_SIZE)
+        up_to_date = bool(known) and latest_match_cache.peek((platform, puuid)) == known[0]
+        while not up_to_date:
+            page = await fetch_match_id_page(puuid, platform, start, page_size)
+            fresh = list(takewhile(lambda match_id: match_id not in known_set, page))
+            newer += fresh
+            if len(page) < page_size and len(fresh) == len(page):
+                # Ran out of history before reaching anything known
+                complete = True
+                break
+            if len(fresh) < len(page) or (not known and len(newer) >= count):
+                break
+            start += page_size
+            page_size = MATCH_IDS_PAGE_SIZE
+
+        # Older games the window needs but we have never stored
+        match_ids = newer + known
+        older = []
+        while len(match_ids) < count and not complete:
+            page_size = min(count - len(match_ids), MATCH_IDS_PAGE_SIZE)
+            page = await fetch_match_id_page(puuid, platform, len(match_ids), page_size)
+            seen = set(match_ids)
+            backfill = [match_id for match_id in page if match_id not in seen]
+            older += backfill
+            match_ids += backfill
+            if len(page) < page_size or not backfill:
+                complete = True
+
+        if newer or older or complete:
+            await asyncio.to_thread(store.add_match_ids, puuid, newer, older, complete)
+        return match_ids[:count]
+
+async def get_last_n_matches(puuid: str, count: int = 5, platform: str = DEFAULT_PLATFORM, refresh: bool = False):
+    """Get the last N ranked flex match IDs (briefly cached; synced incrementally from the match store)"""
+    async def load():
+        match_ids = await sync_match_ids(puuid, count, platform)
+        if not match_ids:
             raise HTTPException(status_code=404, detail="No recent ranked flex matches found")
-        return response.json()
+        latest_match_cache.set((platform, puuid), match_ids[0])
+        return match_ids
+
+    if refresh:
+        return await match_ids_cache.refresh((platform, puuid, count), load)
+    match_ids = await match_ids_cache.get_or_load((platform, puuid, count), load)
+    latest = latest_match_cache.peek((platform, puuid))
+    if latest is not None and latest != match_ids[0]:
+        # A newest-match probe has seen a game this cached list doesn't have yet
+        match_ids = await match_ids_cache.refresh((platform, puuid, count), load)
+    return match_ids
+
+async def get_latest_match_id(puuid: str, platform: str = DEFAULT_PLATFORM):
+    """The player's newest ranked flex match ID, or None - one ids?count=1 call, briefly cached"""
+    async def load():
+        page = await fetch_match_id_page(puuid, platform, 0, 1)
+        return page[0] if page else None
+
+    return await latest_match_cache.get_or_load((platform, puuid), load)
 
 async def get_match_details(match_id: str):
-    """Get detailed match information"""
-    async with httpx.AsyncClient() as client:
-        headers = {"X-Riot-Token": RIOT_API_KEY}
-        url = f"{REGION_URL}/lol/match/v5/matches/{match_id}"
-        response = await client.get(url, headers=headers)
-        if response.status_code != 200:
-            raise HTTPException(status_code=404, detail="Match details not found")
-        return response.json()
-
-def calculate_mvp_score(participant):
-    """Calculate MVP score based on performance metrics"""
-    kda = (participant["kills"] + participant["assists"]) / max(participant["deaths"], 1)
-    damage_share = participant.get("challenges", {}).get("teamDamagePercentage", 0) * 100
-    gold_per_min = participant["goldEarned"] / (participant["timePlayed"] / 60)
-    vision_score = participant["visionScore"]
-    kill_participation = participant.get("challenges", {}).get("killParticipation", 0) * 100
-
-    # Weighted score
-    mvp_score = (
-        kda * 30 +
-        damage_share * 20 +
-        (gold_per_min / 10) * 15 +
-        vision_score * 10 +
-        kill_participation * 25
+    """Get detailed match information (memory cache -> local match store -> Riot)"""
+    async def load():
+        stored = await asyncio.to_thread(app.state.match_store.get, match_id)
+        match = MatchRecord.from_stored(stored) if stored is not None else None
+        if match is not None:
+            # Stored before the player stats store existed, or before it was reset by a weight change
+            await asyncio.to_thread(lambda: app.state.player_stats.open().record_match(match))
+            return match
+
+        url = f"{region_url(match_platform(match_id))}/lol/match/v5/matches/{match_id}"
+        response = await riot_get(url, "match-v5.match")
+        raise_for_riot_error(response, "Match details not found")
+        # Keep only what the dashboard reads; the raw document is dropped here
+        match = MatchRecord.from_riot(response.json())
+        await asyncio.to_thread(app.state.match_store.put, match_id, match.compact())
+        await asyncio.to_thread(lambda: app.state.player_stats.open().record_match(match))
+        return match
+
+    return await match_cache.get_or_load(match_id, load)
+
+async def get_match_timeline(match_id: str):
+    """Get a match timeline (memory cache -> timeline store -> Riot, so each is fetched once)"""
+    async def load():
+        store = app.state.timeline_store
+        timeline = await asyncio.to_thread(lambda: store.open().get(match_id))
+        if timeline is not None:
+            return timeline
+
+        url = f"{region_url(match_platform(match_id))}/lol/match/v5/matches/{match_id}/timeline"
+        response = await riot_get(url, "match-v5.timeline")
+        raise_for_riot_error(response, "Match timeline not found")
+        # The document is large - parse and convert it off the event loop, then keep only the arrays
+        timeline = await asyncio.to_thread(lambda: Timeline.from_riot(orjson.loads(response.content)))
+        await asyncio.to_thread(lambda: store.open().put(match_id, timeline))
+        return timeline
+
+    return await timeline_cache.get_or_load(match_id, load)
+
+async def gather_matches(match_ids: List[str], scope: Optional[RequestScope] = None, return_exceptions: bool = False):
+    """Fetch match details concurrently, sharing in-flight fetches through scope"""
+    owned = scope is None
+    if owned:
+        scope = RequestScope()
+    try:
+        return await asyncio.gather(*(
+            scope.run(("match", match_id), lambda match_id=match_id: get_match_details(match_id))
+            for match_id in match_ids
+        ), return_exceptions=return_exceptions)
+    finally:
+        if owned:
+            scope.close()
+
+async def gather_available_matches(match_ids: List[str], scope: Optional[RequestScope] = None):
+    """gather_matches that keeps going when some matches fail.
+
+    Returns (loaded match IDs, their records, failure markers); each marker
+    is {"matchId", "error", "status"}. Raises the first error only if no
+    match could be loaded at all.
+    """
+    results = await gather_matches(match_ids, scope, return_exceptions=True)
+    loaded_ids, matches, failed = [], [], []
+    for match_id, result in zip(match_ids, results):
+        if isinstance(result, HTTPException):
+            failed.append({"matchId": match_id, "error": result.detail, "status": result.status_code})
+        elif isinstance(result, BaseException):
+            logger.error("Loading match %s failed", match_id, exc_info=result)
+            failed.append({"matchId": match_id, "error": str(result), "status": 500})
+        else:
+            loaded_ids.append(match_id)
+            matches.append(result)
+    if failed and not matches:
+        raise next(r for r in results if isinstance(r, BaseException))
+    if failed:
+        logger.warning("Returning %d of %d matches; failed: %s", len(matches), len(match_ids), failed)
+    return loaded_ids, matches, failed
+
+async def ingest_player(game_name: str, tag_line: str, platform: str):
+    """Background refresh for one tracked player: recent match IDs, rank, match
+    details and the ranks of everyone in their latest game"""
+    puuid = await get_puuid(game_name, tag_line, platform)
+    match_ids, _ = await asyncio.gather(
+        get_last_n_matches(puuid, count=5, platform=platform, refresh=True),
+        get_summoner_data(puuid, platform, refresh=True)
     )
+    matches = await gather_matches(match_ids)
+    await asyncio.to_thread(lambda: app.state.player_stats.open().mark_synced(puuid, match_ids))
+    await asyncio.gather(*(get_summoner_data(p.puuid, platform) for p in matches[0].participants))
+    if INGEST_TIMELINES:
+        await asyncio.gather(*(get_match_timeline(match_id) for match_id in match_ids))
+    return match_ids[0]
+
+async def cached_response(endpoint: str, players: List[PlayerInput], platform: str, params: tuple,
+                          build: Callable[[], Awaitable[Tuple[dict, bool]]]):
+    """A JSON response from the response cache, keyed on the endpoint, the player set and
+    each player's newest match ID.
+
+    The newest IDs come from a cheap ids?count=1 probe per player, so a new
+    game for any of them misses the cache. Identical concurrent requests
+    share one build. build returns (payload, complete); errors and partial
+    results (complete=False) are not kept.
+    """
+    async def load():
+        payload, complete = await build()
+        return orjson.dumps(payload), complete
+
+    if RESPONSE_CACHE_TTL <= 0:
+        return Response((await load())[0], media_type="application/json")
+
+    puuids = await asyncio.gather(*(get_puuid(p.game_name, p.tag_line, platform) for p in players))
+    latest = await asyncio.gather(*(get_latest_match_id(puuid, platform) for puuid in puuids))
+    # Riot IDs exactly as requested: the bodies echo them back (player_summary), so "player#tag"
+    # must not get the response built for "Player#TAG"
+    key = (endpoint, platform, tuple((p.game_name, p.tag_line) for p in players), params, tuple(latest))
+    body, complete = await response_cache.get_or_load(key, load)
+    if not complete:
+        response_cache.invalidate(key)
+    return Response(body, media_type="application/json")
+
+def player_summary(player: PlayerInput, rank_info: Optional[dict]):
+    """Searched player's Riot ID and flex rank"""
+    return {
+        "gameName": player.game_name,
+        "tagLine": player.tag_line,
+        "rank": {
+            "tier": rank_info["tier"] if rank_info else "UNRANKED",
+            "division": rank_info["rank"] if rank_info else "",
+            "lp": rank_info["leaguePoints"] if rank_info else 0
+        } if rank_info else None
+    }
+
+def calculate_averages(player_totals: dict):
+    """Per-game averages (and overall KDA/win rate) from accumulated totals"""
+    games_count = player_totals["games"]
+    return {
+        "kills": round(player_totals["kills"] / games_count, 1) if games_count > 0 else 0,
+        "deaths": round(player_totals["deaths"] / games_count, 1) if games_count > 0 else 0,
+        "assists": round(player_totals["assists"] / games_count, 1) if games_count > 0 else 0,
+        "kda": round((player_totals["kills"] + player_totals["assists"]) / max(player_totals["deaths"], 1), 2),
+        "cs": round(player_totals["cs"] / games_count, 1) if games_count > 0 else 0,
+        "gold": round(player_totals["gold"] / games_count, 0) if games_count > 0 else 0,
+        "damage": round(player_totals["damage"] / games_count, 0) if games_count > 0 else 0,
+        "visionScore": round(player_totals["visionScore"] / games_count, 1) if games_count > 0 else 0,
+        "mvpScore": round(player_totals["mvpScore"] / games_count, 2) if games_count > 0 else 0,
+        "winRate": round((player_totals["wins"] / games_count * 100), 1) if games_count > 0 else 0,
+    }
+
+def performance_counts(player_totals: dict):
+    """MVP, top 3 and last place finishes from window totals"""
+    return {
+        "mvpCount": player_totals["mvp_count"],
+        "top3Count": player_totals["top3_count"],
+        "trollCount": player_totals["troll_count"],
+    }
+
+def summarize_matches(match_ids: List[str], matches: List[MatchRecord], puuid: str, slim: bool = False):
+    """summarize_match for every match, scored together in one ParticipantTable.
+
+    Returns the summaries and the table (e.g. for window_totals).
+    """
+    table = ParticipantTable(matches)
+    derived = table.derived_stats()
+    summaries = [
+        summarize_match(match_id, match, puuid, slim, derived, start)
+        for match_id, match, start in zip(match_ids, matches, table.match_starts.tolist())
+    ]
+    return summaries, table
+
+def summarize_match(match_id: str, match: MatchRecord, puuid: str, slim: bool = False,
+                    derived: Optional[dict] = None, start: int = 0):
+    """All 10 players of one match ranked by MVP score, plus the requested player's row.
+
+    With slim, the other players' rows are left out. derived (with the
+    match's first row at start) comes from a table several matches share;
+    without it the match is scored on its own.
+    """
+    if derived is None:
+        derived = ParticipantTable([match]).derived_stats()
+
+    # Find all players in this match
+    match_player_stats = []
+    player_participant = None
+
+    for idx, participant in enumerate(match.participants, start):
+        if slim and participant.puuid != puuid:
+            continue
+
+        player_stat = {
+            "puuid": participant.puuid,
+            "gameName": participant.game_name,
+            "tagLine": participant.tag_line,
+            "champion": participant.champion,
+            "kills": participant.kills,
+            "deaths": participant.deaths,
+            "assists": participant.assists,
+            "kda": derived["kda"][idx],
+            "cs": participant.cs,
+            "gold": participant.gold,
+            "damage": participant.damage,
+            "visionScore": participant.vision_score,
+            "win": participant.win,
+            "mvpScore": derived["mvpScore"][idx],
+            "items": participant.items,
+            # Same ordering as a full sort by MVP score (ties keep participant order)
+            "ranking": derived["ranking"][idx],
+        }
 
-    return round(mvp_score, 2)
+        match_player_stats.append(player_stat)
+
+        # Track the requested player
+        if participant.puuid == puuid:
+            player_participant = player_stat
+
+    # Sort players by MVP ranking for this match
+    match_player_stats.sort(key=lambda x: x["ranking"])
+
+    summary = {
+        "matchId": match_id,
+        "gameCreation": datetime.fromtimestamp(match.game_creation / 1000).isoformat(),
+        "gameDuration": match.game_duration,
+        "gameMode": match.game_mode,
+        "win": player_participant["win"] if player_participant else False,
+        "players": match_player_stats,
+        "requestedPlayer": player_participant
+    }
+    if slim:
+        del summary["players"]
+    return summary
+
+def ndjson(record: dict) -> bytes:
+    return orjson.dumps(record) + b"\n"
+
+def error_record(error: Exception) -> dict:
+    """Error line for a streaming response - the HTTP status is already sent"""
+    if isinstance(error, HTTPException):
+        return {"type": "error", "status": error.status_code, "detail": error.detail}
+    return {"type": "error", "status": 500, "detail": str(error)}
 
 @app.get("/")
 async def root():
     return {"message": "LoL Dashboard API", "status": "running"}
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving - no dependency checks"""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: caches warmed and Riot rate budget available (503 until both hold)"""
+    startup = app.state.startup
+    riot = app.state.riot
+    rate_limit_wait = riot.scheduler.app_wait()
+    checks = {"warm": startup.warm, "rateBudget": rate_limit_wait <= READY_MAX_RATE_WAIT}
+    ready = all(checks.values())
+    return ORJSONResponse({
+        "status": "ready" if ready else "notReady",
+        "checks": checks,
+        "rateLimitWait": round(rate_limit_wait, 1),
+        # Reported but not a failed check: an outage is served from cache and partial results
+        "openCircuits": [host for host, breaker in riot.breakers.items() if breaker.status()["state"] != "closed"],
+        "startup": startup.phases,
+    }, status_code=200 if ready else 503, headers={"Cache-Control": "no-store"})
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the local data stores"""
+    return {
+        "matchStore": await asyncio.to_thread(app.state.match_store.stats),
+        "playerStats": await asyncio.to_thread(lambda: app.state.player_stats.open().stats()),
+        "puuid": puuid_cache.stats(),
+        "rank": rank_cache.stats(),
+        "match": match_cache.stats(),
+        "matchPayload": match_payload_cache.stats(),
+        "matchIds": match_ids_cache.stats(),
+        "timeline": timeline_cache.stats(),
+        "timelinePayload": timeline_payload_cache.stats(),
+        "timelineStore": await asyncio.to_thread(lambda: app.state.timeline_store.open().stats()),
+        "latestMatch": latest_match_cache.stats(),
+        "response": response_cache.stats(),
+        "rateLimits": app.state.riot.scheduler.stats(),
+    }
+
+def metrics_stats():
+    """Cache and rate limiter counters for the Prometheus collector"""
+    return {
+        "caches": {
+            "matchStore": app.state.match_store.stats(),
+            "puuid": puuid_cache.stats(),
+            "rank": rank_cache.stats(),
+            "match": match_cache.stats(),
+            "matchPayload": match_payload_cache.stats(),
+            "matchIds": match_ids_cache.stats(),
+            "timeline": timeline_cache.stats(),
+            "timelinePayload": timeline_payload_cache.stats(),
+            "latestMatch": latest_match_cache.stats(),
+            "response": response_cache.stats(),
+        },
+        "rateLimits": app.state.riot.scheduler.stats(),
+    }
+
+stats_collector = StatsCollector(metrics_stats)
+REGISTRY.register(stats_collector)
+
+def render_metrics() -> bytes:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        # Several workers: merge every process's metric files (cache stats are this worker's)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(stats_collector)
+        return generate_latest(registry)
+    return generate_latest()
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: Riot call latency/status/retries, route timings, cache hit ratios"""
+    # Collection reads the SQLite match store, so keep it off the event loop
+    return Response(await asyncio.to_thread(render_metrics), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/api/ingest/status")
+async def ingest_status():
+    """Background ingester progress for tracked players"""
+    if app.state.ingester_elsewhere:
+        return {"enabled": True, "running": False, "detail": "Running in another worker process"}
+    if not app.state.ingester:
+        return {"enabled": False}
+    return app.state.ingester.status()
+
+@app.get("/api/matches/{match_id}")
+async def get_match(match_id: str):
+    """One finished match with all 10 players ranked by MVP score (immutable, served from pre-serialized bytes)"""
+    async def load():
+        summary = summarize_match(match_id, await get_match_details(match_id), puuid="")
+        del summary["win"], summary["requestedPlayer"]
+        body = orjson.dumps(summary)
+        return body, etag_for(body)
+
+    try:
+        body, etag = await match_payload_cache.get_or_load(match_id, load)
+        return Response(body, media_type="application/json",
+                        headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in /api/matches/{match_id}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def summarize_timeline(match_id: str, match: MatchRecord, timeline: Timeline, points: int):
+    """Downsampled per-player gold/XP/CS/damage curves, the blue side's gold lead and objective kills"""
+    series = downsample(timeline, points)
+    players = []
+    for idx, participant in enumerate(match.participants):
+        players.append({
+            "puuid": participant.puuid,
+            "gameName": participant.game_name,
+            "tagLine": participant.tag_line,
+            "champion": participant.champion,
+            "teamId": participant.team_id,
+            "gold": series["gold"][idx],
+            "xp": series["xp"][idx],
+            "cs": series["cs"][idx],
+            "damage": series["damage"][idx],
+        })
+
+    gold_lead = [0] * len(series["timestamps"])
+    for player in players:
+        sign = 1 if player["teamId"] == 100 else -1
+        gold_lead = [lead + sign * gold for lead, gold in zip(gold_lead, player["gold"])]
+
+    return {
+        "matchId": match_id,
+        "timestamps": series["timestamps"],
+        "players": players,
+        "goldLead": gold_lead,
+        "objectives": [
+            {"timestamp": int(event["timestamp"]), "type": OBJECTIVES[event["objective"]],
+             "teamId": 100 if event["team"] == 0 else 200}
+            for event in timeline.events
+        ],
+    }
+
+@app.get("/api/matches/{match_id}/timeline")
+async def get_timeline(match_id: str, points: int = 40):
+    """Gold/XP/CS/damage curves and objective timings for one match, downsampled to `points` per series"""
+    if points < 2 or points > MAX_TIMELINE_POINTS:
+        raise HTTPException(status_code=400, detail=f"points must be between 2 and {MAX_TIMELINE_POINTS}")
+
+    async def load():
+        match, timeline = await asyncio.gather(get_match_details(match_id), get_match_timeline(match_id))
+        body = orjson.dumps(summarize_timeline(match_id, match, timeline, points))
+        return body, etag_for(body)
+
+    try:
+        body, etag = await timeline_payload_cache.get_or_load((match_id, points), load)
+        return Response(body, media_type="application/json",
+                        headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in /api/matches/{match_id}/timeline")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/match-stats")
 async def get_match_stats(request: MatchRequest):
     """Get last match stats for a group of players - returns ALL 10 players with MVP rankings"""
     try:
-        # Get PUUIDs for searched players
-        searched_player_puuids = []
-        for player in request.players:
-            puuid = await get_puuid(player.game_name, player.tag_line)
-            searched_player_puuids.append({
-                "puuid": puuid,
-                "game_name": player.game_name,
-                "tag_line": player.tag_line
-            })
-
-        # Get the most recent match from first player
-        match_id = await get_last_match(searched_player_puuids[0]["puuid"])
-
-        # Get match details
-        match_data = await get_match_details(match_id)
-
-        # Extract ALL participants from the match
-        participants = match_data["info"]["participants"]
-
-        # Get all PUUIDs from match
-        all_puuids = [p["puuid"] for p in participants]
-
-        # Get summoner data for ALL players in the match
-        summoner_tasks = [get_summoner_data(puuid) for puuid in all_puuids]
-        summoner_data_list = await asyncio.gather(*summoner_tasks)
-
-        # Build stats for ALL 10 players
-        player_stats = []
-
-        for idx, participant in enumerate(participants):
-            summoner_info = summoner_data_list[idx] if idx < len(summoner_data_list) else None
-            rank_info = summoner_info["rank"] if summoner_info else None
-
-            mvp_score = calculate_mvp_score(participant)
-
-            player_stats.append({
-                "gameName": participant.get("riotIdGameName") or participant.get("summonerName", "Unknown"),
-                "tagLine": participant.get("riotIdTagLine", ""),
-                "champion": participant["championName"],
-                "kills": participant["kills"],
-                "deaths": participant["deaths"],
-                "assists": participant["assists"],
-                "kda": round((participant["kills"] + participant["assists"]) / max(participant["deaths"], 1), 2),
-                "cs": participant["totalMinionsKilled"] + participant["neutralMinionsKilled"],
-                "gold": participant["goldEarned"],
-                "damage": participant["totalDamageDealtToChampions"],
-                "damageTaken": participant["totalDamageTaken"],
-                "visionScore": participant["visionScore"],
-                "items": [
-                    participant["item0"],
-                    participant["item1"],
-                    participant["item2"],
-                    participant["item3"],
-                    participant["item4"],
-                    participant["item5"],
-                    participant["item6"]
-                ],
-                "win": participant["win"],
-                "mvpScore": mvp_score,
-                "goldPerMinute": round(participant["goldEarned"] / (participant["timePlayed"] / 60), 2),
-                "damagePerMinute": round(participant["totalDamageDealtToChampions"] / (participant["timePlayed"] / 60), 2),
-                "killParticipation": round(participant.get("challenges", {}).get("killParticipation", 0) * 100, 1),
-                "teamId": participant["teamId"],  # Add team info (100 or 200)
-                "rank": {
-                    "tier": rank_info["tier"] if rank_info else "UNRANKED",
-                    "division": rank_info["rank"] if rank_info else "",
-                    "lp": rank_info["leaguePoints"] if rank_info else 0
-                } if rank_info else None
-            })
-
-        # Sort by MVP score (all 10 players ranked together)
-        player_stats.sort(key=lambda x: x["mvpScore"], reverse=True)
-
-        # Add rankings (1-10)
-        for idx, player in enumerate(player_stats):
-            player["ranking"] = idx + 1
-
-        # Match summary
-        game_duration = match_data["info"]["gameDuration"]
-        game_mode = match_data["info"]["gameMode"]
-        game_creation = datetime.fromtimestamp(match_data["info"]["gameCreation"] / 1000)
-
-        return {
-            "matchId": match_id,
-            "gameCreation": game_creation.isoformat(),
-            "gameDuration": game_duration,
-            "gameMode": game_mode,
-            "players": player_stats
-        }
+        platform = resolve_platform(request.platform)
+        if not request.players:
+            raise HTTPException(status_code=400, detail="Please provide at least one player")
+        # Only the first player's last match is shown; the order of the others doesn't matter
+        first, others = request.players[0], request.players[1:]
+        players = [first] + sorted(others, key=lambda p: (p.game_name.lower(), p.tag_line.lower()))
+        return await cached_response("match-stats", players, platform, (),
+                                     lambda: build_match_stats(request.players, platform))
 
     except HTTPException:
         raise
     except Exception as e:
+        logger.exception("Unhandled error in /api/match-stats")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def build_match_stats(players: List[PlayerInput], platform: str):
+    """All 10 players of the first player's last match with ranks and MVP rankings; complete unless a rank failed"""
+    # Get PUUIDs for searched players (resolved in parallel)
+    puuids = await asyncio.gather(*(get_puuid(p.game_name, p.tag_line, platform) for p in players))
+    searched_player_puuids = [
+        {
+            "puuid": puuid,
+            "game_name": player.game_name,
+            "tag_line": player.tag_line
+        }
+        for player, puuid in zip(players, puuids)
+    ]
+
+    # Get the most recent match from first player
+    match_id = await get_last_match(searched_player_puuids[0]["puuid"], platform)
+
+    # Get match details
+    match = await get_match_details(match_id)
+
+    # Extract ALL participants from the match
+    participants = match.participants
+
+    # Get all PUUIDs from match
+    all_puuids = [p.puuid for p in participants]
+
+    # Get summoner data for ALL players in the match
+    summoner_tasks = [get_summoner_data_or_unknown(puuid, platform) for puuid in all_puuids]
+    summoner_data_list = await asyncio.gather(*summoner_tasks)
+
+    # Scores, rates and rankings for all 10 players in one pass
+    derived = ParticipantTable([match]).derived_stats()
+
+    # Build stats for ALL 10 players
+    player_stats = []
+
+    for idx, participant in enumerate(participants):
+        summoner_info = summoner_data_list[idx] if idx < len(summoner_data_list) else None
+        rank_info = summoner_info["rank"] if summoner_info else None
+
+        player_stats.append({
+            "gameName": participant.game_name,
+            "tagLine": participant.tag_line,
+            "champion": participant.champion,
+            "kills": participant.kills,
+            "deaths": participant.deaths,
+            "assists": participant.assists,
+            "kda": derived["kda"][idx],
+            "cs": participant.cs,
+            "gold": participant.gold,
+            "damage": participant.damage,
+            "damageTaken": participant.damage_taken,
+            "visionScore": participant.vision_score,
+            "items": participant.items,
+            "win": participant.win,
+            "mvpScore": derived["mvpScore"][idx],
+            "goldPerMinute": derived["goldPerMinute"][idx],
+            "damagePerMinute": derived["damagePerMinute"][idx],
+            "killParticipation": derived["killParticipation"][idx],
+            "teamId": participant.team_id,  # Add team info (100 or 200)
+            "rank": {
+                "tier": rank_info["tier"] if rank_info else "UNRANKED",
+                "division": rank_info["rank"] if rank_info else "",
+                "lp": rank_info["leaguePoints"] if rank_info else 0
+            } if rank_info else None
+        })
+
+    # Sort by MVP score (all 10 players ranked together)
+    player_stats.sort(key=lambda x: x["mvpScore"], reverse=True)
+
+    # Add rankings (1-10)
+    for idx, player in enumerate(player_stats):
+        player["ranking"] = idx + 1
+
+    # Match summary
+    game_creation = datetime.fromtimestamp(match.game_creation / 1000)
+
+    response = {
+        "matchId": match_id,
+        "gameCreation": game_creation.isoformat(),
+        "gameDuration": match.game_duration,
+        "gameMode": match.game_mode,
+        "players": player_stats
+    }
+    return response, not any("error" in summoner_data for summoner_data in summoner_data_list)
+
 @app.post("/api/last-5-matches")
 async def get_last_5_matches(request: MatchRequest):
-    """Get last 5 matches stats for a single player with averages and MVP rankings"""
+    """Get last 5 (or `count`) matches stats for a single player with averages and MVP rankings"""
     try:
         if len(request.players) != 1:
             raise HTTPException(status_code=400, detail="Please provide exactly one player for last 5 matches")
 
-        player = request.players[0]
+        platform = resolve_platform(request.platform)
+        count = resolve_count(request.count)
+        return await cached_response("last-5-matches", request.players, platform, (count, request.slim),
+                                     lambda: build_last_matches(request.players[0], platform, count, request.slim))
 
-        # Get PUUID
-        puuid = await get_puuid(player.game_name, player.tag_line)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in /api/last-5-matches")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Get last 5 match IDs
-        match_ids = await get_last_n_matches(puuid, count=5)
+async def build_last_matches(player: PlayerInput, platform: str, count: int, slim: bool):
+    """One player's last `count` matches with averages; complete unless some games or the rank failed"""
+    # Get PUUID
+    puuid = await get_puuid(player.game_name, player.tag_line, platform)
+
+    # Get last N match IDs and summoner data in parallel
+    match_ids, summoner_data = await asyncio.gather(
+        get_last_n_matches(puuid, count=count, platform=platform),
+        get_summoner_data_or_unknown(puuid, platform)
+    )
+
+    if not match_ids:
+        raise HTTPException(status_code=404, detail="No recent ranked flex matches found")
+
+    # Fetch all match details in parallel; games that fail are listed in failedMatches
+    match_ids, matches, failed_matches = await gather_available_matches(match_ids)
+
+    all_matches, table = summarize_matches(match_ids, matches, puuid, slim)
+    player_totals = window_totals(table, table.rows_for(puuid))
+
+    # Calculate averages
+    games_count = player_totals["games"]
+    averages = calculate_averages(player_totals)
+
+    response = {
+        "player": player_summary(player, summoner_data["rank"]),
+        "matches": all_matches,
+        "averages": averages,
+        "totalGames": games_count
+    }
+    if failed_matches:
+        response["failedMatches"] = failed_matches
+    return response, not failed_matches and "error" not in summoner_data
+
+def summarize_compared_player(player: PlayerInput, games: List[dict], player_totals: dict, summoner_data: dict,
+                              failed_matches: Optional[List[dict]] = None):
+    """One player's comparison entry: averages, MVP/top 3/troll counts and per-match rows.
+
+    games are the player's pre-scored rows from the player stats store, and
+    player_totals their totals (see PlayerStatsStore.totals_for).
+    failed_matches (games that could not be loaded) is included only when non-empty.
+    """
+
+    match_details = []
+
+    for game in games:
+        match_details.append({
+            "matchId": game["match_id"],
+            "champion": game["champion"],
+            "kills": game["kills"],
+            "deaths": game["deaths"],
+            "assists": game["assists"],
+            "kda": game["kda"],
+            "win": bool(game["wins"]),
+            "mvpScore": game["mvp_score"],
+            "ranking": game["ranking"],
+            "gameCreation": datetime.fromtimestamp(game["game_creation"] / 1000).isoformat(),
+        })
+
+    # Calculate averages
+    games_count = player_totals["games"]
+    averages = calculate_averages(player_totals)
+
+    entry = {
+        "player": player_summary(player, summoner_data["rank"]),
+        "averages": averages,
+        "performance": performance_counts(player_totals),
+        "totalGames": games_count,
+        "matches": match_details
+    }
+    if failed_matches:
+        entry["failedMatches"] = failed_matches
+    return entry
+
+async def load_compared_player(player: PlayerInput, platform: str, scope: RequestScope, count: int = 5):
+    """PUUID, pre-scored games and their totals, rank and failed matches for one compared player.
+
+    Games already in the player stats store are read from there; only
+    matches it hasn't seen are loaded (and recorded).
+    """
+    puuid = await scope.run(
+        ("puuid", player.game_name.lower(), player.tag_line.lower()),
+        lambda: get_puuid(player.game_name, player.tag_line, platform)
+    )
+    match_ids, summoner_data = await asyncio.gather(
+        scope.run(("ids", puuid, platform, count), lambda: get_last_n_matches(puuid, count=count, platform=platform)),
+        get_summoner_data_or_unknown(puuid, platform)
+    )
+    player_stats = app.state.player_stats
+    games = await asyncio.to_thread(lambda: player_stats.open().games_for(puuid, match_ids))
+    failed_matches = []
+    if len(games) < len(match_ids):
+        recorded = {game["match_id"] for game in games}
+        missing = [match_id for match_id in match_ids if match_id not in recorded]
+        _, matches, failed_matches = await gather_available_matches(missing, scope)
+        await asyncio.to_thread(lambda: player_stats.open().record_matches(matches))
+        games = await asyncio.to_thread(lambda: player_stats.open().games_for(puuid, match_ids))
+    if not failed_matches:
+        # Their newest games are all recorded now - lets them onto the global leaderboard
+        await asyncio.to_thread(lambda: player_stats.open().mark_synced(puuid, match_ids))
+    totals = await asyncio.to_thread(lambda: player_stats.open().totals_for(puuid, match_ids))
+    return puuid, games, totals, summoner_data, failed_matches
+
+async def build_comparison(players: List[PlayerInput], platform: str, scope: RequestScope, count: int = 5):
+    """Last `count` matches stats, averages and MVP performance for each player, best first.
+
+    Fetches go through scope, so players and matches shared with other
+    comparisons in the same request are only fetched once. Returns
+    (comparison, complete) - complete is False if any game or rank failed.
+    """
+    # Resolve every player (and their matches) concurrently
+    loaded_players = await asyncio.gather(*(load_compared_player(p, platform, scope, count) for p in players))
+
+    all_player_stats = []
+
+    for player, (puuid, games, totals, summoner_data, failed_matches) in zip(players, loaded_players):
+        if not games:
+            # Skip players with no matches
+            continue
+
+        player_stats = summarize_compared_player(player, games, totals, summoner_data, failed_matches)
+        all_player_stats.append(player_stats)
+
+    # Sort by average MVP score (best to worst)
+    all_player_stats.sort(key=lambda x: x["averages"]["mvpScore"], reverse=True)
+
+    complete = not any(failed or "error" in summoner_data for _, _, _, summoner_data, failed in loaded_players)
+    return {
+        "players": all_player_stats,
+        "comparedPlayers": len(all_player_stats)
+    }, complete
+
+@app.post("/api/last-5-matches/stream")
+async def stream_last_5_matches(request: MatchRequest):
+    """Streaming variant of /api/last-5-matches (NDJSON, one record per line).
+
+    Sends a "player" record first, then a "match" record (with its position
+    in the history as "index") as soon as each game is ready, and finally a
+    "summary" record with the averages. A game that fails produces an
+    "error" record and is left out of the summary.
+    """
+    try:
+        if len(request.players) != 1:
+            raise HTTPException(status_code=400, detail="Please provide exactly one player for last 5 matches")
+
+        platform = resolve_platform(request.platform)
+        count = resolve_count(request.count)
+        player = request.players[0]
+        puuid = await get_puuid(player.game_name, player.tag_line, platform)
+        match_ids, summoner_data = await asyncio.gather(
+            get_last_n_matches(puuid, count=count, platform=platform),
+            get_summoner_data_or_unknown(puuid, platform)
+        )
 
         if not match_ids:
             raise HTTPException(status_code=404, detail="No recent ranked flex matches found")
 
-        # Get summoner data
-        summoner_data = await get_summoner_data(puuid)
-
-        all_matches = []
-        player_totals = {
-            "kills": 0,
-            "deaths": 0,
-            "assists": 0,
-            "cs": 0,
-            "gold": 0,
-            "damage": 0,
-            "visionScore": 0,
-            "mvpScore": 0,
-            "wins": 0,
-            "games": 0
-        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in /api/last-5-matches/stream")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Fetch details for each match
-        for match_id in match_ids:
-            match_data = await get_match_details(match_id)
-            participants = match_data["info"]["participants"]
-
-            # Find all players in this match
-            match_player_stats = []
-            player_participant = None
-
-            for participant in participants:
-                mvp_score = calculate_mvp_score(participant)
-
-                player_stat = {
-                    "puuid": participant["puuid"],
-                    "gameName": participant.get("riotIdGameName") or participant.get("summonerName", "Unknown"),
-                    "tagLine": participant.get("riotIdTagLine", ""),
-                    "champion": participant["championName"],
-                    "kills": participant["kills"],
-                    "deaths": participant["deaths"],
-                    "assists": participant["assists"],
-                    "kda": round((participant["kills"] + participant["assists"]) / max(participant["deaths"], 1), 2),
-                    "cs": participant["totalMinionsKilled"] + participant["neutralMinionsKilled"],
-                    "gold": participant["goldEarned"],
-                    "damage": participant["totalDamageDealtToChampions"],
-                    "visionScore": participant["visionScore"],
-                    "win": participant["win"],
-                    "mvpScore": mvp_score,
-                    "items": [
-                        participant["item0"],
-                        participant["item1"],
-                        participant["item2"],
-                        participant["item3"],
-                        participant["item4"],
-                        participant["item5"],
-                        participant["item6"]
-                    ],
+    async def fetch(index: int, match_id: str):
+        try:
+            return index, match_id, await get_match_details(match_id), None
+        except Exception as e:
+            return index, match_id, None, e
+
+    async def records():
+        yield ndjson({
+            "type": "player",
+            "player": player_summary(player, summoner_data["rank"]),
+            "totalMatches": len(match_ids)
+        })
+
+        loaded = {}
+        tasks = [asyncio.ensure_future(fetch(i, m)) for i, m in enumerate(match_ids)]
+        try:
+            for next_match in asyncio.as_completed(tasks):
+                index, match_id, match, error = await next_match
+                if error:
+                    yield ndjson({**error_record(error), "index": index, "matchId": match_id})
+                    continue
+                loaded[index] = match
+                yield ndjson({"type": "match", "index": index, **summarize_match(match_id, match, puuid, request.slim)})
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        # Totals in history order, so the averages match the non-streaming endpoint
+        table = ParticipantTable([loaded[index] for index in sorted(loaded)])
+        player_totals = window_totals(table, table.rows_for(puuid))
+        yield ndjson({
+            "type": "summary",
+            "averages": calculate_averages(player_totals),
+            "totalGames": player_totals["games"]
+        })
+
+    return StreamingResponse(records(), media_type="application/x-ndjson", headers=STREAM_HEADERS)
+
+@app.post("/api/compare-players/stream")
+async def stream_compare_players(request: MatchRequest):
+    """Streaming variant of /api/compare-players (NDJSON, one record per line).
+
+    Sends a "player" record (same fields as a /api/compare-players entry,
+    plus the player's "index" in the request) as soon as each player is
+    ready, then a "summary" record with the rankings by average MVP score.
+    A player that fails, or has no recent games, produces an "error" record
+    and is left out.
+    """
+    if len(request.players) < 1 or len(request.players) > 5:
+        raise HTTPException(status_code=400, detail="Please provide 1-5 players for comparison")
+    platform = resolve_platform(request.platform)
+    count = resolve_count(request.count)
+
+    async def load(index: int, player: PlayerInput):
+        try:
+            return index, player, await load_compared_player(player, platform, scope, count), None
+        except Exception as e:
+            return index, player, None, e
+
+    async def records():
+        entries = {}
+        tasks = [asyncio.ensure_future(load(i, p)) for i, p in enumerate(request.players)]
+        try:
+            for next_player in asyncio.as_completed(tasks):
+                index, player, loaded, error = await next_player
+                if error:
+                    yield ndjson({
+                        **error_record(error),
+                        "index": index,
+                        "gameName": player.game_name,
+                        "tagLine": player.tag_line
+                    })
+                    continue
+                puuid, games, totals, summoner_data, failed_matches = loaded
+                if not games:
+                    # Left out like in /api/compare-players, but say so
+                    yield ndjson({
+                        "type": "error",
+                        "status": 404,
+                        "detail": "No recent ranked flex matches found",
+                        "index": index,
+                        "gameName": player.game_name,
+                        "tagLine": player.tag_line
+                    })
+                    continue
+                entries[index] = summarize_compared_player(player, games, totals, summoner_data, failed_matches)
+                yield ndjson({"type": "player", "index": index, **entries[index]})
+        finally:
+            for task in tasks:
+                task.cancel()
+            scope.close()
+
+        # Same stable ordering as the non-streaming endpoint
+        ranked = sorted(sorted(entries), key=lambda i: entries[i]["averages"]["mvpScore"], reverse=True)
+        yield ndjson({
+            "type": "summary",
+            "rankings": [
+                {
+                    "position": position + 1,
+                    "index": index,
+                    "gameName": entries[index]["player"]["gameName"],
+                    "tagLine": entries[index]["player"]["tagLine"],
+                    "mvpScore": entries[index]["averages"]["mvpScore"]
                 }
+                for position, index in enumerate(ranked)
+            ],
+            "comparedPlayers": len(ranked)
+        })
 
-                match_player_stats.append(player_stat)
-
-                # Track the requested player
-                if participant["puuid"] == puuid:
-                    player_participant = player_stat
-
-            # Sort players by MVP score for this match
-            match_player_stats.sort(key=lambda x: x["mvpScore"], reverse=True)
-
-            # Add rankings
-            for idx, p in enumerate(match_player_stats):
-                p["ranking"] = idx + 1
-
-            # Add to totals if player found
-            if player_participant:
-                player_totals["kills"] += player_participant["kills"]
-                player_totals["deaths"] += player_participant["deaths"]
-                player_totals["assists"] += player_participant["assists"]
-                player_totals["cs"] += player_participant["cs"]
-                player_totals["gold"] += player_participant["gold"]
-                player_totals["damage"] += player_participant["damage"]
-                player_totals["visionScore"] += player_participant["visionScore"]
-                player_totals["mvpScore"] += player_participant["mvpScore"]
-                player_totals["wins"] += 1 if player_participant["win"] else 0
-                player_totals["games"] += 1
-
-            game_duration = match_data["info"]["gameDuration"]
-            game_creation = datetime.fromtimestamp(match_data["info"]["gameCreation"] / 1000)
-
-            all_matches.append({
-                "matchId": match_id,
-                "gameCreation": game_creation.isoformat(),
-                "gameDuration": game_duration,
-                "gameMode": match_data["info"]["gameMode"],
-                "win": player_participant["win"] if player_participant else False,
-                "players": match_player_stats,
-                "requestedPlayer": player_participant
-            })
-
-        # Calculate averages
-        games_count = player_totals["games"]
-        averages = {
-            "kills": round(player_totals["kills"] / games_count, 1) if games_count > 0 else 0,
-            "deaths": round(player_totals["deaths"] / games_count, 1) if games_count > 0 else 0,
-            "assists": round(player_totals["assists"] / games_count, 1) if games_count > 0 else 0,
-            "kda": round((player_totals["kills"] + player_totals["assists"]) / max(player_totals["deaths"], 1), 2),
-            "cs": round(player_totals["cs"] / games_count, 1) if games_count > 0 else 0,
-            "gold": round(player_totals["gold"] / games_count, 0) if games_count > 0 else 0,
-            "damage": round(player_totals["damage"] / games_count, 0) if games_count > 0 else 0,
-            "visionScore": round(player_totals["visionScore"] / games_count, 1) if games_count > 0 else 0,
-            "mvpScore": round(player_totals["mvpScore"] / games_count, 2) if games_count > 0 else 0,
-            "winRate": round((player_totals["wins"] / games_count * 100), 1) if games_count > 0 else 0,
-        }
+    scope = RequestScope()
+    return StreamingResponse(records(), media_type="application/x-ndjson", headers=STREAM_HEADERS)
 
-        rank_info = summoner_data["rank"]
+@app.post("/api/compare-players")
+async def compare_players(request: MatchRequest):
+    """Compare last 5 (or `count`) matches for multiple players (1-5 players)"""
+    try:
+        if len(request.players) < 1 or len(request.players) > 5:
+            raise HTTPException(status_code=400, detail="Please provide 1-5 players for comparison")
 
-        return {
-            "player": {
-                "gameName": player.game_name,
-                "tagLine": player.tag_line,
-                "rank": {
-                    "tier": rank_info["tier"] if rank_info else "UNRANKED",
-                    "division": rank_info["rank"] if rank_info else "",
-                    "lp": rank_info["leaguePoints"] if rank_info else 0
-                } if rank_info else None
-            },
-            "matches": all_matches,
-            "averages": averages,
-            "totalGames": games_count
+        platform = resolve_platform(request.platform)
+        count = resolve_count(request.count)
+
+        async def build():
+            scope = RequestScope()
+            try:
+                return await build_comparison(request.players, platform, scope, count)
+            finally:
+                scope.close()
+
+        return await cached_response("compare-players", request.players, platform, (count,), build)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in /api/compare-players")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/batch/compare-players")
+async def batch_compare_players(request: BatchRequest):
+    """Compare players for many squads at once - each group may use its own platform.
+
+    PUUID, league and match fetches are shared across the whole batch, and a
+    failing group reports its error without failing the others.
+    """
+    try:
+        if len(request.groups) < 1 or len(request.groups) > MAX_BATCH_GROUPS:
+            raise HTTPException(status_code=400, detail=f"Please provide 1-{MAX_BATCH_GROUPS} groups")
+
+        scope = RequestScope()
+
+        async def compare_group(group: PlayerGroup):
+            try:
+                if len(group.players) < 1 or len(group.players) > 5:
+                    raise HTTPException(status_code=400, detail="Please provide 1-5 players for comparison")
+                platform = resolve_platform(group.platform)
+                count = resolve_count(group.count)
+                result, _ = await build_comparison(group.players, platform, scope, count)
+                return {"name": group.name, "platform": platform, **result}
+            except HTTPException as e:
+                return {"name": group.name, "platform": group.platform, "error": e.detail, "status": e.status_code}
+            except Exception as e:
+                logger.exception("Unhandled error in batch group %r", group.name)
+                return {"name": group.name, "platform": group.platform, "error": str(e), "status": 500}
+
+        try:
+            results = await asyncio.gather(*(compare_group(g) for g in request.groups))
+        finally:
+            scope.close()
+
+        return ORJSONResponse({
+            "groups": results,
+            "totalGroups": len(results)
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in /api/batch/compare-players")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def resolve_window(window: int) -> int:
+    """Validate a leaderboard window (one of LEADERBOARD_WINDOWS)"""
+    if window not in LEADERBOARD_WINDOWS:
+        raise HTTPException(status_code=400, detail=f"window must be one of {LEADERBOARD_WINDOWS}")
+    return window
+
+def leaderboard_entries(entries: List[dict], players: Optional[dict] = None):
+    """Ranked leaderboard rows; players maps puuid -> player_summary for squad leaderboards"""
+    return [
+        {
+            "position": position + 1,
+            **(players[entry["puuid"]] if players else {"gameName": entry["game_name"], "tagLine": entry["tag_line"]}),
+            "puuid": entry["puuid"],
+            "averages": calculate_averages(entry["totals"]),
+            "performance": performance_counts(entry["totals"]),
+            "totalGames": entry["totals"]["games"],
         }
+        for position, entry in enumerate(entries)
+    ]
+
+@app.get("/api/leaderboard")
+async def get_leaderboard(window: int = LEADERBOARD_WINDOWS[0], limit: int = 20):
+    """Top players by average MVP score over their last `window` games (index lookup over every synced player)"""
+    try:
+        window = resolve_window(window)
+        if limit < 1 or limit > 100:
+            raise HTTPException(status_code=400, detail="limit must be between 1 and 100")
+        entries = await asyncio.to_thread(lambda: app.state.player_stats.open().leaderboard(window, limit))
+        return ORJSONResponse({"window": window, "players": leaderboard_entries(entries)})
 
     except HTTPException:
         raise
     except Exception as e:
+        logger.exception("Unhandled error in /api/leaderboard")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/compare-players")
-async def compare_players(request: MatchRequest):
-    """Compare last 5 matches for multiple players (1-5 players)"""
+@app.post("/api/leaderboard")
+async def squad_leaderboard(request: MatchRequest):
+    """Rank 1-5 players by average MVP score over their last `count` games (count must be a leaderboard window).
+
+    Brings each player's recent games into the player stats store first
+    (only unseen matches are loaded), then reads the ranking from the index.
+    """
     try:
         if len(request.players) < 1 or len(request.players) > 5:
             raise HTTPException(status_code=400, detail="Please provide 1-5 players for comparison")
+        platform = resolve_platform(request.platform)
+        window = resolve_window(request.count)
+
+        scope = RequestScope()
+        try:
+            loaded = await asyncio.gather(*(load_compared_player(p, platform, scope, window) for p in request.players))
+        finally:
+            scope.close()
+        players = {
+            puuid: player_summary(player, summoner_data["rank"])
+            for player, (puuid, _, _, summoner_data, _) in zip(request.players, loaded)
+        }
+        entries = await asyncio.to_thread(
+            lambda: app.state.player_stats.open().leaderboard(window, len(players), 1, list(players))
+        )
+        return ORJSONResponse({"window": window, "players": leaderboard_entries(entries, players)})
 
-        all_player_stats = []
-
-        for player in request.players:
-            # Get PUUID
-            puuid = await get_puuid(player.game_name, player.tag_line)
-
-            # Get last 5 match IDs
-            match_ids = await get_last_n_matches(puuid, count=5)
-
-            if not match_ids:
-                # Skip players with no matches
-                continue
-
-            # Get summoner data
-            summoner_data = await get_summoner_data(puuid)
-
-            player_totals = {
-                "kills": 0,
-                "deaths": 0,
-                "assists": 0,
-                "cs": 0,
-                "gold": 0,
-                "damage": 0,
-                "visionScore": 0,
-                "mvpScore": 0,
-                "wins": 0,
-                "games": 0,
-                "mvp_count": 0,  # Times ranked #1
-                "top3_count": 0,  # Times ranked top 3
-                "troll_count": 0,  # Times ranked last (10th)
-            }
-
-            match_details = []
-
-            # Fetch details for each match
-            for match_id in match_ids:
-                match_data = await get_match_details(match_id)
-                participants = match_data["info"]["participants"]
-
-                # Find this player in participants
-                player_participant = next(
-                    (p for p in participants if p["puuid"] == puuid),
-                    None
-                )
-
-                if player_participant:
-                    # Calculate MVP scores for all players in this match
-                    all_mvp_scores = []
-                    for p in participants:
-                        mvp_score = calculate_mvp_score(p)
-                        all_mvp_scores.append({"puuid": p["puuid"], "mvpScore": mvp_score})
-
-                    # Sort to get rankings
-                    all_mvp_scores.sort(key=lambda x: x["mvpScore"], reverse=True)
-
-                    # Find player's ranking
-                    player_ranking = next(
-                        (idx + 1 for idx, item in enumerate(all_mvp_scores) if item["puuid"] == puuid),
-                        11
-                    )
-
-                    player_mvp_score = calculate_mvp_score(player_participant)
-
-                    # Update totals
-                    player_totals["kills"] += player_participant["kills"]
-                    player_totals["deaths"] += player_participant["deaths"]
-                    player_totals["assists"] += player_participant["assists"]
-                    player_totals["cs"] += player_participant["totalMinionsKilled"] + player_participant["neutralMinionsKilled"]
-                    player_totals["gold"] += player_participant["goldEarned"]
-                    player_totals["damage"] += player_participant["totalDamageDealtToChampions"]
-                    player_totals["visionScore"] += player_participant["visionScore"]
-                    player_totals["mvpScore"] += player_mvp_score
-                    player_totals["wins"] += 1 if player_participant["win"] else 0
-                    player_totals["games"] += 1
-
-                    # Track MVP performance
-                    if player_ranking == 1:
-                        player_totals["mvp_count"] += 1
-                    if player_ranking <= 3:
-                        player_totals["top3_count"] += 1
-                    if player_ranking == 10:
-                        player_totals["troll_count"] += 1
-
-                    match_details.append({
-                        "matchId": match_id,
-                        "champion": player_participant["championName"],
-                        "kills": player_participant["kills"],
-                        "deaths": player_participant["deaths"],
-                        "assists": player_participant["assists"],
-                        "kda": round((player_participant["kills"] + player_participant["assists"]) / max(player_participant["deaths"], 1), 2),
-                        "win": player_participant["win"],
-                        "mvpScore": player_mvp_score,
-                        "ranking": player_ranking,
-                        "gameCreation": datetime.fromtimestamp(match_data["info"]["gameCreation"] / 1000).isoformat(),
-                    })
-
-            # Calculate averages
-            games_count = player_totals["games"]
-            averages = {
-                "kills": round(player_totals["kills"] / games_count, 1) if games_count > 0 else 0,
-                "deaths": round(player_totals["deaths"] / games_count, 1) if games_count > 0 else 0,
-                "assists": round(player_totals["assists"] / games_count, 1) if games_count > 0 else 0,
-                "kda": round((player_totals["kills"] + player_totals["assists"]) / max(player_totals["deaths"], 1), 2),
-                "cs": round(player_totals["cs"] / games_count, 1) if games_count > 0 else 0,
-                "gold": round(player_totals["gold"] / games_count, 0) if games_count > 0 else 0,
-                "damage": round(player_totals["damage"] / games_count, 0) if games_count > 0 else 0,
-                "visionScore": round(player_totals["visionScore"] / games_count, 1) if games_count > 0 else 0,
-                "mvpScore": round(player_totals["mvpScore"] / games_count, 2) if games_count > 0 else 0,
-                "winRate": round((player_totals["wins"] / games_count * 100), 1) if games_count > 0 else 0,
-            }
-
-            rank_info = summoner_data["rank"]
-
-            all_player_stats.append({
-                "player": {
-                    "gameName": player.game_name,
-                    "tagLine": player.tag_line,
-                    "rank": {
-                        "tier": rank_info["tier"] if rank_info else "UNRANKED",
-                        "division": rank_info["rank"] if rank_info else "",
-                        "lp": rank_info["leaguePoints"] if rank_info else 0
-                    } if rank_info else None
-                },
-                "averages": averages,
-                "performance": {
-                    "mvpCount": player_totals["mvp_count"],
-                    "top3Count": player_totals["top3_count"],
-                    "trollCount": player_totals["troll_count"],
-                },
-                "totalGames": games_count,
-                "matches": match_details
-            })
-
-        # Sort by average MVP score (best to worst)
-        all_player_stats.sort(key=lambda x: x["averages"]["mvpScore"], reverse=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Unhandled error in POST /api/leaderboard")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        return {
-            "players": all_player_stats,
-            "comparedPlayers": len(all_player_stats)
-        }
+@app.get("/api/players/{puuid}/stats")
+async def get_player_stats(puuid: str):
+    """A player's aggregates over every game the backend has seen: totals, MVP ranking histogram,
+    per-champion splits and the leaderboard windows"""
+    try:
+        profile = await asyncio.to_thread(lambda: app.state.player_stats.open().profile(puuid))
+        if profile is None:
+            raise HTTPException(status_code=404, detail="No games recorded for this player")
+        return ORJSONResponse({
+            "puuid": puuid,
+            "gameName": profile["game_name"],
+            "tagLine": profile["tag_line"],
+            "averages": calculate_averages(profile["totals"]),
+            "performance": performance_counts(profile["totals"]),
+            "totalGames": profile["totals"]["games"],
+            "rankings": [{"ranking": ranking, "games": games} for ranking, games in profile["rankings"].items()],
+            "champions": [
+                {
+                    "champion": c["champion"],
+                    "games": c["games"],
+                    "winRate": round(c["wins"] / c["games"] * 100, 1),
+                    "kda": round((c["kills"] + c["assists"]) / max(c["deaths"], 1), 2),
+                    "mvpScore": round(c["mvp_score"] / c["games"], 2),
+                }
+                for c in profile["champions"]
+            ],
+            "windows": [
+                {
+                    "window": window,
+                    "averages": calculate_averages(totals),
+                    "performance": performance_counts(totals),
+                    "totalGames": totals["games"],
+                }
+                for window, totals in profile["windows"].items()
+            ],
+        })
 
     except HTTPException:
         raise
     except Exception as e:
+        logger.exception("Unhandled error in /api/players/{puuid}/stats")
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Several workers need the import string so each process can load the app
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=WEB_CONCURRENCY)
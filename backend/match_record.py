@@ -0,0 +1,123 @@
+from typing import List, Optional
+
+# Bump when the compact stored layout changes; older stored rows are re-fetched
+COMPACT_VERSION = 2
+
+# match-v5 queueId of ranked flex, the only queue match histories are read from
+RANKED_FLEX_QUEUE = 440
+
+
+class Participant:
+    """The fields of one match-v5 participant the dashboard actually reads"""
+
+    __slots__ = (
+        "puuid", "game_name", "tag_line", "champion", "kills", "deaths", "assists", "cs", "gold",
+        "damage", "damage_taken", "vision_score", "items", "win", "time_played", "team_id",
+        "damage_share", "kill_participation",
+    )
+
+    def __init__(self, puuid: str, game_name: str, tag_line: str, champion: str, kills: int, deaths: int,
+                 assists: int, cs: int, gold: int, damage: int, damage_taken: int, vision_score: int,
+                 items: List[int], win: bool, time_played: float, team_id: int, damage_share: float,
+                 kill_participation: float):
+        self.puuid = puuid
+        self.game_name = game_name
+        self.tag_line = tag_line
+        self.champion = champion
+        self.kills = kills
+        self.deaths = deaths
+        self.assists = assists
+        self.cs = cs
+        self.gold = gold
+        self.damage = damage
+        self.damage_taken = damage_taken
+        self.vision_score = vision_score
+        self.items = items
+        self.win = win
+        self.time_played = time_played
+        self.team_id = team_id
+        self.damage_share = damage_share
+        self.kill_participation = kill_participation
+
+    @classmethod
+    def from_riot(cls, p: dict) -> "Participant":
+        challenges = p.get("challenges", {})
+        return cls(
+            puuid=p["puuid"],
+            game_name=p.get("riotIdGameName") or p.get("summonerName", "Unknown"),
+            tag_line=p.get("riotIdTagLine", ""),
+            champion=p["championName"],
+            kills=p["kills"],
+            deaths=p["deaths"],
+            assists=p["assists"],
+            cs=p["totalMinionsKilled"] + p["neutralMinionsKilled"],
+            gold=p["goldEarned"],
+            damage=p["totalDamageDealtToChampions"],
+            damage_taken=p["totalDamageTaken"],
+            vision_score=p["visionScore"],
+            items=[p[f"item{i}"] for i in range(7)],
+            win=p["win"],
+            time_played=p["timePlayed"],
+            team_id=p["teamId"],
+            damage_share=challenges.get("teamDamagePercentage", 0),
+            kill_participation=challenges.get("killParticipation", 0),
+        )
+
+    def compact(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+
+class MatchRecord:
+    """Slim projection of a match-v5 document (roughly 2 KB instead of 100+ KB).
+
+    Raw Riot payloads are projected as soon as they arrive; only this record
+    is cached in memory and written to the match store, as a positional
+    list (see compact()).
+    """
+
+    __slots__ = ("match_id", "game_creation", "game_duration", "game_mode", "queue_id", "participants")
+
+    def __init__(self, match_id: str, game_creation: int, game_duration: int, game_mode: str, queue_id: int,
+                 participants: List[Participant]):
+        self.match_id = match_id
+        self.game_creation = game_creation
+        self.game_duration = game_duration
+        self.game_mode = game_mode
+        self.queue_id = queue_id
+        self.participants = participants
+
+    @classmethod
+    def from_riot(cls, match_data: dict) -> "MatchRecord":
+        info = match_data["info"]
+        return cls(
+            match_id=match_data["metadata"]["matchId"],
+            game_creation=info["gameCreation"],
+            game_duration=info["gameDuration"],
+            game_mode=info["gameMode"],
+            queue_id=info.get("queueId", 0),
+            participants=[Participant.from_riot(p) for p in info["participants"]],
+        )
+
+    def compact(self) -> list:
+        """Positional, JSON-ready form used by the match store"""
+        return [
+            COMPACT_VERSION, self.match_id, self.game_creation, self.game_duration, self.game_mode, self.queue_id,
+            [p.compact() for p in self.participants],
+        ]
+
+    @classmethod
+    def from_compact(cls, data: list) -> "MatchRecord":
+        _, match_id, game_creation, game_duration, game_mode, queue_id, participants = data
+        return cls(match_id, game_creation, game_duration, game_mode, queue_id, [Participant(*p) for p in participants])
+
+    @classmethod
+    def from_stored(cls, data) -> Optional["MatchRecord"]:
+        """Load the compact form, or a full match-v5 document stored by older versions.
+
+        Returns None for an outdated compact layout so the match is fetched again.
+        """
+        if isinstance(data, dict):
+            return cls.from_riot(data)
+        if data[0] != COMPACT_VERSION:
+            return None
+        return cls.from_compact(data)
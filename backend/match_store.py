@@ -0,0 +1,171 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from typing import Iterator, List, Optional, Tuple
+
+# Match store configuration (override via environment)
+MATCH_STORE_PATH = os.getenv("MATCH_STORE_PATH", "match_store.sqlite3")
+MATCH_STORE_MAX_ENTRIES = int(os.getenv("MATCH_STORE_MAX_ENTRIES", "20000"))
+MATCH_STORE_MAX_AGE_DAYS = float(os.getenv("MATCH_STORE_MAX_AGE_DAYS", "90"))
+
+# Run eviction once every N writes rather than on every insert
+EVICT_EVERY = 100
+
+
+class MatchStore:
+    """Persistent SQLite store of finished match payloads, keyed by match ID.
+
+    Payloads are stored as zlib-compressed JSON. Entries older than
+    MATCH_STORE_MAX_AGE_DAYS are dropped, and once the store grows past
+    MATCH_STORE_MAX_ENTRIES the least recently read matches are evicted.
+
+    It also keeps each player's known ranked flex match IDs (newest first)
+    so match history can be synced incrementally.
+    """
+
+    def __init__(self, path: str = MATCH_STORE_PATH, max_entries: int = MATCH_STORE_MAX_ENTRIES,
+                 max_age_days: float = MATCH_STORE_MAX_AGE_DAYS):
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.writes_since_evict = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS matches (
+                match_id TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_matches_accessed ON matches (accessed_at)")
+        # seq grows with recency: newer games get higher numbers, backfilled older ones lower
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS player_matches (
+                puuid TEXT NOT NULL,
+                match_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                PRIMARY KEY (puuid, match_id)
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_player_matches_seq ON player_matches (puuid, seq)")
+        # complete = Riot has no older ranked flex games for this player
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS player_sync (
+                puuid TEXT PRIMARY KEY,
+                synced_at REAL NOT NULL,
+                complete INTEGER NOT NULL
+            )"""
+        )
+        self.conn.commit()
+
+    def get(self, match_id: str) -> Optional[dict]:
+        """Return the stored match payload, or None on a miss"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload FROM matches WHERE match_id = ?", (match_id,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE matches SET accessed_at = ? WHERE match_id = ?", (time.time(), match_id)
+            )
+            self.conn.commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, match_id: str, match_data: dict):
+        """Store a match payload, evicting old entries periodically"""
+        payload = zlib.compress(json.dumps(match_data, separators=(",", ":")).encode())
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO matches (match_id, payload, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (match_id, payload, now, now)
+            )
+            self.conn.commit()
+            self.writes_since_evict += 1
+            if self.writes_since_evict >= EVICT_EVERY:
+                self._evict()
+
+    def recent(self, limit: int) -> List[Tuple[str, dict]]:
+        """The most recently read matches as (match_id, payload), least recent first - for warming caches"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT match_id, payload FROM matches ORDER BY accessed_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [(match_id, json.loads(zlib.decompress(payload))) for match_id, payload in reversed(rows)]
+
+    def iter_all(self, batch_size: int = 500) -> Iterator[Tuple[str, dict]]:
+        """Every stored match as (match_id, payload), read a batch at a time so writers aren't held up"""
+        last = ""
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT match_id, payload FROM matches WHERE match_id > ? ORDER BY match_id LIMIT ?",
+                    (last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for match_id, payload in rows:
+                yield match_id, json.loads(zlib.decompress(payload))
+            last = rows[-1][0]
+
+    def known_match_ids(self, puuid: str) -> Tuple[List[str], bool]:
+        """A player's known match IDs (newest first) and whether that is their full history"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT match_id FROM player_matches WHERE puuid = ? ORDER BY seq DESC", (puuid,)
+            ).fetchall()
+            sync = self.conn.execute("SELECT complete FROM player_sync WHERE puuid = ?", (puuid,)).fetchone()
+        return [row[0] for row in rows], bool(sync and sync[0])
+
+    def add_match_ids(self, puuid: str, newer: List[str], older: List[str], complete: bool):
+        """Record newly seen match IDs - newer ones go on top, backfilled older ones at the bottom"""
+        with self.lock:
+            top, bottom = self.conn.execute(
+                "SELECT COALESCE(MAX(seq), 0), COALESCE(MIN(seq), 1) FROM player_matches WHERE puuid = ?", (puuid,)
+            ).fetchone()
+            rows = [(puuid, match_id, top + len(newer) - i) for i, match_id in enumerate(newer)]
+            rows += [(puuid, match_id, bottom - 1 - i) for i, match_id in enumerate(older)]
+            self.conn.executemany("INSERT OR IGNORE INTO player_matches (puuid, match_id, seq) VALUES (?, ?, ?)", rows)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO player_sync (puuid, synced_at, complete) VALUES (?, ?, ?)",
+                (puuid, time.time(), int(complete))
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop expired entries, then the least recently read ones above the size cap"""
+        self.writes_since_evict = 0
+        self.conn.execute("DELETE FROM matches WHERE stored_at < ?", (time.time() - self.max_age,))
+        self.conn.execute(
+            """DELETE FROM matches WHERE match_id IN (
+                SELECT match_id FROM matches ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            )""",
+            (self.max_entries,)
+        )
+        self.conn.commit()
+
+    def stats(self) -> dict:
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups * 100, 1) if lookups > 0 else 0,
+        }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
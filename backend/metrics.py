@@ -0,0 +1,150 @@
+import os
+import time
+import logging
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# Per-request upstream trace (override via environment)
+# Clients opt in per request with an "X-Upstream-Trace: 1" header; the calls come back in Server-Timing
+UPSTREAM_TRACE = os.getenv("UPSTREAM_TRACE", "false").lower() in ("1", "true", "yes")
+# Requests slower than this are logged with their upstream call count
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "2"))
+
+# Riot responses are usually 50ms-1s; queueing behind the rate limiter can take much longer
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+RIOT_REQUEST_SECONDS = Histogram(
+    "riot_request_duration_seconds", "Riot API response time per attempt", ["method"], buckets=LATENCY_BUCKETS
+)
+RIOT_QUEUE_SECONDS = Histogram(
+    "riot_queue_wait_seconds", "Time a Riot call waited for the rate limiter and concurrency cap",
+    ["method"], buckets=LATENCY_BUCKETS
+)
+RIOT_RESPONSES = Counter("riot_responses_total", "Riot API responses by status code", ["method", "status"])
+RIOT_ERRORS = Counter("riot_errors_total", "Riot API calls that failed without a response", ["method", "error"])
+RIOT_RETRIES = Counter("riot_retries_total", "Riot API calls retried, by reason (429, 5xx, error)", ["method", "reason"])
+RIOT_HEDGES = Counter("riot_hedged_requests_total", "Slow Riot calls raced against a second copy", ["method"])
+RIOT_CIRCUIT_OPEN = Gauge(
+    "riot_circuit_open", "1 while a Riot host's circuit breaker is open", ["host"], multiprocess_mode="max"
+)
+RIOT_RATE_LIMITED = Counter("riot_rate_limited_total", "429s from Riot by X-Rate-Limit-Type", ["method", "type"])
+RIOT_IN_FLIGHT = Gauge("riot_requests_in_flight", "Riot API calls currently on the wire", multiprocess_mode="livesum")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API response time (streams until their last record)",
+    ["route", "method"], buckets=LATENCY_BUCKETS
+)
+HTTP_RESPONSES = Counter("http_responses_total", "API responses by route and status code", ["route", "method", "status"])
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "API requests currently being handled", multiprocess_mode="livesum")
+
+APP_STARTUP_SECONDS = Gauge(
+    "app_startup_seconds", "Time spent in each startup phase (total: import until warm)", ["phase"],
+    multiprocess_mode="max"
+)
+
+# Upstream calls made while handling the current request (None when not tracing)
+upstream_trace: ContextVar[Optional[List[dict]]] = ContextVar("upstream_trace", default=None)
+
+
+def record_upstream(method: str, status: Optional[int], duration: float, wait: float):
+    trace = upstream_trace.get()
+    if trace is not None:
+        trace.append({"method": method, "status": status, "duration": duration, "wait": wait})
+
+
+def server_timing(trace: List[dict]) -> str:
+    """Upstream calls as a Server-Timing header (shown in browser dev tools)"""
+    return ", ".join(
+        f'riot;desc="{call["method"]} {call["status"] or "error"} wait={call["wait"] * 1000:.1f}ms";'
+        f'dur={call["duration"] * 1000:.1f}'
+        for call in trace
+    )
+
+
+class MetricsMiddleware:
+    """Per-route latency, status counts and in-flight requests, plus opt-in upstream traces.
+
+    Routes are labelled by their path template (e.g. /api/matches/{match_id})
+    so the label set stays bounded.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        trace = [] if UPSTREAM_TRACE and Headers(scope=scope).get("x-upstream-trace") else None
+        token = upstream_trace.set(trace)
+
+        async def traced_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace:
+                    # Streams send headers early, so they only list the calls made before the first record
+                    headers = MutableHeaders(raw=list(message["headers"]))
+                    headers.append("Server-Timing", server_timing(trace))
+                    message = {**message, "headers": headers.raw}
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            upstream_trace.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            HTTP_REQUEST_SECONDS.labels(path, scope["method"]).observe(elapsed)
+            HTTP_RESPONSES.labels(path, scope["method"], str(status)).inc()
+            if elapsed >= SLOW_REQUEST_SECONDS:
+                logger.warning("Slow request %s %s: %.2fs, status %s", scope["method"], scope["path"], elapsed, status)
+
+
+class StatsCollector:
+    """Exports the caches' and rate limiter's own counters at scrape time.
+
+    stats() returns {"caches": {name: TTLCache/MatchStore stats},
+    "rateLimits": RateLimitScheduler stats}.
+    """
+
+    def __init__(self, stats: Callable[[], Dict[str, dict]]):
+        self.stats = stats
+
+    def describe(self):
+        # Skip the registry's collect() at registration time - the stores only exist once the app has started
+        return []
+
+    def collect(self):
+        stats = self.stats()
+
+        hits = CounterMetricFamily("cache_hits", "Cache lookups served from the cache (including stale)", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache lookups that had to load", labels=["cache"])
+        ratio = GaugeMetricFamily("cache_hit_ratio", "Share of cache lookups served from the cache", labels=["cache"])
+        entries = GaugeMetricFamily("cache_entries", "Entries currently held", labels=["cache"])
+        for name, cache in stats["caches"].items():
+            hits.add_metric([name], cache["hits"] + cache.get("staleHits", 0))
+            misses.add_metric([name], cache["misses"])
+            ratio.add_metric([name], cache["hitRate"] / 100)
+            entries.add_metric([name], cache["entries"])
+        yield from (hits, misses, ratio, entries)
+
+        rate_limits = stats["rateLimits"]
+        queued = GaugeMetricFamily("riot_rate_limit_queued", "Riot calls waiting for rate limit budget", labels=["lane"])
+        queued.add_metric(["interactive"], rate_limits["queuedInteractive"])
+        queued.add_metric(["background"], rate_limits["queuedBackground"])
+        yield queued
+        yield CounterMetricFamily(
+            "riot_rate_limit_throttled", "Times a Riot call had to wait for rate limit budget", value=rate_limits["throttled"]
+        )
@@ -0,0 +1,355 @@
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import Dict, List, Tuple
+import httpx
+from rate_limiter import RateWindow, parse_rate_limits
+
+# Offline Riot API stand-in (override via environment) - enabled with RIOT_MOCK=true
+RIOT_MOCK = os.getenv("RIOT_MOCK", "false").lower() in ("1", "true", "yes")
+RIOT_MOCK_PLAYERS = int(os.getenv("RIOT_MOCK_PLAYERS", "200"))
+RIOT_MOCK_HISTORY = int(os.getenv("RIOT_MOCK_HISTORY", "100"))
+RIOT_MOCK_LATENCY_MS = float(os.getenv("RIOT_MOCK_LATENCY_MS", "60"))
+RIOT_MOCK_JITTER_MS = float(os.getenv("RIOT_MOCK_JITTER_MS", "30"))
+# Share of requests answered with an injected 429 (service limit, like Riot's own hiccups)
+RIOT_MOCK_429_RATE = float(os.getenv("RIOT_MOCK_429_RATE", "0"))
+# Share of requests answered with a 503, to exercise retries and the circuit breaker
+RIOT_MOCK_5XX_RATE = float(os.getenv("RIOT_MOCK_5XX_RATE", "0"))
+# Budgets advertised in the rate limit headers; requests over them get a real 429
+RIOT_MOCK_APP_LIMIT = os.getenv("RIOT_MOCK_APP_LIMIT", "500:10,30000:600")
+RIOT_MOCK_METHOD_LIMIT = os.getenv("RIOT_MOCK_METHOD_LIMIT", "2000:10")
+RIOT_MOCK_SEED = int(os.getenv("RIOT_MOCK_SEED", "1"))
+
+MOCK_TAG_LINE = "MOCK"
+CHAMPIONS = ["Ahri", "Garen", "Lux", "Jinx", "Thresh", "LeeSin", "Yasuo", "Leona", "Ezreal", "Orianna"]
+TIERS = ["IRON", "BRONZE", "SILVER", "GOLD", "PLATINUM", "EMERALD", "DIAMOND"]
+DIVISIONS = ["IV", "III", "II", "I"]
+
+ROUTES = [
+    (re.compile(r"/riot/account/v1/accounts/by-riot-id/(?P<name>[^/]+)/(?P<tag>[^/]+)$"), "account-v1.by-riot-id"),
+    (re.compile(r"/lol/league/v4/entries/by-puuid/(?P<puuid>[^/]+)$"), "league-v4.entries-by-puuid"),
+    (re.compile(r"/lol/match/v5/matches/by-puuid/(?P<puuid>[^/]+)/ids$"), "match-v5.ids-by-puuid"),
+    (re.compile(r"/lol/match/v5/matches/(?P<match_id>[^/]+)$"), "match-v5.match"),
+    (re.compile(r"/lol/match/v5/matches/(?P<match_id>[^/]+)/timeline$"), "match-v5.timeline"),
+]
+MONSTERS = ["DRAGON", "DRAGON", "RIFTHERALD", "HORDE", "BARON_NASHOR"]
+CHAMPION_STATS = [
+    "abilityHaste", "abilityPower", "armor", "armorPen", "armorPenPercent", "attackDamage", "attackSpeed",
+    "bonusArmorPenPercent", "bonusMagicPenPercent", "ccReduction", "cooldownReduction", "health", "healthMax",
+    "healthRegen", "lifesteal", "magicPen", "magicPenPercent", "magicResist", "movementSpeed", "omnivamp",
+    "physicalVamp", "power", "powerMax", "powerRegen", "spellVamp",
+]
+DAMAGE_STATS = [
+    "magicDamageDone", "magicDamageDoneToChampions", "magicDamageTaken", "physicalDamageDone",
+    "physicalDamageDoneToChampions", "physicalDamageTaken", "totalDamageDone", "totalDamageDoneToChampions",
+    "totalDamageTaken", "trueDamageDone", "trueDamageDoneToChampions", "trueDamageTaken",
+]
+
+
+def mock_riot_id(index: int) -> Tuple[str, str]:
+    """(game_name, tag_line) of the index-th mock player"""
+    return f"Player{index}", MOCK_TAG_LINE
+
+
+def mock_puuid(index: int) -> str:
+    return hashlib.sha256(f"mock-player-{index}".encode()).hexdigest()
+
+
+class MockLimits:
+    """Sliding-window counters behind the mock's X-*-Rate-Limit headers"""
+
+    def __init__(self, limits: str):
+        self.windows = [RateWindow(count, window) for count, window in parse_rate_limits(limits)]
+
+    def over(self, now: float) -> bool:
+        return any(window.wait_time(now) > 0 for window in self.windows)
+
+    def record(self, now: float):
+        for window in self.windows:
+            window.record(now)
+
+    def limit_header(self) -> str:
+        return ",".join(f"{window.limit}:{int(window.window)}" for window in self.windows)
+
+    def count_header(self) -> str:
+        # Counts are current as of the last over() call, which pruned the windows
+        return ",".join(f"{len(window.sent)}:{int(window.window)}" for window in self.windows)
+
+
+class MockRiotTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers account-v1, league-v4 and match-v5 calls offline.
+
+    Match timelines are served too. A fixed population of mock players ("Player0#MOCK" ...) plays
+    deterministic ranked flex games together; match documents are generated
+    on demand with the full match-v5 shape (challenges, perks, items) so
+    payload sizes are realistic. Every response waits the configured
+    latency, carries Riot-style rate limit headers, and may be a 429
+    (injected at random, or because the advertised budget ran out) or an
+    injected 503.
+    """
+
+    def __init__(self, players: int = RIOT_MOCK_PLAYERS, history: int = RIOT_MOCK_HISTORY,
+                 latency_ms: float = RIOT_MOCK_LATENCY_MS, jitter_ms: float = RIOT_MOCK_JITTER_MS,
+                 error_rate: float = RIOT_MOCK_429_RATE, app_limit: str = RIOT_MOCK_APP_LIMIT,
+                 method_limit: str = RIOT_MOCK_METHOD_LIMIT, seed: int = RIOT_MOCK_SEED,
+                 server_error_rate: float = RIOT_MOCK_5XX_RATE):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.server_error_rate = server_error_rate
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.app_limit = app_limit
+        self.method_limit = method_limit
+        self.app_limits: Dict[str, MockLimits] = {}
+        self.method_limits: Dict[Tuple[str, str], MockLimits] = {}
+        self.requests = 0
+        self.injected_429s = 0
+        self.limited_429s = 0
+        self.injected_5xxs = 0
+
+        self.puuids = [mock_puuid(i) for i in range(players)]
+        self.players = {puuid: i for i, puuid in enumerate(self.puuids)}
+        # Each game draws 10 players; enough games that the average history is `history` long
+        self.match_players: List[List[int]] = []
+        self.histories: Dict[int, List[int]] = {i: [] for i in range(players)}
+        # Generating and encoding a full document costs more than serving it; keep recent ones
+        self.match_body = lru_cache(maxsize=512)(lambda game: json.dumps(self.match_document(game)).encode())
+        self.timeline_body = lru_cache(maxsize=64)(lambda game: json.dumps(self.timeline_document(game)).encode())
+        game_rng = random.Random(seed)
+        for game in range(players * history // 10):
+            picked = game_rng.sample(range(players), 10)
+            self.match_players.append(picked)
+            for player in picked:
+                self.histories[player].append(game)
+
+    def match_id(self, game: int) -> str:
+        return f"MOCK_{game + 1}"
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await asyncio.sleep(max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0))
+        path = request.url.path
+        for pattern, method in ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            return httpx.Response(404, json={"status": {"status_code": 404, "message": "Not found"}})
+
+        host = request.url.host
+        app_limits = self.app_limits.setdefault(host, MockLimits(self.app_limit))
+        method_limits = self.method_limits.setdefault((host, method), MockLimits(self.method_limit))
+        now = time.monotonic()
+        limited = "application" if app_limits.over(now) else "method" if method_limits.over(now) else None
+        if not limited:
+            app_limits.record(now)
+            method_limits.record(now)
+        headers = {
+            "X-App-Rate-Limit": app_limits.limit_header(),
+            "X-App-Rate-Limit-Count": app_limits.count_header(),
+            "X-Method-Rate-Limit": method_limits.limit_header(),
+            "X-Method-Rate-Limit-Count": method_limits.count_header(),
+        }
+        if limited:
+            self.limited_429s += 1
+            return httpx.Response(429, headers={**headers, "Retry-After": "1", "X-Rate-Limit-Type": limited})
+        if self.rng.random() < self.error_rate:
+            self.injected_429s += 1
+            return httpx.Response(429, headers={**headers, "X-Rate-Limit-Type": "service"})
+        if self.server_error_rate and self.rng.random() < self.server_error_rate:
+            self.injected_5xxs += 1
+            return httpx.Response(503, json={"status": {"status_code": 503, "message": "Service unavailable"}})
+
+        status, body = getattr(self, "_" + method.replace("-", "_").replace(".", "_"))(request, **match.groupdict())
+        if isinstance(body, bytes):
+            return httpx.Response(status, content=body, headers={**headers, "Content-Type": "application/json"})
+        return httpx.Response(status, json=body, headers=headers)
+
+    def _account_v1_by_riot_id(self, request: httpx.Request, name: str, tag: str):
+        if tag.upper() != MOCK_TAG_LINE or not name.lower().startswith("player") or not name[6:].isdigit():
+            return 404, {"status": {"status_code": 404, "message": "Data not found"}}
+        index = int(name[6:])
+        if index >= len(self.puuids):
+            return 404, {"status": {"status_code": 404, "message": "Data not found"}}
+        return 200, {"puuid": self.puuids[index], "gameName": name, "tagLine": tag}
+
+    def _league_v4_entries_by_puuid(self, request: httpx.Request, puuid: str):
+        index = self.players.get(puuid)
+        if index is None or index % 7 == 0:
+            # Some players are unranked in flex
+            return 200, []
+        return 200, [{
+            "queueType": "RANKED_FLEX_SR",
+            "tier": TIERS[index % len(TIERS)],
+            "rank": DIVISIONS[index % len(DIVISIONS)],
+            "leaguePoints": index * 13 % 100,
+            "wins": 20 + index % 30,
+            "losses": 20 + index % 25,
+        }]
+
+    def _match_v5_ids_by_puuid(self, request: httpx.Request, puuid: str):
+        index = self.players.get(puuid)
+        if index is None:
+            return 200, []
+        start = int(request.url.params.get("start", "0"))
+        count = int(request.url.params.get("count", "20"))
+        games = self.histories[index][::-1][start:start + count]
+        return 200, [self.match_id(game) for game in games]
+
+    def _match_v5_match(self, request: httpx.Request, match_id: str):
+        game = int(match_id.split("_", 1)[1]) - 1 if match_id.split("_", 1)[-1].isdigit() else -1
+        if not 0 <= game < len(self.match_players):
+            return 404, {"status": {"status_code": 404, "message": "Data not found"}}
+        return 200, self.match_body(game)
+
+    def _match_v5_timeline(self, request: httpx.Request, match_id: str):
+        game = int(match_id.split("_", 1)[1]) - 1 if match_id.split("_", 1)[-1].isdigit() else -1
+        if not 0 <= game < len(self.match_players):
+            return 404, {"status": {"status_code": 404, "message": "Data not found"}}
+        return 200, self.timeline_body(game)
+
+    def timeline_document(self, game: int) -> dict:
+        """A match-v5 timeline for the game: a frame per minute for all ten players, plus events"""
+        duration = random.Random(self.seed * 1_000_003 + game).randint(1200, 2400)
+        rng = random.Random(self.seed * 2_000_003 + game)
+        totals = [{"gold": 500, "xp": 0, "minions": 0, "jungle": 0, "damage": 0} for _ in range(10)]
+        frames = []
+        for minute in range(duration // 60 + 2):
+            timestamp = min(minute * 60_000 + rng.randint(0, 40), duration * 1000)
+            participant_frames = {}
+            for slot, total in enumerate(totals):
+                if minute:
+                    total["gold"] += rng.randint(250, 550)
+                    total["xp"] += rng.randint(300, 700)
+                    total["minions"] += rng.randint(0, 10)
+                    total["jungle"] += rng.randint(0, 3)
+                    total["damage"] += rng.randint(0, 1500)
+                participant_frames[str(slot + 1)] = {
+                    "championStats": {stat: rng.randint(0, 500) for stat in CHAMPION_STATS},
+                    "currentGold": rng.randint(0, 1500),
+                    "damageStats": {
+                        **{stat: total["damage"] * rng.randint(1, 3) for stat in DAMAGE_STATS},
+                        "totalDamageDoneToChampions": total["damage"],
+                    },
+                    "goldPerSecond": 0 if minute < 2 else 20,
+                    "jungleMinionsKilled": total["jungle"],
+                    "level": min(1 + total["xp"] // 1000, 18),
+                    "minionsKilled": total["minions"],
+                    "participantId": slot + 1,
+                    "position": {"x": rng.randint(0, 14800), "y": rng.randint(0, 14800)},
+                    "timeEnemySpentControlled": rng.randint(0, 60000),
+                    "totalGold": total["gold"],
+                    "xp": total["xp"],
+                }
+            events = [
+                {"type": "ITEM_PURCHASED", "timestamp": timestamp - rng.randint(0, 59_000) if minute else 0,
+                 "participantId": rng.randint(1, 10), "itemId": rng.randint(1001, 6700)}
+                for _ in range(rng.randint(2, 8))
+            ] + [
+                {"type": "WARD_PLACED", "timestamp": timestamp, "creatorId": rng.randint(1, 10), "wardType": "YELLOW_TRINKET"}
+                for _ in range(rng.randint(0, 4))
+            ]
+            if minute >= 5 and rng.random() < 0.25:
+                events.append({"type": "ELITE_MONSTER_KILL", "timestamp": timestamp, "killerId": rng.randint(1, 10),
+                               "killerTeamId": rng.choice((100, 200)), "monsterType": rng.choice(MONSTERS),
+                               "position": {"x": 9866, "y": 4414}})
+            if minute >= 12 and rng.random() < 0.3:
+                events.append({"type": "BUILDING_KILL", "timestamp": timestamp, "killerId": rng.randint(1, 10),
+                               "teamId": rng.choice((100, 200)), "buildingType": "TOWER_BUILDING",
+                               "laneType": rng.choice(("TOP_LANE", "MID_LANE", "BOT_LANE")),
+                               "position": {"x": 5846, "y": 6396}})
+            frames.append({"events": events, "participantFrames": participant_frames, "timestamp": timestamp})
+        return {
+            "metadata": {
+                "dataVersion": "2",
+                "matchId": self.match_id(game),
+                "participants": [self.puuids[player] for player in self.match_players[game]],
+            },
+            "info": {
+                "frameInterval": 60000,
+                "frames": frames,
+                "gameId": game + 1,
+                "participants": [
+                    {"participantId": slot + 1, "puuid": self.puuids[player]}
+                    for slot, player in enumerate(self.match_players[game])
+                ],
+            },
+        }
+
+    def match_document(self, game: int) -> dict:
+        rng = random.Random(self.seed * 1_000_003 + game)
+        duration = rng.randint(1200, 2400)
+        blue_wins = rng.random() < 0.5
+        participants = []
+        for slot, player in enumerate(self.match_players[game]):
+            team_id = 100 if slot < 5 else 200
+            game_name, tag_line = mock_riot_id(player)
+            participants.append({
+                "puuid": self.puuids[player],
+                "riotIdGameName": game_name,
+                "riotIdTagLine": tag_line,
+                "summonerName": game_name,
+                "championName": rng.choice(CHAMPIONS),
+                "teamId": team_id,
+                "win": (team_id == 100) == blue_wins,
+                "kills": rng.randint(0, 15),
+                "deaths": rng.randint(0, 12),
+                "assists": rng.randint(0, 20),
+                "totalMinionsKilled": rng.randint(0, 260),
+                "neutralMinionsKilled": rng.randint(0, 60),
+                "goldEarned": rng.randint(5000, 18000),
+                "totalDamageDealtToChampions": rng.randint(3000, 45000),
+                "totalDamageTaken": rng.randint(5000, 45000),
+                "visionScore": rng.randint(5, 90),
+                "timePlayed": duration,
+                **{f"item{i}": rng.randint(1001, 6700) for i in range(7)},
+                "challenges": {
+                    "teamDamagePercentage": round(rng.random() * 0.4, 4),
+                    "killParticipation": round(rng.random(), 4),
+                    # Padding in the shape of the ~120 other challenge stats Riot sends
+                    **{f"challengeStat{i}": rng.random() for i in range(120)},
+                },
+                "perks": {
+                    "statPerks": {"defense": 5002, "flex": 5008, "offense": 5005},
+                    "styles": [
+                        {"description": "primaryStyle", "style": 8100,
+                         "selections": [{"perk": 8112 + i, "var1": rng.randint(0, 2000), "var2": 0, "var3": 0}
+                                        for i in range(4)]},
+                        {"description": "subStyle", "style": 8300,
+                         "selections": [{"perk": 8304 + i, "var1": rng.randint(0, 50), "var2": 0, "var3": 0}
+                                        for i in range(2)]},
+                    ],
+                },
+                **{f"{ping}Pings": rng.randint(0, 10) for ping in (
+                    "allIn", "assistMe", "basic", "command", "danger", "enemyMissing", "enemyVision",
+                    "getBack", "hold", "needVision", "onMyWay", "push", "visionCleared",
+                )},
+            })
+        return {
+            "metadata": {
+                "dataVersion": "2",
+                "matchId": self.match_id(game),
+                "participants": [p["puuid"] for p in participants],
+            },
+            "info": {
+                "gameCreation": 1_700_000_000_000 + game * 2_400_000,
+                "gameDuration": duration,
+                "gameMode": "CLASSIC",
+                "queueId": 440,
+                "participants": participants,
+            },
+        }
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "injected429s": self.injected_429s,
+            "limited429s": self.limited_429s,
+            "injected5xxs": self.injected_5xxs,
+        }
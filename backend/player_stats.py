@@ -0,0 +1,433 @@
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+from match_record import MatchRecord, Participant, RANKED_FLEX_QUEUE
+from match_store import MATCH_STORE_PATH
+from scoring import ParticipantTable, MVP_WEIGHTS
+
+# Player aggregate store configuration (override via environment)
+# Lives next to the match store by default
+PLAYER_STATS_PATH = os.getenv("PLAYER_STATS_PATH", MATCH_STORE_PATH)
+# Rolling windows (last K games) kept ranked for the leaderboard
+LEADERBOARD_WINDOWS = [int(k) for k in os.getenv("LEADERBOARD_WINDOWS", "5,10,20").split(",") if k.strip()]
+
+# Per-game columns summed into every aggregate
+SUM_COLUMNS = ("wins", "kills", "deaths", "assists", "cs", "gold", "damage", "vision_score", "mvp_score")
+# Game count, SUM_COLUMNS and MVP/top 3/troll counts over a set of player_games rows
+WINDOW_SUMS = (
+    f"COUNT(*), {', '.join(f'SUM({c})' for c in SUM_COLUMNS)}, SUM(ranking = 1), SUM(ranking <= 3), SUM(ranking = 10)"
+)
+
+# Matches scored per ParticipantTable while backfilling
+BACKFILL_BATCH_SIZE = 500
+
+
+class PlayerStatsStore:
+    """Per-player game rows and aggregates, updated as matches are ingested.
+
+    Every participant of every ingested ranked flex match (other queues
+    are ignored) gets one player_games row
+    with its already scored stats (MVP score, in-match ranking, KDA), so
+    comparisons read a player's window of games instead of re-scoring
+    whole matches. On top of that it keeps, per PUUID:
+
+    - all-time running totals, a ranking histogram and per-champion splits,
+      bumped once per new game
+    - totals over the last K games for each of LEADERBOARD_WINDOWS, with an
+      index on the average MVP score so "top N over the last K games" is a
+      single index range scan
+    - how many of their newest games are known to all be recorded (see
+      mark_synced); the global leaderboard only ranks a window that deep
+
+    Scores depend on MVP_WEIGHTS; when the weights change (or the store is
+    new), it starts over and needs_backfill is set so the matches already
+    in the match store can be recorded again with backfill().
+    """
+
+    def __init__(self, path: str = PLAYER_STATS_PATH, windows: List[int] = LEADERBOARD_WINDOWS):
+        self.windows = windows
+        self.lock = threading.Lock()
+        # Autocommit; each match is recorded in one explicit transaction
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS player_games (
+                puuid TEXT NOT NULL,
+                match_id TEXT NOT NULL,
+                game_creation INTEGER NOT NULL,
+                champion TEXT NOT NULL,
+                wins INTEGER NOT NULL,
+                kills INTEGER NOT NULL,
+                deaths INTEGER NOT NULL,
+                assists INTEGER NOT NULL,
+                cs INTEGER NOT NULL,
+                gold INTEGER NOT NULL,
+                damage INTEGER NOT NULL,
+                vision_score INTEGER NOT NULL,
+                kda REAL NOT NULL,
+                mvp_score REAL NOT NULL,
+                ranking INTEGER NOT NULL,
+                PRIMARY KEY (puuid, match_id)
+            )"""
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_player_games_recent ON player_games (puuid, game_creation)")
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS player_totals (
+                puuid TEXT PRIMARY KEY,
+                game_name TEXT,
+                tag_line TEXT,
+                last_game INTEGER NOT NULL,
+                games INTEGER NOT NULL,
+                {", ".join(f"{c} {'REAL' if c == 'mvp_score' else 'INTEGER'} NOT NULL" for c in SUM_COLUMNS)}
+            )"""
+        )
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS player_rankings (
+                puuid TEXT NOT NULL,
+                ranking INTEGER NOT NULL,
+                games INTEGER NOT NULL,
+                PRIMARY KEY (puuid, ranking)
+            )"""
+        )
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS player_champions (
+                puuid TEXT NOT NULL,
+                champion TEXT NOT NULL,
+                games INTEGER NOT NULL,
+                wins INTEGER NOT NULL,
+                kills INTEGER NOT NULL,
+                deaths INTEGER NOT NULL,
+                assists INTEGER NOT NULL,
+                mvp_score REAL NOT NULL,
+                PRIMARY KEY (puuid, champion)
+            )"""
+        )
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS player_windows (
+                puuid TEXT NOT NULL,
+                window_size INTEGER NOT NULL,
+                games INTEGER NOT NULL,
+                {", ".join(f"{c} {'REAL' if c == 'mvp_score' else 'INTEGER'} NOT NULL" for c in SUM_COLUMNS)},
+                mvp_count INTEGER NOT NULL,
+                top3_count INTEGER NOT NULL,
+                troll_count INTEGER NOT NULL,
+                avg_mvp_score REAL NOT NULL,
+                PRIMARY KEY (puuid, window_size)
+            )"""
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_player_windows_mvp ON player_windows (window_size, avg_mvp_score DESC, games)"
+        )
+        # depth = the newest `depth` games up to newest_game are all recorded
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS player_history (
+                puuid TEXT PRIMARY KEY,
+                newest_match_id TEXT NOT NULL,
+                newest_game INTEGER NOT NULL,
+                depth INTEGER NOT NULL
+            )"""
+        )
+        self.conn.execute("CREATE TABLE IF NOT EXISTS player_stats_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._check_weights()
+
+    def _check_weights(self):
+        """Drop every stored score if they were computed with different MVP weights"""
+        weights = json.dumps(MVP_WEIGHTS, sort_keys=True)
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT value FROM player_stats_meta WHERE key = 'weights'").fetchone()
+                self.needs_backfill = row is None or row[0] != weights
+                if self.needs_backfill:
+                    for table in ("player_games", "player_totals", "player_rankings", "player_champions",
+                                  "player_windows", "player_history"):
+                        self.conn.execute(f"DELETE FROM {table}")
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO player_stats_meta (key, value) VALUES ('weights', ?)", (weights,)
+                    )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def record_match(self, match: MatchRecord) -> int:
+        """Add one match's participants; returns how many games were new (0 if already recorded)"""
+        return self.record_matches([match])
+
+    def record_matches(self, matches: List[MatchRecord]) -> int:
+        """Add the participants of several matches, scored together in one ParticipantTable.
+
+        Returns how many games were new (matches already recorded, and other
+        queues than ranked flex, are skipped).
+        """
+        with self.lock:
+            # Matches are recorded whole, so one participant's row tells whether it is already in
+            matches = [
+                match for match in matches
+                if match.queue_id == RANKED_FLEX_QUEUE and match.participants and self.conn.execute(
+                    "SELECT 1 FROM player_games WHERE puuid = ? AND match_id = ?",
+                    (match.participants[0].puuid, match.match_id)
+                ).fetchone() is None
+            ]
+        if not matches:
+            return 0
+        table = ParticipantTable(matches)
+        derived = table.derived_stats()
+        added = 0
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                for match, start in zip(matches, table.match_starts.tolist()):
+                    for idx, p in enumerate(match.participants, start):
+                        added += self._add_game(match, p, {key: values[idx] for key, values in derived.items()})
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return added
+
+    def _add_game(self, match: MatchRecord, p: Participant, derived: dict) -> int:
+        game = {
+            "wins": int(p.win), "kills": p.kills, "deaths": p.deaths, "assists": p.assists, "cs": p.cs,
+            "gold": p.gold, "damage": p.damage, "vision_score": p.vision_score, "mvp_score": derived["mvpScore"],
+        }
+        inserted = self.conn.execute(
+            f"""INSERT OR IGNORE INTO player_games
+                (puuid, match_id, game_creation, champion, {", ".join(SUM_COLUMNS)}, kda, ranking)
+                VALUES (?, ?, ?, ?, {", ".join("?" for _ in SUM_COLUMNS)}, ?, ?)""",
+            (p.puuid, match.match_id, match.game_creation, p.champion,
+             *(game[c] for c in SUM_COLUMNS), derived["kda"], derived["ranking"])
+        ).rowcount
+        if not inserted:
+            return 0
+        self._add_to_totals(p.puuid, p.game_name, p.tag_line, match.game_creation, game)
+        self.conn.execute(
+            """INSERT INTO player_rankings (puuid, ranking, games) VALUES (?, ?, 1)
+               ON CONFLICT (puuid, ranking) DO UPDATE SET games = games + 1""",
+            (p.puuid, derived["ranking"])
+        )
+        self.conn.execute(
+            """INSERT INTO player_champions (puuid, champion, games, wins, kills, deaths, assists, mvp_score)
+               VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+               ON CONFLICT (puuid, champion) DO UPDATE SET
+                   games = games + 1, wins = wins + excluded.wins, kills = kills + excluded.kills,
+                   deaths = deaths + excluded.deaths, assists = assists + excluded.assists,
+                   mvp_score = mvp_score + excluded.mvp_score""",
+            (p.puuid, p.champion, game["wins"], p.kills, p.deaths, p.assists, game["mvp_score"])
+        )
+        for window in self.windows:
+            self._refresh_window(p.puuid, window)
+        return 1
+
+    def backfill(self, matches: Iterable[MatchRecord]) -> int:
+        """Record matches stored before the last reset (a no-op unless needs_backfill); returns games added"""
+        if not self.needs_backfill:
+            return 0
+        added = 0
+        batch = []
+        for match in matches:
+            batch.append(match)
+            if len(batch) == BACKFILL_BATCH_SIZE:
+                added += self.record_matches(batch)
+                batch = []
+        added += self.record_matches(batch)
+        self.needs_backfill = False
+        return added
+
+    def mark_synced(self, puuid: str, match_ids: List[str]):
+        """Note that a player's newest games (match_ids, newest first) are all recorded.
+
+        If the previous synced run is still part of them, the two runs join up.
+        """
+        if not match_ids:
+            return
+        with self.lock:
+            newest = self.conn.execute(
+                "SELECT game_creation FROM player_games WHERE puuid = ? AND match_id = ?", (puuid, match_ids[0])
+            ).fetchone()
+            if newest is None:
+                return
+            depth = len(match_ids)
+            previous = self.conn.execute(
+                "SELECT newest_match_id, depth FROM player_history WHERE puuid = ?", (puuid,)
+            ).fetchone()
+            if previous is not None and previous[0] in match_ids:
+                depth = max(depth, match_ids.index(previous[0]) + previous[1])
+            self.conn.execute(
+                "INSERT OR REPLACE INTO player_history (puuid, newest_match_id, newest_game, depth) VALUES (?, ?, ?, ?)",
+                (puuid, match_ids[0], newest[0], depth)
+            )
+
+    def _add_to_totals(self, puuid: str, game_name: str, tag_line: str, game_creation: int, game: dict):
+        # The Riot ID shown is the one from the player's newest game
+        self.conn.execute(
+            f"""INSERT INTO player_totals (puuid, game_name, tag_line, last_game, games, {", ".join(SUM_COLUMNS)})
+                VALUES (?, ?, ?, ?, 1, {", ".join("?" for _ in SUM_COLUMNS)})
+                ON CONFLICT (puuid) DO UPDATE SET
+                    game_name = CASE WHEN excluded.last_game >= last_game THEN excluded.game_name ELSE game_name END,
+                    tag_line = CASE WHEN excluded.last_game >= last_game THEN excluded.tag_line ELSE tag_line END,
+                    last_game = MAX(last_game, excluded.last_game),
+                    games = games + 1,
+                    {", ".join(f"{c} = {c} + excluded.{c}" for c in SUM_COLUMNS)}""",
+            (puuid, game_name, tag_line, game_creation, *(game[c] for c in SUM_COLUMNS))
+        )
+
+    def _refresh_window(self, puuid: str, window: int):
+        """Re-total a player's newest `window` games (a bounded, indexed read)"""
+        row = self.conn.execute(
+            f"""SELECT {WINDOW_SUMS}
+                FROM (SELECT * FROM player_games WHERE puuid = ? ORDER BY game_creation DESC LIMIT ?)""",
+            (puuid, window)
+        ).fetchone()
+        games = row[0]
+        mvp_score = row[SUM_COLUMNS.index("mvp_score") + 1]
+        self.conn.execute(
+            f"""INSERT OR REPLACE INTO player_windows
+                (puuid, window_size, games, {", ".join(SUM_COLUMNS)}, mvp_count, top3_count, troll_count, avg_mvp_score)
+                VALUES (?, ?, {", ".join("?" for _ in row)}, ?)""",
+            (puuid, window, *row, mvp_score / games)
+        )
+
+    def games_for(self, puuid: str, match_ids: List[str]) -> List[dict]:
+        """A player's recorded games among match_ids, in the order given (unrecorded ones are left out)"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"""SELECT match_id, game_creation, champion, {", ".join(SUM_COLUMNS)}, kda, ranking
+                    FROM player_games WHERE puuid = ? AND match_id IN ({", ".join("?" for _ in match_ids)})""",
+                (puuid, *match_ids)
+            ).fetchall()
+        games = {}
+        for match_id, game_creation, champion, *values, kda, ranking in rows:
+            game = dict(zip(SUM_COLUMNS, values))
+            games[match_id] = {
+                **game, "match_id": match_id, "game_creation": game_creation, "champion": champion,
+                "kda": kda, "ranking": ranking,
+            }
+        return [games[match_id] for match_id in match_ids if match_id in games]
+
+    def totals_for(self, puuid: str, match_ids: List[str]) -> dict:
+        """Totals over a player's recorded games among match_ids, summed by SQLite"""
+        with self.lock:
+            games, *values, mvp_count, top3_count, troll_count = self.conn.execute(
+                f"""SELECT {WINDOW_SUMS} FROM player_games
+                    WHERE puuid = ? AND match_id IN ({", ".join("?" for _ in match_ids)})""",
+                (puuid, *match_ids)
+            ).fetchone()
+        if not games:
+            return totals_from_sums(0, dict.fromkeys(SUM_COLUMNS, 0), 0, 0, 0)
+        return totals_from_sums(games, dict(zip(SUM_COLUMNS, values)), mvp_count, top3_count, troll_count)
+
+    def leaderboard(self, window: int, limit: int, min_games: Optional[int] = None,
+                    puuids: Optional[List[str]] = None) -> List[dict]:
+        """Players with the best average MVP score over their last `window` games.
+
+        Only players with at least min_games (default: a full window) are
+        ranked. puuids narrows it down to one squad; without it, only players
+        whose newest `window` games were synced (see mark_synced), and none
+        recorded since, are ranked - not everyone who turned up in some
+        loaded match.
+        """
+        if window not in self.windows:
+            raise ValueError(f"window must be one of {self.windows}")
+        tables = "player_windows w JOIN player_totals t ON t.puuid = w.puuid"
+        where = "w.window_size = ? AND w.games >= ?"
+        params = [window, window if min_games is None else min_games]
+        if puuids is not None:
+            where += f" AND w.puuid IN ({', '.join('?' for _ in puuids)})"
+            params += puuids
+        else:
+            tables += " JOIN player_history h ON h.puuid = w.puuid"
+            where += " AND h.depth >= w.window_size AND h.newest_game >= t.last_game"
+        with self.lock:
+            rows = self.conn.execute(
+                f"""SELECT w.puuid, t.game_name, t.tag_line, w.games, {", ".join(f"w.{c}" for c in SUM_COLUMNS)},
+                           w.mvp_count, w.top3_count, w.troll_count
+                    FROM {tables}
+                    WHERE {where}
+                    ORDER BY w.avg_mvp_score DESC, w.games DESC
+                    LIMIT ?""",
+                (*params, limit)
+            ).fetchall()
+        return [
+            {
+                "puuid": puuid, "game_name": game_name, "tag_line": tag_line,
+                "totals": totals_from_sums(games, dict(zip(SUM_COLUMNS, values)), mvp_count, top3_count, troll_count),
+            }
+            for puuid, game_name, tag_line, games, *values, mvp_count, top3_count, troll_count in rows
+        ]
+
+    def profile(self, puuid: str) -> Optional[dict]:
+        """All-time totals, ranking histogram, champion splits and window totals for one player"""
+        with self.lock:
+            totals = self.conn.execute(
+                f"SELECT game_name, tag_line, games, {', '.join(SUM_COLUMNS)} FROM player_totals WHERE puuid = ?",
+                (puuid,)
+            ).fetchone()
+            if totals is None:
+                return None
+            rankings = self.conn.execute(
+                "SELECT ranking, games FROM player_rankings WHERE puuid = ? ORDER BY ranking", (puuid,)
+            ).fetchall()
+            champions = self.conn.execute(
+                """SELECT champion, games, wins, kills, deaths, assists, mvp_score FROM player_champions
+                   WHERE puuid = ? ORDER BY games DESC, champion""",
+                (puuid,)
+            ).fetchall()
+            windows = self.conn.execute(
+                f"""SELECT window_size, games, {", ".join(SUM_COLUMNS)}, mvp_count, top3_count, troll_count
+                    FROM player_windows WHERE puuid = ? ORDER BY window_size""",
+                (puuid,)
+            ).fetchall()
+        game_name, tag_line, games, *values = totals
+        histogram = dict(rankings)
+        return {
+            "game_name": game_name,
+            "tag_line": tag_line,
+            "totals": totals_from_sums(
+                games, dict(zip(SUM_COLUMNS, values)),
+                histogram.get(1, 0), sum(n for r, n in rankings if r <= 3), histogram.get(10, 0)
+            ),
+            "rankings": histogram,
+            "champions": [
+                {"champion": champion, "games": n, "wins": wins, "kills": kills, "deaths": deaths,
+                 "assists": assists, "mvp_score": mvp_score}
+                for champion, n, wins, kills, deaths, assists, mvp_score in champions
+            ],
+            "windows": {
+                window: totals_from_sums(n, dict(zip(SUM_COLUMNS, values)), mvp_count, top3_count, troll_count)
+                for window, n, *values, mvp_count, top3_count, troll_count in windows
+            },
+        }
+
+    def stats(self) -> dict:
+        with self.lock:
+            players = self.conn.execute("SELECT COUNT(*) FROM player_totals").fetchone()[0]
+            games = self.conn.execute("SELECT COUNT(*) FROM player_games").fetchone()[0]
+        return {"players": players, "games": games, "windows": self.windows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def totals_from_sums(games: int, sums: Dict[str, float], mvp_count: int, top3_count: int, troll_count: int) -> dict:
+    """Stored sums in the shape calculate_averages and performance_counts expect"""
+    return {
+        "kills": sums["kills"],
+        "deaths": sums["deaths"],
+        "assists": sums["assists"],
+        "cs": sums["cs"],
+        "gold": sums["gold"],
+        "damage": sums["damage"],
+        "visionScore": sums["vision_score"],
+        "mvpScore": sums["mvp_score"],
+        "wins": sums["wins"],
+        "games": games,
+        "mvp_count": mvp_count,
+        "top3_count": top3_count,
+        "troll_count": troll_count,
+    }
+
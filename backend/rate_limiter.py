@@ -0,0 +1,215 @@
+import os
+import time
+import asyncio
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple, Union
+
+# Starting app budget until Riot tells us the real one (development key limits)
+RIOT_APP_RATE_LIMIT = os.getenv("RIOT_APP_RATE_LIMIT", "20:1,100:120")
+
+# Priority lanes - interactive endpoint calls go ahead of background work
+INTERACTIVE = 0
+BACKGROUND = 1
+
+
+
+class SharedLane:
+    """Lane of a load several callers wait on (see cache.TTLCache) - interactive while any of them is.
+
+    Callers join with their own lane, which may itself be a SharedLane, so a
+    background load an interactive request later waits on moves ahead too.
+    """
+
+    __slots__ = ("lanes",)
+
+    def __init__(self, lane: Union[int, "SharedLane"]):
+        self.lanes = [lane]
+
+    def join(self, lane: Union[int, "SharedLane"]):
+        if lane is not self and lane not in self.lanes:
+            self.lanes.append(lane)
+
+    @property
+    def priority(self) -> int:
+        return min(lane_priority(lane) for lane in self.lanes)
+
+
+def lane_priority(lane: Union[int, SharedLane]) -> int:
+    """The priority a lane currently stands for"""
+    return lane.priority if isinstance(lane, SharedLane) else lane
+
+
+# Lane used by Riot calls made in the current task
+priority_lane: ContextVar[Union[int, SharedLane]] = ContextVar("priority_lane", default=INTERACTIVE)
+
+# How often a waiting background request re-checks for queued interactive work
+BACKGROUND_POLL_INTERVAL = 0.05
+
+
+def parse_rate_limits(header: Optional[str]) -> List[Tuple[int, int]]:
+    """Parse a Riot rate limit header like "20:1,100:120" into (count, seconds) pairs"""
+    limits = []
+    for part in (header or "").split(","):
+        count, _, window = part.strip().partition(":")
+        if count.isdigit() and window.isdigit():
+            limits.append((int(count), int(window)))
+    return limits
+
+
+class RateWindow:
+    """Sliding window of request timestamps for one (count, seconds) limit"""
+
+    def __init__(self, limit: int, window: float):
+        self.limit = limit
+        self.window = window
+        self.sent = deque()
+
+    def _prune(self, now: float):
+        while self.sent and self.sent[0] <= now - self.window:
+            self.sent.popleft()
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until another request fits in this window"""
+        self._prune(now)
+        if len(self.sent) < self.limit:
+            return 0
+        return self.sent[len(self.sent) - self.limit] + self.window - now
+
+    def record(self, now: float):
+        self.sent.append(now)
+
+    def sync(self, count: int, now: float):
+        """Catch up with Riot's own count (e.g. other clients sharing the key)"""
+        self._prune(now)
+        for _ in range(count - len(self.sent)):
+            self.sent.append(now)
+
+
+def _rebuild(windows: List[RateWindow], limits: List[Tuple[int, int]]) -> List[RateWindow]:
+    # Keep existing history when Riot reports the same limits again
+    if [(w.limit, w.window) for w in windows] == limits:
+        return windows
+    history = {w.window: w.sent for w in windows}
+    rebuilt = []
+    for limit, window in limits:
+        rate_window = RateWindow(limit, window)
+        rate_window.sent = history.get(window, deque())
+        rebuilt.append(rate_window)
+    return rebuilt
+
+
+class RateLimitScheduler:
+    """Paces Riot calls against the per-app and per-method budgets.
+
+    Budgets are tracked per routing host (la2, americas, ...) and per
+    (host, method) from the X-App-Rate-Limit / X-Method-Rate-Limit
+    response headers. A 429 blocks the app or method for Retry-After
+    seconds. Background requests wait while any interactive request is
+    queued. With a ledger (see shared_state.SharedRateLedger), every
+    reservation and 429 block is also checked against the other worker
+    processes' traffic.
+    """
+
+    def __init__(self, app_limits: str = RIOT_APP_RATE_LIMIT, ledger=None):
+        self.default_app_limits = parse_rate_limits(app_limits)
+        self.ledger = ledger
+        self.app_windows: Dict[str, List[RateWindow]] = {}
+        self.method_windows: Dict[Tuple[str, str], List[RateWindow]] = {}
+        self.blocked_until: Dict[object, float] = {}
+        self.queued: List[Union[int, SharedLane]] = []  # lanes of the calls waiting in acquire()
+        self.throttled = 0
+
+    def _app(self, host: str) -> List[RateWindow]:
+        if host not in self.app_windows:
+            self.app_windows[host] = [RateWindow(c, w) for c, w in self.default_app_limits]
+        return self.app_windows[host]
+
+    def _method(self, host: str, method: str) -> List[RateWindow]:
+        return self.method_windows.setdefault((host, method), [])
+
+    def _delay(self, host: str, method: str, priority: int, now: float) -> float:
+        delay = max(
+            self.blocked_until.get(host, 0) - now,
+            self.blocked_until.get((host, method), 0) - now,
+            0
+        )
+        for window in self._app(host) + self._method(host, method):
+            delay = max(delay, window.wait_time(now))
+        if delay <= 0 and priority == BACKGROUND and self._queued(INTERACTIVE) > 0:
+            delay = BACKGROUND_POLL_INTERVAL
+        return delay
+
+    def _queued(self, priority: int) -> int:
+        return sum(lane_priority(lane) == priority for lane in self.queued)
+
+    async def acquire(self, host: str, method: str, priority: Optional[int] = None):
+        """Wait until a request to host/method fits every budget, then reserve it"""
+        lane = priority_lane.get() if priority is None else priority
+        self.queued.append(lane)
+        try:
+            while True:
+                now = time.monotonic()
+                # Looked up on every pass: a shared load moves to the interactive lane once an
+                # interactive caller joins it
+                delay = self._delay(host, method, lane_priority(lane), now)
+                if delay <= 0 and self.ledger:
+                    delay = await asyncio.to_thread(self.ledger.reserve, [
+                        (host, [(w.limit, w.window) for w in self._app(host)]),
+                        (f"{host}:{method}", [(w.limit, w.window) for w in self._method(host, method)]),
+                    ])
+                if delay <= 0:
+                    for window in self._app(host) + self._method(host, method):
+                        window.record(now)
+                    return
+                self.throttled += 1
+                await asyncio.sleep(delay)
+        finally:
+            self.queued.remove(lane)
+
+    async def update(self, host: str, method: str, status_code: int, headers):
+        """Learn budgets from Riot's response headers and honor Retry-After"""
+        now = time.monotonic()
+        app_limits = parse_rate_limits(headers.get("X-App-Rate-Limit"))
+        if app_limits:
+            self.app_windows[host] = _rebuild(self._app(host), app_limits)
+        method_limits = parse_rate_limits(headers.get("X-Method-Rate-Limit"))
+        if method_limits:
+            self.method_windows[(host, method)] = _rebuild(self._method(host, method), method_limits)
+
+        for windows, header in (
+            (self._app(host), "X-App-Rate-Limit-Count"),
+            (self._method(host, method), "X-Method-Rate-Limit-Count"),
+        ):
+            counts = dict((w, c) for c, w in parse_rate_limits(headers.get(header)))
+            for window in windows:
+                if window.window in counts:
+                    window.sync(counts[window.window], now)
+
+        if status_code == 429:
+            retry_after = float(headers.get("Retry-After", "1"))
+            # "application" limits block the whole host; method/service limits only that method
+            key = host if headers.get("X-Rate-Limit-Type") == "application" else (host, method)
+            self.blocked_until[key] = max(self.blocked_until.get(key, 0), now + retry_after)
+            if self.ledger:
+                # Off the event loop, like reserve(): other workers may hold the ledger for a while
+                await asyncio.to_thread(self.ledger.block, key if key == host else f"{host}:{method}", retry_after)
+
+    def app_wait(self) -> float:
+        """Seconds until every known host has app budget again (0 when all have room now)"""
+        now = time.monotonic()
+        return max((
+            max(self.blocked_until.get(host, 0) - now, *(w.wait_time(now) for w in windows), 0)
+            for host, windows in self.app_windows.items()
+        ), default=0)
+
+    def stats(self) -> dict:
+        return {
+            "queuedInteractive": self._queued(INTERACTIVE),
+            "queuedBackground": self._queued(BACKGROUND),
+            "throttled": self.throttled,
+            "appLimits": {
+                host: [f"{w.limit}:{int(w.window)}" for w in windows]
+                for host, windows in self.app_windows.items()
+            },
+        }
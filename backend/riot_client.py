@@ -0,0 +1,194 @@
+import os
+import time
+import random
+import asyncio
+from collections import deque
+import httpx
+import numpy as np
+from rate_limiter import RateLimitScheduler
+from circuit_breaker import CircuitBreaker
+from metrics import (
+    RIOT_REQUEST_SECONDS, RIOT_QUEUE_SECONDS, RIOT_RESPONSES, RIOT_ERRORS, RIOT_RETRIES,
+    RIOT_RATE_LIMITED, RIOT_IN_FLIGHT, RIOT_HEDGES, RIOT_CIRCUIT_OPEN, record_upstream,
+)
+
+# Per-host connection pool configuration (override via environment)
+RIOT_MAX_CONNECTIONS = int(os.getenv("RIOT_MAX_CONNECTIONS", "50"))
+RIOT_MAX_KEEPALIVE = int(os.getenv("RIOT_MAX_KEEPALIVE", "20"))
+RIOT_KEEPALIVE_EXPIRY = float(os.getenv("RIOT_KEEPALIVE_EXPIRY", "60"))
+RIOT_CONNECT_TIMEOUT = float(os.getenv("RIOT_CONNECT_TIMEOUT", "5"))
+RIOT_READ_TIMEOUT = float(os.getenv("RIOT_READ_TIMEOUT", "10"))
+RIOT_HTTP2 = os.getenv("RIOT_HTTP2", "true").lower() in ("1", "true", "yes")
+
+# Max Riot requests in flight at once across all endpoints
+RIOT_MAX_CONCURRENCY = int(os.getenv("RIOT_MAX_CONCURRENCY", "20"))
+
+# How many times a 429 is retried (after Retry-After) before giving up
+RIOT_MAX_429_RETRIES = int(os.getenv("RIOT_MAX_429_RETRIES", "3"))
+
+# 5xx responses and network errors: retries with full-jitter exponential backoff
+RIOT_MAX_RETRIES = int(os.getenv("RIOT_MAX_RETRIES", "2"))
+RIOT_RETRY_BASE_DELAY = float(os.getenv("RIOT_RETRY_BASE_DELAY", "0.25"))
+RIOT_RETRY_MAX_DELAY = float(os.getenv("RIOT_RETRY_MAX_DELAY", "2"))
+
+# Hedged requests: a second copy of a slow call is sent once it outlives the method's
+# recent p95 latency (never sooner than RIOT_HEDGE_MIN_DELAY); the first answer wins
+RIOT_HEDGE = os.getenv("RIOT_HEDGE", "false").lower() in ("1", "true", "yes")
+RIOT_HEDGE_METHODS = set(os.getenv("RIOT_HEDGE_METHODS", "match-v5.match").split(","))
+RIOT_HEDGE_MIN_DELAY = float(os.getenv("RIOT_HEDGE_MIN_DELAY", "0.2"))
+# Latency samples needed per method before hedging starts
+HEDGE_MIN_SAMPLES = 20
+
+
+class RiotClient:
+    """Application-scoped Riot API client with keep-alive pooling and HTTP/2.
+
+    Each routing host (la2, americas, europe, ...) gets its own connection
+    pool so one region's traffic can't starve another's.
+    """
+
+    def __init__(self, api_key: str, transport: httpx.AsyncBaseTransport = None, rate_ledger=None):
+        self.api_key = api_key
+        self.transport = transport
+        self.clients = {}  # host -> httpx.AsyncClient
+        self.semaphore = asyncio.Semaphore(RIOT_MAX_CONCURRENCY)
+        # rate_ledger shares rate limit accounting with other worker processes
+        self.scheduler = RateLimitScheduler(ledger=rate_ledger)
+        self.breakers = {}  # host -> CircuitBreaker
+        self.latencies = {}  # method -> recent response times, for the hedge delay
+
+    def _client(self, host: str) -> httpx.AsyncClient:
+        if host not in self.clients:
+            self.clients[host] = httpx.AsyncClient(
+                http2=RIOT_HTTP2,
+                headers={"X-Riot-Token": self.api_key},
+                limits=httpx.Limits(
+                    max_connections=RIOT_MAX_CONNECTIONS,
+                    max_keepalive_connections=RIOT_MAX_KEEPALIVE,
+                    keepalive_expiry=RIOT_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(RIOT_READ_TIMEOUT, connect=RIOT_CONNECT_TIMEOUT),
+                transport=self.transport,
+            )
+        return self.clients[host]
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(host)
+        return self.breakers[host]
+
+    async def get(self, url: str, method: str) -> httpx.Response:
+        """GET a Riot API URL over the shared pool, paced by the rate limit scheduler.
+
+        method names the Riot endpoint (e.g. "match-v5.match") for per-method budgets.
+        A 429 is retried after Retry-After; 5xx responses and network errors are
+        retried with jittered backoff. The last response is returned as-is (or the
+        network error raised). Raises RiotUnavailable while the host's circuit is open.
+        """
+        host = httpx.URL(url).host
+        breaker = self._breaker(host)
+        rate_limited = 0
+        failures = 0
+        while True:
+            breaker.check()
+            try:
+                response = await self._send(host, url, method)
+            except httpx.HTTPError:
+                self._record_failure(breaker)
+                if failures >= RIOT_MAX_RETRIES:
+                    raise
+                failures += 1
+                RIOT_RETRIES.labels(method, "error").inc()
+                await asyncio.sleep(self._backoff(failures))
+                continue
+            except BaseException:
+                breaker.abandon()
+                raise
+
+            if response.status_code >= 500:
+                self._record_failure(breaker)
+                if failures >= RIOT_MAX_RETRIES:
+                    return response
+                failures += 1
+                RIOT_RETRIES.labels(method, "5xx").inc()
+                await asyncio.sleep(self._backoff(failures))
+                continue
+
+            breaker.record_success()
+            RIOT_CIRCUIT_OPEN.labels(host).set(0)
+            if response.status_code == 429 and rate_limited < RIOT_MAX_429_RETRIES:
+                # The scheduler already holds the next attempt until Retry-After
+                rate_limited += 1
+                RIOT_RETRIES.labels(method, "429").inc()
+                continue
+            return response
+
+    def _record_failure(self, breaker: CircuitBreaker):
+        breaker.record_failure()
+        RIOT_CIRCUIT_OPEN.labels(breaker.host).set(1 if breaker.state == "open" else 0)
+
+    @staticmethod
+    def _backoff(failures: int) -> float:
+        # Full jitter, so retries from many requests don't arrive in lockstep
+        return random.uniform(0, min(RIOT_RETRY_MAX_DELAY, RIOT_RETRY_BASE_DELAY * 2 ** (failures - 1)))
+
+    def _hedge_delay(self, method: str):
+        """Seconds to wait before hedging a call, or None when it shouldn't be hedged"""
+        samples = self.latencies.get(method)
+        if not RIOT_HEDGE or method not in RIOT_HEDGE_METHODS or not samples or len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(float(np.percentile(samples, 95)), RIOT_HEDGE_MIN_DELAY)
+
+    async def _send(self, host: str, url: str, method: str) -> httpx.Response:
+        """One logical attempt - possibly raced against a hedged copy"""
+        delay = self._hedge_delay(method)
+        if delay is None:
+            return await self._attempt(host, url, method)
+
+        tasks = {asyncio.ensure_future(self._attempt(host, url, method))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                RIOT_HEDGES.labels(method).inc()
+                tasks.add(asyncio.ensure_future(self._attempt(host, url, method)))
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _attempt(self, host: str, url: str, method: str) -> httpx.Response:
+        """A single paced, instrumented GET"""
+        queued_at = time.perf_counter()
+        await self.scheduler.acquire(host, method)
+        async with self.semaphore:
+            sent_at = time.perf_counter()
+            RIOT_QUEUE_SECONDS.labels(method).observe(sent_at - queued_at)
+            RIOT_IN_FLIGHT.inc()
+            try:
+                response = await self._client(host).get(url)
+            except httpx.HTTPError as e:
+                RIOT_ERRORS.labels(method, type(e).__name__).inc()
+                record_upstream(method, None, time.perf_counter() - sent_at, sent_at - queued_at)
+                raise
+            finally:
+                RIOT_IN_FLIGHT.dec()
+        elapsed = time.perf_counter() - sent_at
+        RIOT_REQUEST_SECONDS.labels(method).observe(elapsed)
+        RIOT_RESPONSES.labels(method, str(response.status_code)).inc()
+        record_upstream(method, response.status_code, elapsed, sent_at - queued_at)
+        self.latencies.setdefault(method, deque(maxlen=200)).append(elapsed)
+        await self.scheduler.update(host, method, response.status_code, response.headers)
+        if response.status_code == 429:
+            RIOT_RATE_LIMITED.labels(method, response.headers.get("X-Rate-Limit-Type", "unknown")).inc()
+        return response
+
+    async def aclose(self):
+        for client in self.clients.values():
+            await client.aclose()
@@ -0,0 +1,119 @@
+import os
+from typing import Dict, List, Optional
+import numpy as np
+from match_record import MatchRecord
+
+# MVP score weights, e.g. MVP_WEIGHTS="kda=30,damageShare=20,goldPerMinute=15,visionScore=10,killParticipation=25"
+DEFAULT_MVP_WEIGHTS = {
+    "kda": 30,
+    "damageShare": 20,
+    "goldPerMinute": 15,
+    "visionScore": 10,
+    "killParticipation": 25,
+}
+
+
+def parse_weights(value: str) -> Dict[str, float]:
+    weights = dict(DEFAULT_MVP_WEIGHTS)
+    for part in value.split(","):
+        name, _, weight = part.strip().partition("=")
+        if name in weights and weight:
+            weights[name] = float(weight)
+    return weights
+
+
+MVP_WEIGHTS = parse_weights(os.getenv("MVP_WEIGHTS", ""))
+
+# Integer stat columns copied straight from the participant records
+INT_COLUMNS = ("kills", "deaths", "assists", "cs", "gold", "damage", "damage_taken", "vision_score", "team_id")
+
+
+class ParticipantTable:
+    """Columnar view of match participants - one row per player per match.
+
+    Rows keep the order of the matches (and of the participants within
+    each match) they were built from, so row-wise results line up with the
+    original participant lists. All scores, rates and rankings are
+    computed for every row at once with NumPy.
+    """
+
+    def __init__(self, matches: List[MatchRecord], weights: Optional[Dict[str, float]] = None):
+        participants = [p for match in matches for p in match.participants]
+        counts = [len(match.participants) for match in matches]
+        self.size = len(participants)
+        self.match_index = np.repeat(np.arange(len(counts)), counts)
+        self.match_starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(int) if counts else np.zeros(0, int)
+        self.puuids = np.array([p.puuid for p in participants])
+        for column in INT_COLUMNS:
+            setattr(self, column, np.fromiter((getattr(p, column) for p in participants), dtype=np.int64, count=self.size))
+        self.time_played = np.fromiter((p.time_played for p in participants), dtype=np.float64, count=self.size)
+        self.win = np.fromiter((p.win for p in participants), dtype=bool, count=self.size)
+        self.damage_share = np.fromiter((p.damage_share for p in participants), dtype=np.float64, count=self.size)
+        self.kill_participation = np.fromiter(
+            (p.kill_participation for p in participants), dtype=np.float64, count=self.size
+        )
+        self.scores = self.mvp_scores(weights)
+        self.ranks = self.rankings(self.scores)
+
+    def rows_for(self, puuid: str) -> np.ndarray:
+        """Row indices where puuid played, in match order"""
+        return np.flatnonzero(self.puuids == puuid)
+
+    def kda(self) -> np.ndarray:
+        return (self.kills + self.assists) / np.maximum(self.deaths, 1)
+
+    def gold_per_minute(self) -> np.ndarray:
+        return self.gold / (self.time_played / 60)
+
+    def damage_per_minute(self) -> np.ndarray:
+        return self.damage / (self.time_played / 60)
+
+    def mvp_scores(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """MVP score for every row, rounded to 2 decimals"""
+        w = weights or MVP_WEIGHTS
+        scores = (
+            self.kda() * w["kda"] +
+            self.damage_share * 100 * w["damageShare"] +
+            (self.gold_per_minute() / 10) * w["goldPerMinute"] +
+            self.vision_score * w["visionScore"] +
+            self.kill_participation * 100 * w["killParticipation"]
+        )
+        return np.round(scores, 2)
+
+    def rankings(self, scores: np.ndarray) -> np.ndarray:
+        """1-based MVP ranking of every row within its own match (ties keep participant order)"""
+        # Sort by match, then score descending; lexsort is stable so ties keep row order
+        order = np.lexsort((-scores, self.match_index))
+        ranks = np.empty(self.size, dtype=np.int64)
+        ranks[order] = np.arange(self.size) - self.match_starts[self.match_index[order]] + 1
+        return ranks
+
+    def derived_stats(self) -> Dict[str, list]:
+        """Per-row derived stats as plain lists, rounded the way the API reports them"""
+        return {
+            "mvpScore": self.scores.tolist(),
+            "ranking": self.ranks.tolist(),
+            "kda": np.round(self.kda(), 2).tolist(),
+            "goldPerMinute": np.round(self.gold_per_minute(), 2).tolist(),
+            "damagePerMinute": np.round(self.damage_per_minute(), 2).tolist(),
+            "killParticipation": np.round(self.kill_participation * 100, 1).tolist(),
+        }
+
+
+def window_totals(table: ParticipantTable, rows: np.ndarray) -> dict:
+    """Totals over the given rows (e.g. rows_for one player), in the shape calculate_averages expects"""
+    return {
+        "kills": int(table.kills[rows].sum()),
+        "deaths": int(table.deaths[rows].sum()),
+        "assists": int(table.assists[rows].sum()),
+        "cs": int(table.cs[rows].sum()),
+        "gold": int(table.gold[rows].sum()),
+        "damage": int(table.damage[rows].sum()),
+        "visionScore": int(table.vision_score[rows].sum()),
+        "mvpScore": float(table.scores[rows].sum()),
+        "wins": int(table.win[rows].sum()),
+        "games": int(len(rows)),
+        "mvp_count": int((table.ranks[rows] == 1).sum()),
+        "top3_count": int((table.ranks[rows] <= 3).sum()),
+        "troll_count": int((table.ranks[rows] == 10).sum()),
+    }
@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Hashable, List, Optional, Tuple
+
+# Multi-worker configuration (override via environment)
+# WEB_CONCURRENCY is also what uvicorn/gunicorn read for their worker count
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# SQLite file shared by all workers; empty disables sharing (defaults on when running several workers)
+SHARED_STATE_PATH = os.getenv("SHARED_STATE_PATH", "shared_state.sqlite3" if WEB_CONCURRENCY > 1 else "")
+
+# Clean up expired entries once every N writes rather than on every insert
+CLEANUP_EVERY = 500
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # Autocommit; transactions are opened explicitly where several statements must be atomic
+    conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class SharedCache:
+    """Cross-process second tier behind the in-process TTLCaches.
+
+    Values are stored as JSON with the wall-clock time they were loaded, so
+    each worker applies its own cache's TTL when reading them back.
+    """
+
+    def __init__(self, path: str = SHARED_STATE_PATH):
+        self.lock = threading.Lock()
+        self.writes = 0
+        self.conn = _connect(path)
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )"""
+        )
+
+    def get(self, namespace: str, key: Hashable) -> Optional[Tuple[Any, float]]:
+        """(value, age in seconds), or None on a miss"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ?", (namespace, json.dumps(key))
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), time.time() - row[1]
+
+    def put(self, namespace: str, key: Hashable, value: Any, max_age: float):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (namespace, json.dumps(key), json.dumps(value, separators=(",", ":")), now)
+            )
+            self.writes += 1
+            if self.writes >= CLEANUP_EVERY:
+                self.writes = 0
+                # Entries past their namespace's max age are never served again
+                self.conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND stored_at < ?", (namespace, now - max_age)
+                )
+
+    def delete(self, namespace: str, key: Hashable):
+        with self.lock:
+            self.conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, json.dumps(key)))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class SharedRateLedger:
+    """Riot rate limit accounting shared by every worker process.
+
+    Each reserved request is logged per bucket (a host, or host + method),
+    and a reservation only goes through if every window of every bucket
+    still has room. 429 Retry-After blocks are shared the same way, so N
+    workers together stay inside one app budget.
+    """
+
+    def __init__(self, path: str = SHARED_STATE_PATH):
+        self.lock = threading.Lock()
+        self.reserves = 0
+        self.conn = _connect(path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS rate_events (bucket TEXT NOT NULL, sent_at REAL NOT NULL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_events ON rate_events (bucket, sent_at)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS rate_blocks (bucket TEXT PRIMARY KEY, until REAL NOT NULL)")
+
+    def reserve(self, buckets: List[Tuple[str, List[Tuple[int, float]]]]) -> float:
+        """Log one request in every bucket if all their (limit, window)s allow it.
+
+        Returns 0 when reserved, otherwise the seconds to wait before trying again.
+        """
+        with self.lock:
+            now = time.time()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                wait = 0.0
+                for bucket, limits in buckets:
+                    row = self.conn.execute("SELECT until FROM rate_blocks WHERE bucket = ?", (bucket,)).fetchone()
+                    if row:
+                        wait = max(wait, row[0] - now)
+                    for limit, window in limits:
+                        # The limit-th newest request in the window has to age out first
+                        row = self.conn.execute(
+                            """SELECT sent_at FROM rate_events WHERE bucket = ? AND sent_at > ?
+                               ORDER BY sent_at DESC LIMIT 1 OFFSET ?""",
+                            (bucket, now - window, limit - 1)
+                        ).fetchone()
+                        if row:
+                            wait = max(wait, row[0] + window - now)
+                if wait <= 0:
+                    self.conn.executemany(
+                        "INSERT INTO rate_events (bucket, sent_at) VALUES (?, ?)", [(bucket, now) for bucket, _ in buckets]
+                    )
+                    self.reserves += 1
+                    if self.reserves >= CLEANUP_EVERY:
+                        self.reserves = 0
+                        longest = max((window for _, limits in buckets for _, window in limits), default=0)
+                        self.conn.execute("DELETE FROM rate_events WHERE sent_at < ?", (now - max(longest, 3600),))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return wait
+
+    def block(self, bucket: str, seconds: float):
+        """Hold a bucket for every worker (after a 429's Retry-After)"""
+        until = time.time() + seconds
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO rate_blocks (bucket, until) VALUES (?, ?)
+                   ON CONFLICT (bucket) DO UPDATE SET until = MAX(until, excluded.until)""",
+                (bucket, until)
+            )
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def acquire_leadership(path: str):
+    """Take an exclusive lock file so exactly one worker runs singleton jobs.
+
+    Returns the open lock file (keep it open to keep the lock), or None if
+    another worker already holds it.
+    """
+    import fcntl
+    lock_file = open(path, "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
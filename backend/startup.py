@@ -0,0 +1,106 @@
+import os
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+import orjson
+from metrics import APP_STARTUP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Startup and readiness (override via environment)
+# In-memory caches are saved here on shutdown and reloaded on startup; empty disables
+CACHE_SNAPSHOT_PATH = os.getenv("CACHE_SNAPSHOT_PATH", "cache_snapshot.json")
+# Most recently read matches preloaded from the match store into memory
+STARTUP_WARM_MATCHES = int(os.getenv("STARTUP_WARM_MATCHES", "200"))
+# /readyz reports not ready while the Riot rate budget is exhausted for longer than this
+READY_MAX_RATE_WAIT = float(os.getenv("READY_MAX_RATE_WAIT", "10"))
+
+
+class Lazy:
+    """A subsystem opened on first use instead of during startup.
+
+    open() creates the instance (once, thread-safe) the first time it is
+    needed - by a request or by the warm-up running in the background.
+    Opening can block, so call open() from a worker thread, e.g.
+    asyncio.to_thread(lambda: lazy.open().method(...)), never on the
+    event loop.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self.instance = None
+        self.lock = threading.Lock()
+
+    def open(self) -> Any:
+        if self.instance is None:
+            with self.lock:
+                if self.instance is None:
+                    self.instance = self.factory()
+        return self.instance
+
+    def close(self):
+        """Close the instance if it was ever opened"""
+        if self.instance is not None and hasattr(self.instance, "close"):
+            self.instance.close()
+
+
+class Startup:
+    """Times the startup phases and tracks when the instance is warm.
+
+    Phases are logged and exported as app_startup_seconds{phase}; "total"
+    runs from the first import to the end of the warm-up.
+    """
+
+    def __init__(self, started: float):
+        self.started = started
+        self.phases: Dict[str, float] = {}
+        self.warm = False
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = round(seconds, 3)
+        APP_STARTUP_SECONDS.labels(name).set(seconds)
+        logger.info("Startup phase %s took %.3fs", name, seconds)
+
+    def finish(self):
+        """The warm-up is done (or gave up) - the instance is ready"""
+        self.record("total", time.perf_counter() - self.started)
+        self.warm = True
+
+
+def save_snapshot(path: str, caches: List):
+    """Write the caches' servable entries to path (atomically; the last worker to stop wins)"""
+    snapshot = {"savedAt": time.time(), "caches": {cache.name: cache.snapshot() for cache in caches}}
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(orjson.dumps(snapshot))
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str, caches: List) -> int:
+    """Restore entries saved by save_snapshot, aged by the time since; returns how many were loaded"""
+    try:
+        with open(path, "rb") as f:
+            snapshot = orjson.loads(f.read())
+    except FileNotFoundError:
+        return 0
+    elapsed = max(time.time() - snapshot["savedAt"], 0)
+    loaded = 0
+    for cache in caches:
+        # JSON turns the tuple keys into lists
+        items = [
+            (tuple(key) if isinstance(key, list) else key, value, age + elapsed)
+            for key, value, age in snapshot["caches"].get(cache.name, ())
+        ]
+        loaded += cache.restore(items)
+    return loaded
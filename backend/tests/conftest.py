@@ -0,0 +1,27 @@
+import os
+import tempfile
+import pytest
+
+# main reads its configuration at import time, so point it at the offline Riot
+# mock and a scratch directory before anything imports it
+SCRATCH_DIR = tempfile.mkdtemp(prefix="lol-tests-")
+os.environ.update({
+    "RIOT_MOCK": "true",
+    "RIOT_MOCK_LATENCY_MS": "0",
+    "RIOT_MOCK_JITTER_MS": "0",
+    "RIOT_APP_RATE_LIMIT": "500:10",
+    "MATCH_STORE_PATH": os.path.join(SCRATCH_DIR, "match_store.sqlite3"),
+    "TIMELINE_STORE_DIR": os.path.join(SCRATCH_DIR, "timelines"),
+    "SHARED_STATE_PATH": "",
+    "CACHE_SNAPSHOT_PATH": "",
+    # One tracked player, so the background ingester (and its timeline fetches) runs too
+    "TRACKED_PLAYERS": "Player2#MOCK",
+})
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import main
+    with TestClient(main.app) as client:
+        yield client
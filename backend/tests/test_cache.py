@@ -0,0 +1,166 @@
+import asyncio
+import time
+from cache import TTLCache
+from rate_limiter import priority_lane, lane_priority, BACKGROUND, INTERACTIVE
+
+
+class Loader:
+    """Counts calls and returns "value-<n>", optionally after a delay"""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.calls = 0
+        self.lanes = []
+
+    async def __call__(self):
+        self.calls += 1
+        self.lanes.append(lane_priority(priority_lane.get()))
+        await asyncio.sleep(self.delay)
+        self.lanes.append(lane_priority(priority_lane.get()))
+        return f"value-{self.calls}"
+
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        cache = TTLCache("test", ttl=60)
+        loader = Loader(delay=0.01)
+        values = await asyncio.gather(*(cache.get_or_load("key", loader) for _ in range(5)))
+        assert values == ["value-1"] * 5
+        assert await cache.get_or_load("key", loader) == "value-1"
+        assert loader.calls == 1
+        stats = cache.stats()
+        assert (stats["misses"], stats["coalesced"], stats["hits"]) == (5, 4, 1)
+
+    asyncio.run(run())
+
+
+def test_stale_value_is_served_while_revalidating():
+    async def run():
+        cache = TTLCache("test", ttl=0.05, stale_ttl=60)
+        loader = Loader()
+        assert await cache.get_or_load("key", loader) == "value-1"
+        await asyncio.sleep(0.06)
+
+        # Stale: the old value comes back at once and one refresh starts in the background lane
+        assert await cache.get_or_load("key", loader) == "value-1"
+        assert await cache.get_or_load("key", loader) == "value-1"
+        await asyncio.sleep(0.01)
+        assert loader.calls == 2 and loader.lanes[-1] == BACKGROUND
+        assert await cache.get_or_load("key", loader) == "value-2"
+        assert cache.stats()["staleHits"] == 2
+
+    asyncio.run(run())
+
+
+def test_expired_value_is_reloaded():
+    async def run():
+        cache = TTLCache("test", ttl=0.01, stale_ttl=0.01)
+        loader = Loader()
+        await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.03)
+        assert await cache.get_or_load("key", loader) == "value-2"
+
+    asyncio.run(run())
+
+
+def test_interactive_caller_promotes_a_background_load():
+    async def run():
+        cache = TTLCache("test", ttl=60)
+        loader = Loader(delay=0.05)
+
+        async def background():
+            priority_lane.set(BACKGROUND)
+            return await cache.get_or_load("key", loader)
+
+        started = asyncio.ensure_future(background())
+        await asyncio.sleep(0.01)
+        assert priority_lane.get() == INTERACTIVE
+        assert await cache.get_or_load("key", loader) == "value-1"
+        assert await started == "value-1"
+        # Started in the background lane, finished in the interactive one once a user request joined
+        assert loader.lanes == [BACKGROUND, INTERACTIVE]
+
+    asyncio.run(run())
+
+
+def test_refresh_joining_a_revalidation_promotes_it():
+    async def run():
+        cache = TTLCache("test", ttl=0.01, stale_ttl=60)
+        loader = Loader(delay=0.05)
+        await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.02)
+        assert await cache.get_or_load("key", loader) == "value-1"
+        await asyncio.sleep(0.01)
+        assert await cache.refresh("key", loader) == "value-2"
+        assert loader.calls == 2 and loader.lanes[2:] == [BACKGROUND, INTERACTIVE]
+
+    asyncio.run(run())
+
+
+class SharedTier:
+    """In-memory stand-in for shared_state.SharedCache with ages set by the test"""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, namespace, key):
+        return self.values.get((namespace, key))
+
+    def put(self, namespace, key, value, max_age):
+        self.values[(namespace, key)] = (value, 0)
+
+    def delete(self, namespace, key):
+        self.values.pop((namespace, key), None)
+
+
+def test_shared_tier_value_keeps_its_age():
+    async def run():
+        shared = SharedTier()
+        cache = TTLCache("test", ttl=10, stale_ttl=60, shared=shared)
+        loader = Loader()
+        # Another worker loaded it 30s ago: past ttl but still servable, and revalidated right away
+        shared.values[("test", "key")] = ("other-worker", 30)
+        assert await cache.get_or_load("key", loader) == "other-worker"
+        assert loader.calls == 0 and cache.stats()["sharedHits"] == 1
+        assert cache.peek("key") is None
+
+        # The revalidation skips the shared tier's stale copy and loads (and writes through) a new value
+        assert await cache.get_or_load("key", loader) == "other-worker"
+        await asyncio.sleep(0.01)
+        assert loader.calls == 1
+        assert shared.values[("test", "key")] == ("value-1", 0)
+        assert await cache.get_or_load("key", loader) == "value-1"
+
+    asyncio.run(run())
+
+
+def test_revalidation_takes_a_fresh_shared_value():
+    async def run():
+        shared = SharedTier()
+        cache = TTLCache("test", ttl=0.01, stale_ttl=60, shared=shared)
+        loader = Loader()
+        await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.02)
+        # Meanwhile another worker refreshed it
+        shared.values[("test", "key")] = ("other-worker", 0)
+        assert await cache.get_or_load("key", loader) == "value-1"
+        await asyncio.sleep(0.01)
+        assert loader.calls == 1
+        assert await cache.get_or_load("key", loader) == "other-worker"
+
+    asyncio.run(run())
+
+
+def test_snapshot_and_restore_keep_age():
+    cache = TTLCache("test", ttl=10, stale_ttl=10)
+    cache.set("fresh", 1)
+    cache._store("stale", 2, time.monotonic() - 5)
+    cache._store("gone", 3, time.monotonic() - 20)
+    items = {key: (value, age) for key, value, age in cache.snapshot()}
+    assert set(items) == {"fresh", "stale"}
+    assert 14 < items["stale"][1] < 16
+
+    restored = TTLCache("test", ttl=10, stale_ttl=10)
+    assert restored.restore([(key, value, age) for key, (value, age) in items.items()]) == 2
+    assert restored.peek("fresh") == 1
+    assert restored.peek("stale") is None
@@ -0,0 +1,67 @@
+import time
+import pytest
+from circuit_breaker import CircuitBreaker, RiotUnavailable, CLOSED, OPEN, HALF_OPEN
+
+
+def tripped(cooldown: float = 30) -> CircuitBreaker:
+    breaker = CircuitBreaker("americas", threshold=3, cooldown=cooldown)
+    for _ in range(3):
+        breaker.check()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_consecutive_failures():
+    breaker = CircuitBreaker("americas", threshold=3, cooldown=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker = tripped()
+    assert breaker.state == OPEN
+    with pytest.raises(RiotUnavailable) as raised:
+        breaker.check()
+    assert raised.value.host == "americas"
+    assert 29 < raised.value.retry_after <= 30
+    assert breaker.status() == {"state": OPEN, "failures": 3, "trips": 1}
+
+
+def test_half_open_lets_a_single_probe_through():
+    breaker = tripped(cooldown=0.01)
+    time.sleep(0.02)
+    breaker.check()
+    assert breaker.state == HALF_OPEN
+    # Everyone else keeps failing fast while the probe is out
+    for _ in range(3):
+        with pytest.raises(RiotUnavailable):
+            breaker.check()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.check()
+    breaker.check()
+
+
+def test_failed_probe_reopens_for_another_cooldown():
+    breaker = tripped(cooldown=0.01)
+    time.sleep(0.02)
+    breaker.check()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(RiotUnavailable):
+        breaker.check()
+    time.sleep(0.02)
+    breaker.check()
+    assert breaker.state == HALF_OPEN
+
+
+def test_abandoned_probe_lets_another_through():
+    breaker = tripped(cooldown=0.01)
+    time.sleep(0.02)
+    breaker.check()
+    breaker.abandon()
+    breaker.check()
+    with pytest.raises(RiotUnavailable):
+        breaker.check()
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+import main
+from match_store import MatchStore
+
+PLATFORM = "la2"
+
+
+class History:
+    """A player's ranked flex match IDs on the Riot side (newest first), serving ids pages"""
+
+    def __init__(self, games: int):
+        self.ids = [f"LA2_{n}" for n in range(games, 0, -1)]
+        self.pages = []
+
+    def play(self, games: int):
+        newest = int(self.ids[0].split("_")[1]) if self.ids else 0
+        self.ids = [f"LA2_{n}" for n in range(newest + games, newest, -1)] + self.ids
+
+    async def fetch(self, puuid: str, platform: str, start: int, count: int):
+        self.pages.append((start, count))
+        return self.ids[start:start + count]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = MatchStore(str(tmp_path / "store.sqlite3"))
+    monkeypatch.setattr(main.app.state, "match_store", store, raising=False)
+    monkeypatch.setattr(main, "MATCH_SYNC_PROBE_SIZE", 5)
+    yield store
+    store.close()
+
+
+def sync(history: History, monkeypatch, puuid: str, count: int):
+    monkeypatch.setattr(main, "fetch_match_id_page", history.fetch)
+    history.pages = []
+    return asyncio.run(main.sync_match_ids(puuid, count, PLATFORM))
+
+
+def test_first_sync_fetches_just_the_window(store, monkeypatch):
+    history = History(300)
+    assert sync(history, monkeypatch, "first", 20) == history.ids[:20]
+    assert history.pages == [(0, 20)]
+    assert store.known_match_ids("first") == (history.ids[:20], False)
+
+
+def test_refresh_probes_and_stops_at_a_known_id(store, monkeypatch):
+    history = History(50)
+    sync(history, monkeypatch, "probe", 10)
+
+    # Nothing new: one small probe
+    assert sync(history, monkeypatch, "probe", 10) == history.ids[:10]
+    assert history.pages == [(0, 5)]
+
+    # Two new games: still one probe, stopping at the first known ID
+    history.play(2)
+    assert sync(history, monkeypatch, "probe", 10) == history.ids[:10]
+    assert history.pages == [(0, 5)]
+
+    # Seven new games: the probe is all new, so page on (full pages) until a known ID
+    history.play(7)
+    assert sync(history, monkeypatch, "probe", 10) == history.ids[:10]
+    assert history.pages == [(0, 5), (5, 100)]
+    assert store.known_match_ids("probe")[0] == history.ids[:19]
+
+
+def test_probe_is_skipped_when_the_newest_id_is_known(store, monkeypatch):
+    history = History(50)
+    sync(history, monkeypatch, "latest", 10)
+    main.latest_match_cache.set((PLATFORM, "latest"), history.ids[0])
+    assert sync(history, monkeypatch, "latest", 10) == history.ids[:10]
+    assert history.pages == []
+
+
+def test_deeper_window_backfills_from_the_stored_offset(store, monkeypatch):
+    history = History(300)
+    sync(history, monkeypatch, "deeper", 10)
+    assert sync(history, monkeypatch, "deeper", 150) == history.ids[:150]
+    # The probe, then only the older games: from offset 10, in pages of at most 100
+    assert history.pages == [(0, 5), (10, 100), (110, 40)]
+    assert store.known_match_ids("deeper") == (history.ids[:150], False)
+
+
+def test_short_history_is_marked_complete(store, monkeypatch):
+    history = History(7)
+    assert sync(history, monkeypatch, "short", 20) == history.ids
+    assert store.known_match_ids("short") == (history.ids, True)
+
+    # Complete: a bigger window never pages for older games again
+    assert sync(history, monkeypatch, "short", 50) == history.ids
+    assert history.pages == [(0, 5)]
+
+
+def test_backfill_running_out_marks_complete(store, monkeypatch):
+    history = History(30)
+    sync(history, monkeypatch, "runs-out", 10)
+    assert sync(history, monkeypatch, "runs-out", 100) == history.ids
+    assert history.pages == [(0, 5), (10, 90)]
+    assert store.known_match_ids("runs-out") == (history.ids, True)
@@ -0,0 +1,93 @@
+import pytest
+import player_stats
+import scoring
+from match_record import MatchRecord
+from mock_riot import MockRiotTransport
+from player_stats import PlayerStatsStore
+
+MOCK = MockRiotTransport()
+PLAYER = MOCK.puuids[0]
+
+
+def match(game: int, queue_id: int = 440) -> MatchRecord:
+    document = MOCK.match_document(game)
+    document["info"]["queueId"] = queue_id
+    return MatchRecord.from_riot(document)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PlayerStatsStore(str(tmp_path / "stats.sqlite3"), windows=[2, 3])
+    yield store
+    store.close()
+
+
+def history(count: int) -> list:
+    """PLAYER's newest `count` games, newest first"""
+    return [match(game) for game in reversed(MOCK.histories[0][-count:])]
+
+
+def test_windows_total_the_newest_games(store):
+    matches = history(4)
+    assert store.record_matches(matches) == 40
+    assert store.record_match(matches[0]) == 0
+
+    games = store.games_for(PLAYER, [m.match_id for m in matches])
+    windows = store.profile(PLAYER)["windows"]
+    for window in (2, 3):
+        newest = games[:window]
+        assert windows[window]["games"] == window
+        assert windows[window]["kills"] == sum(g["kills"] for g in newest)
+        assert windows[window]["mvpScore"] == pytest.approx(sum(g["mvp_score"] for g in newest))
+        assert windows[window]["mvp_count"] == sum(g["ranking"] == 1 for g in newest)
+    assert store.totals_for(PLAYER, [m.match_id for m in matches[:3]]) == windows[3]
+
+
+def test_other_queues_are_not_recorded(store):
+    assert store.record_match(match(MOCK.histories[0][0], queue_id=450)) == 0
+    assert store.stats()["games"] == 0
+
+
+def test_backfill_after_weight_reset(tmp_path, monkeypatch):
+    path = str(tmp_path / "stats.sqlite3")
+    matches = history(3)
+    store = PlayerStatsStore(path, windows=[2])
+    assert store.needs_backfill
+    assert store.backfill(matches) == 30
+    assert store.backfill(matches) == 0
+    before = store.games_for(PLAYER, [matches[0].match_id])[0]["mvp_score"]
+    store.close()
+
+    weights = {**scoring.MVP_WEIGHTS, "kda": scoring.MVP_WEIGHTS["kda"] + 100}
+    monkeypatch.setattr(scoring, "MVP_WEIGHTS", weights)
+    monkeypatch.setattr(player_stats, "MVP_WEIGHTS", weights)
+    store = PlayerStatsStore(path, windows=[2])
+    assert store.needs_backfill
+    assert store.stats()["games"] == 0
+    assert store.backfill(matches) == 30
+    assert store.games_for(PLAYER, [matches[0].match_id])[0]["mvp_score"] != before
+    assert store.profile(PLAYER)["windows"][2]["games"] == 2
+    store.close()
+
+
+def test_global_leaderboard_ranks_synced_players_only(store):
+    matches = history(4)
+    ids = [m.match_id for m in matches]
+    store.record_matches(matches[1:])
+    # Everyone in those games has a window, but nobody's history was synced
+    assert store.leaderboard(2, 100) == []
+
+    store.mark_synced(PLAYER, ids[1:3])
+    assert [entry["puuid"] for entry in store.leaderboard(2, 100)] == [PLAYER]
+    assert store.leaderboard(3, 100) == []
+
+    # A newer game recorded outside a sync breaks the run...
+    store.record_match(matches[0])
+    assert store.leaderboard(2, 100) == []
+    # ...until a sync covers it, joining up with the earlier run
+    store.mark_synced(PLAYER, ids[:2])
+    assert [entry["puuid"] for entry in store.leaderboard(3, 100)] == [PLAYER]
+
+    # Squads are ranked whether synced or not
+    other = next(p.puuid for p in matches[0].participants if p.puuid != PLAYER)
+    assert [entry["puuid"] for entry in store.leaderboard(2, 5, 1, [other])] == [other]
@@ -0,0 +1,137 @@
+import asyncio
+import time
+import pytest
+from rate_limiter import (
+    RateLimitScheduler, SharedLane, parse_rate_limits, lane_priority, priority_lane, BACKGROUND, INTERACTIVE
+)
+
+HOST = "americas"
+METHOD = "match-v5.match"
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("20:1,100:120") == [(20, 1), (100, 120)]
+    assert parse_rate_limits(None) == []
+    assert parse_rate_limits("junk, 5:10") == [(5, 10)]
+
+
+def test_limits_and_counts_are_learned_from_headers():
+    async def run():
+        scheduler = RateLimitScheduler("100:1")
+        await scheduler.update(HOST, METHOD, 200, {
+            "X-App-Rate-Limit": "3:10",
+            "X-App-Rate-Limit-Count": "3:10",
+            "X-Method-Rate-Limit": "50:10",
+            "X-Method-Rate-Limit-Count": "1:10",
+        })
+        assert scheduler.stats()["appLimits"] == {HOST: ["3:10"]}
+        assert [(w.limit, w.window) for w in scheduler._method(HOST, METHOD)] == [(50, 10)]
+        # Riot already counted 3 calls (e.g. from another client on the key): the app budget is used up
+        assert 9 < scheduler.app_wait() <= 10
+        assert scheduler._delay(HOST, METHOD, INTERACTIVE, time.monotonic()) > 9
+
+    asyncio.run(run())
+
+
+def test_retry_after_blocks_the_app_or_just_the_method():
+    async def run():
+        scheduler = RateLimitScheduler("100:1")
+        await scheduler.update(HOST, METHOD, 429, {"Retry-After": "5", "X-Rate-Limit-Type": "method"})
+        now = time.monotonic()
+        assert 4 < scheduler._delay(HOST, METHOD, INTERACTIVE, now) <= 5
+        assert scheduler._delay(HOST, "account-v1.by-riot-id", INTERACTIVE, now) == 0
+        assert scheduler.app_wait() == 0
+
+        await scheduler.update(HOST, METHOD, 429, {"Retry-After": "2", "X-Rate-Limit-Type": "application"})
+        now = time.monotonic()
+        assert 1 < scheduler._delay(HOST, "account-v1.by-riot-id", INTERACTIVE, now) <= 2
+        assert 1 < scheduler.app_wait() <= 2
+
+    asyncio.run(run())
+
+
+def test_budget_is_paced():
+    async def run():
+        scheduler = RateLimitScheduler("2:1")
+        started = time.monotonic()
+        for _ in range(3):
+            await scheduler.acquire(HOST, METHOD)
+        assert time.monotonic() - started >= 0.9
+        assert scheduler.stats()["throttled"] >= 1
+
+    asyncio.run(run())
+
+
+def test_background_waits_for_queued_interactive_calls():
+    async def run():
+        scheduler = RateLimitScheduler("100:1")
+        scheduler.blocked_until[HOST] = time.monotonic() + 0.1
+        order = []
+
+        async def call(name: str, priority: int):
+            await scheduler.acquire(HOST, METHOD, priority)
+            order.append(name)
+
+        # The background call queues first but only goes once no interactive call is waiting
+        background = asyncio.ensure_future(call("background", BACKGROUND))
+        await asyncio.sleep(0.01)
+        await asyncio.gather(call("interactive", INTERACTIVE), background)
+        assert order == ["interactive", "background"]
+
+    asyncio.run(run())
+
+
+def test_shared_lane_follows_its_most_urgent_caller():
+    load = SharedLane(BACKGROUND)
+    nested = SharedLane(load)
+    assert lane_priority(nested) == BACKGROUND
+    load.join(BACKGROUND)
+    assert load.lanes == [BACKGROUND]
+    load.join(INTERACTIVE)
+    assert lane_priority(load) == INTERACTIVE
+    # A load started by another shared load moves up with it
+    assert lane_priority(nested) == INTERACTIVE
+
+
+def test_promoted_call_goes_ahead_of_background_work():
+    async def run():
+        scheduler = RateLimitScheduler("100:1")
+        # The promoted call's method stays blocked for longer than the background call's
+        scheduler.blocked_until[(HOST, METHOD)] = time.monotonic() + 0.2
+        scheduler.blocked_until[(HOST, "other")] = time.monotonic() + 0.05
+        lane = SharedLane(BACKGROUND)
+        order = []
+
+        async def call(name: str, method: str, priority=None):
+            if priority is None:
+                priority_lane.set(lane)
+            await scheduler.acquire(HOST, method, priority)
+            order.append(name)
+
+        background = asyncio.ensure_future(call("background", "other", BACKGROUND))
+        promoted = asyncio.ensure_future(call("promoted", METHOD))
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["queuedBackground"] == 2
+        # An interactive caller joins the load this call belongs to: it now holds back background work
+        lane.join(INTERACTIVE)
+        assert scheduler.stats()["queuedInteractive"] == 1
+        await asyncio.gather(background, promoted)
+        assert order == ["promoted", "background"]
+        assert scheduler.queued == []
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("priority", [INTERACTIVE, BACKGROUND])
+def test_cancelled_call_leaves_the_queue(priority):
+    async def run():
+        scheduler = RateLimitScheduler("100:1")
+        scheduler.blocked_until[HOST] = time.monotonic() + 10
+        task = asyncio.ensure_future(scheduler.acquire(HOST, METHOD, priority))
+        await asyncio.sleep(0.01)
+        assert scheduler.queued == [priority]
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert scheduler.queued == []
+
+    asyncio.run(run())
@@ -0,0 +1,35 @@
+import main
+from mock_riot import mock_puuid, mock_riot_id
+
+
+def last_matches(client, game_name: str, tag_line: str) -> dict:
+    response = client.post("/api/last-5-matches", json={"players": [{"game_name": game_name, "tag_line": tag_line}]})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_repeat_request_is_served_from_the_cache(client):
+    game_name, tag_line = mock_riot_id(5)
+    first = last_matches(client, game_name, tag_line)
+    hits = main.response_cache.hits
+    assert last_matches(client, game_name, tag_line) == first
+    assert main.response_cache.hits == hits + 1
+
+
+def test_new_game_misses_the_cache(client):
+    game_name, tag_line = mock_riot_id(6)
+    last_matches(client, game_name, tag_line)
+    misses = main.response_cache.misses
+
+    # The newest-match probe reports a game the cached response was built without
+    main.latest_match_cache.set((main.DEFAULT_PLATFORM, mock_puuid(6)), "MOCK_NEW")
+    last_matches(client, game_name, tag_line)
+    assert main.response_cache.misses == misses + 1
+
+
+def test_riot_ids_come_back_as_typed(client):
+    game_name, tag_line = mock_riot_id(7)
+    typed = last_matches(client, game_name, tag_line)
+    lowered = last_matches(client, game_name.lower(), tag_line.lower())
+    assert (typed["player"]["gameName"], lowered["player"]["gameName"]) == (game_name, game_name.lower())
+    assert lowered["averages"] == typed["averages"]
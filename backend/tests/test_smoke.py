@@ -0,0 +1,156 @@
+"""One call to every endpoint against the offline Riot mock (see conftest.py)"""
+import time
+import orjson
+import pytest
+from mock_riot import mock_puuid, mock_riot_id
+
+
+def player(index: int) -> dict:
+    game_name, tag_line = mock_riot_id(index)
+    return {"game_name": game_name, "tag_line": tag_line}
+
+
+def ndjson(response) -> list:
+    return [orjson.loads(line) for line in response.text.splitlines() if line.strip()]
+
+
+def wait_for(check, timeout: float = 10):
+    """Poll check() until it returns something truthy, or fail after timeout seconds"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        result = check()
+        if result:
+            return result
+        time.sleep(0.05)
+    pytest.fail(f"Timed out after {timeout}s waiting for {check.__name__}")
+
+
+def test_root(client):
+    assert client.get("/").json()["status"] == "running"
+
+
+def test_health(client):
+    assert client.get("/healthz").json() == {"status": "ok"}
+
+    def ready():
+        response = client.get("/readyz")
+        return response.status_code == 200 and response.json()
+
+    body = wait_for(ready)
+    assert body["checks"] == {"warm": True, "rateBudget": True}
+    assert "total" in body["startup"]
+    assert "app_startup_seconds" in client.get("/metrics").text
+
+
+def test_match_stats(client):
+    response = client.post("/api/match-stats", json={"players": [player(1), player(3)]})
+    assert response.status_code == 200
+    players = response.json()["players"]
+    assert len(players) == 10
+    assert [p["ranking"] for p in players] == list(range(1, 11))
+
+
+def test_match_stats_requires_players(client):
+    assert client.post("/api/match-stats", json={"players": []}).status_code == 400
+
+
+def test_unknown_player(client):
+    response = client.post("/api/last-5-matches", json={"players": [{"game_name": "nobody", "tag_line": "X"}]})
+    assert response.status_code == 404
+
+
+def test_last_matches(client):
+    response = client.post("/api/last-5-matches", json={"players": [player(1)], "count": 10})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["totalGames"] == len(body["matches"]) == 10
+    assert "failedMatches" not in body
+
+
+def test_last_matches_stream(client):
+    body = {"players": [player(1)], "count": 10}
+    records = ndjson(client.post("/api/last-5-matches/stream", json=body))
+    assert [r["type"] for r in records].count("match") == 10
+    assert records[0]["type"] == "player" and records[-1]["type"] == "summary"
+    assert records[-1]["averages"] == client.post("/api/last-5-matches", json=body).json()["averages"]
+
+
+def test_compare_players(client):
+    response = client.post("/api/compare-players", json={"players": [player(1), player(3), player(4)]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["comparedPlayers"] == 3
+    scores = [p["averages"]["mvpScore"] for p in body["players"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_compare_players_stream(client):
+    records = ndjson(client.post("/api/compare-players/stream", json={
+        "players": [player(1), {"game_name": "nobody", "tag_line": "X"}]
+    }))
+    types = [r["type"] for r in records]
+    assert types.count("player") == 1 and types[-1] == "summary"
+    error = next(r for r in records if r["type"] == "error")
+    assert (error["status"], error["index"], error["gameName"]) == (404, 1, "nobody")
+
+
+def test_batch_compare_players(client):
+    response = client.post("/api/batch/compare-players", json={"groups": [
+        {"name": "a", "players": [player(1), player(3)]},
+        {"name": "b", "players": [{"game_name": "nobody", "tag_line": "X"}]},
+    ]})
+    assert response.status_code == 200
+    assert len(response.json()["groups"]) == 2
+
+
+def latest_match_id(client, index: int) -> str:
+    return client.post("/api/last-5-matches", json={"players": [player(index)]}).json()["matches"][0]["matchId"]
+
+
+def test_match_details(client):
+    match_id = latest_match_id(client, 1)
+    response = client.get(f"/api/matches/{match_id}")
+    assert response.status_code == 200
+    assert client.get(f"/api/matches/{match_id}", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_timeline(client):
+    match_id = latest_match_id(client, 1)
+    response = client.get(f"/api/matches/{match_id}/timeline", params={"points": 10})
+    assert response.status_code == 200
+    timeline = response.json()
+    assert 0 < len(timeline["timestamps"]) <= 10
+    assert len(timeline["goldLead"]) == len(timeline["timestamps"])
+    assert client.get(f"/api/matches/{match_id}/timeline", params={"points": 1}).status_code == 400
+    assert "timelineStore" in client.get("/api/cache/stats").json()
+
+
+def test_leaderboard(client):
+    client.post("/api/compare-players", json={"players": [player(1), player(3)]})
+    response = client.get("/api/leaderboard", params={"window": 5, "limit": 5})
+    assert response.status_code == 200
+    assert response.json()["players"]
+
+    response = client.post("/api/leaderboard", json={"players": [player(1), player(3)], "count": 5})
+    assert response.status_code == 200
+    assert len(response.json()["players"]) == 2
+
+    response = client.get(f"/api/players/{mock_puuid(1)}/stats")
+    assert response.status_code == 200
+    assert client.get("/api/cache/stats").json()["playerStats"]["games"] > 0
+
+
+def test_ingester(client):
+    def ingested():
+        status = client.get("/api/ingest/status").json()
+        return status["processed"] > 0 and status
+
+    status = wait_for(ingested)
+    assert status["failed"] == 0
+    assert status["players"][0]["lastError"] is None
+
+
+def test_stats_and_metrics(client):
+    stats = client.get("/api/cache/stats").json()
+    assert {"matchStore", "match", "rateLimits"} <= stats.keys()
+    assert "cache_hit_ratio" in client.get("/metrics").text
@@ -0,0 +1,38 @@
+import os
+import time
+import numpy as np
+import timeline_store
+from timeline_store import Timeline, TimelineStore, EVENT_DTYPE, SERIES
+
+
+def make_timeline(frames: int = 5) -> Timeline:
+    series = np.arange(len(SERIES) * frames * 10, dtype=np.int32).reshape(len(SERIES), frames, 10)
+    timestamps = np.arange(frames, dtype=np.int32) * 60000
+    return Timeline(timestamps, series, np.array([(60000, 0, 1)], dtype=EVENT_DTYPE))
+
+
+def test_get_reads_arrays_into_memory(tmp_path):
+    store = TimelineStore(str(tmp_path))
+    store.put("LA2_1", make_timeline())
+
+    timeline = store.get("LA2_1")
+    assert not isinstance(timeline.series, np.memmap)
+    assert not isinstance(timeline.timestamps, np.memmap)
+    assert timeline.series.shape == (len(SERIES), 5, 10)
+    assert store.get("LA2_2") is None
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+
+
+def test_eviction_drops_oldest_and_expired(tmp_path, monkeypatch):
+    monkeypatch.setattr(timeline_store, "EVICT_EVERY", 1)
+    store = TimelineStore(str(tmp_path), max_entries=2, max_age_days=1)
+    now = time.time()
+    for i, age in enumerate((3 * 86400, 300, 200, 100)):
+        match_id = f"LA2_{i}"
+        store.put(match_id, make_timeline())
+        os.utime(store._path(match_id, "series"), (now - age, now - age))
+    store.put("LA2_4", make_timeline())
+
+    # LA2_0 is past the age limit; LA2_1 and LA2_2 are the oldest above the cap
+    assert [store.get(f"LA2_{i}") is not None for i in range(5)] == [False, False, False, True, True]
+    assert not os.path.exists(store._path("LA2_0", "frames"))
@@ -0,0 +1,179 @@
+import os
+import time
+import tempfile
+import threading
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+# Timeline store configuration (override via environment)
+TIMELINE_STORE_DIR = os.getenv("TIMELINE_STORE_DIR", "timelines")
+TIMELINE_STORE_MAX_ENTRIES = int(os.getenv("TIMELINE_STORE_MAX_ENTRIES", "20000"))
+TIMELINE_STORE_MAX_AGE_DAYS = float(os.getenv("TIMELINE_STORE_MAX_AGE_DAYS", "90"))
+
+# Run eviction once every N writes rather than on every insert
+EVICT_EVERY = 100
+
+# Per-minute series kept for every participant, in storage order
+SERIES = ("gold", "xp", "cs", "damage")
+
+# Objective events kept from the timeline, as small integer codes
+OBJECTIVES = ("DRAGON", "BARON_NASHOR", "RIFTHERALD", "HORDE", "ATAKHAN", "TOWER", "INHIBITOR")
+OBJECTIVE_CODES = {name: code for code, name in enumerate(OBJECTIVES)}
+
+EVENT_DTYPE = np.dtype([("timestamp", "<i4"), ("objective", "u1"), ("team", "u1")])
+
+
+class Timeline:
+    """One match's timeline in columnar form.
+
+    timestamps holds each frame's time in ms, series has shape
+    (len(SERIES), frames, participants) of int32, and events is a
+    structured array of (timestamp ms, objective code, team index:
+    0 = blue/100, 1 = red/200).
+    """
+
+    __slots__ = ("timestamps", "series", "events")
+
+    def __init__(self, timestamps: np.ndarray, series: np.ndarray, events: np.ndarray):
+        self.timestamps = timestamps
+        self.series = series
+        self.events = events
+
+    @classmethod
+    def from_riot(cls, data: dict) -> "Timeline":
+        """Keep per-minute gold/XP/CS/damage and objective kills from a match-v5 timeline document"""
+        info = data["info"]
+        frames = info["frames"]
+        participants = len(info.get("participants") or frames[0]["participantFrames"])
+        series = np.zeros((len(SERIES), len(frames), participants), dtype=np.int32)
+        events = []
+        for f, frame in enumerate(frames):
+            for key, pf in frame["participantFrames"].items():
+                p = int(key) - 1
+                series[0, f, p] = pf.get("totalGold", 0)
+                series[1, f, p] = pf.get("xp", 0)
+                series[2, f, p] = pf.get("minionsKilled", 0) + pf.get("jungleMinionsKilled", 0)
+                series[3, f, p] = pf.get("damageStats", {}).get("totalDamageDoneToChampions", 0)
+            for event in frame.get("events", ()):
+                if event["type"] == "ELITE_MONSTER_KILL":
+                    objective = event.get("monsterType")
+                    team = event.get("killerTeamId")
+                elif event["type"] == "BUILDING_KILL":
+                    objective = "TOWER" if event.get("buildingType") == "TOWER_BUILDING" else "INHIBITOR"
+                    # teamId is the team that lost the building
+                    team = 300 - event["teamId"] if event.get("teamId") in (100, 200) else None
+                else:
+                    continue
+                if objective in OBJECTIVE_CODES and team in (100, 200):
+                    events.append((event["timestamp"], OBJECTIVE_CODES[objective], 0 if team == 100 else 1))
+        timestamps = np.fromiter((frame["timestamp"] for frame in frames), dtype=np.int32, count=len(frames))
+        return cls(timestamps, series, np.array(events, dtype=EVENT_DTYPE))
+
+    def sample(self, points: int) -> np.ndarray:
+        """Frame indices for at most `points` evenly spread frames (always keeps the first and last)"""
+        frames = len(self.timestamps)
+        if frames <= points:
+            return np.arange(frames)
+        return np.unique(np.linspace(0, frames - 1, points).round().astype(np.int64))
+
+
+class TimelineStore:
+    """Match timelines on disk as NumPy arrays, one set of .npy files per match.
+
+    A timeline document is a megabyte or more of JSON; the arrays kept here take
+    a few KB, so they are read whole and no file stays open. Files are written
+    once (atomically). Timelines older than TIMELINE_STORE_MAX_AGE_DAYS are
+    dropped, and once the store grows past TIMELINE_STORE_MAX_ENTRIES the
+    oldest ones are evicted.
+    """
+
+    def __init__(self, directory: str = TIMELINE_STORE_DIR, max_entries: int = TIMELINE_STORE_MAX_ENTRIES,
+                 max_age_days: float = TIMELINE_STORE_MAX_AGE_DAYS):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.writes_since_evict = 0
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, match_id: str, part: str) -> str:
+        # 100 subdirectories by the match ID's last two digits, so none grows too large
+        return os.path.join(self.directory, match_id[-2:], f"{match_id}.{part}.npy")
+
+    def get(self, match_id: str) -> Optional[Timeline]:
+        """The stored timeline, or None on a miss"""
+        try:
+            series = np.load(self._path(match_id, "series"))
+            timestamps = np.load(self._path(match_id, "frames"))
+            events = np.load(self._path(match_id, "events"))
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return Timeline(timestamps, series, events)
+
+    def put(self, match_id: str, timeline: Timeline):
+        """Store a timeline, evicting old entries periodically"""
+        os.makedirs(os.path.dirname(self._path(match_id, "series")), exist_ok=True)
+        # Events and frames first: the series file is what marks a timeline as stored
+        for part, array in (("events", timeline.events), ("frames", timeline.timestamps), ("series", timeline.series)):
+            path = self._path(match_id, part)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp, path)
+        with self.lock:
+            self.writes_since_evict += 1
+            if self.writes_since_evict >= EVICT_EVERY:
+                self._evict()
+
+    def _stored(self) -> List[Tuple[float, str]]:
+        """(stored at, match ID) of every stored timeline"""
+        stored = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".series.npy"):
+                    try:
+                        stored.append((entry.stat().st_mtime, entry.name[:-len(".series.npy")]))
+                    except FileNotFoundError:
+                        pass
+        return stored
+
+    def _evict(self):
+        """Drop expired timelines, then the oldest ones above the size cap"""
+        self.writes_since_evict = 0
+        stored = sorted(self._stored(), reverse=True)
+        cutoff = time.time() - self.max_age
+        for i, (stored_at, match_id) in enumerate(stored):
+            if i >= self.max_entries or stored_at < cutoff:
+                self._delete(match_id)
+
+    def _delete(self, match_id: str):
+        # The series file first, so a half-deleted timeline reads as a miss
+        for part in ("series", "frames", "events"):
+            try:
+                os.remove(self._path(match_id, part))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups * 100, 1) if lookups > 0 else 0,
+        }
+
+
+def downsample(timeline: Timeline, points: int) -> Dict[str, List]:
+    """Sampled timestamps and every series as plain lists ({series: [per participant: [values]]})"""
+    frames = timeline.sample(points)
+    sampled = timeline.series[:, frames, :]
+    return {
+        "timestamps": timeline.timestamps[frames].tolist(),
+        **{name: sampled[i].T.tolist() for i, name in enumerate(SERIES)},
+    }
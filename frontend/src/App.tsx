@@ -4,6 +4,7 @@ import './App.css';
 import MatchDashboard from './components/MatchDashboard';
 import Last5Matches from './components/Last5Matches';
 import PlayerComparison from './components/PlayerComparison';
+import { streamNdjson } from './streamNdjson';
 
 interface Player {
   game_name: string;
@@ -23,6 +24,8 @@ function App() {
   const [comparisonData, setComparisonData] = useState<any>(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string>('');
+  // Players or games a stream reported as failed, shown above the partial results
+  const [warnings, setWarnings] = useState<string[]>([]);
   const [apiKey, setApiKey] = useState('');
 
   const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
@@ -36,6 +39,7 @@ function App() {
   const fetchMatchStats = async () => {
     setLoading(true);
     setError('');
+    setWarnings([]);
     setMatchData(null);
     setLast5MatchesData(null);
     setComparisonData(null);
@@ -66,6 +70,7 @@ function App() {
   const fetchLast5Matches = async () => {
     setLoading(true);
     setError('');
+    setWarnings([]);
     setMatchData(null);
     setLast5MatchesData(null);
     setComparisonData(null);
@@ -85,13 +90,28 @@ function App() {
         return;
       }
 
-      const response = await axios.post(`${API_URL}/api/last-5-matches`, {
+      // Render the player and each match as soon as the backend streams them
+      const matchSlots: any[] = [];
+      const failures: string[] = [];
+      await streamNdjson(`${API_URL}/api/last-5-matches/stream`, {
         players: filledPlayers
-      }, {
-        headers: apiKey ? { 'X-API-Key': apiKey } : {}
+      }, apiKey ? { 'X-API-Key': apiKey } : {}, (record) => {
+        if (record.type === 'player') {
+          setLast5MatchesData({ player: record.player, matches: [], averages: null, totalGames: 0 });
+        } else if (record.type === 'match') {
+          const match = { ...record };
+          delete match.type;
+          delete match.index;
+          matchSlots[record.index] = match;
+          const matches = matchSlots.filter(Boolean);
+          setLast5MatchesData((prev: any) => prev && { ...prev, matches });
+        } else if (record.type === 'summary') {
+          setLast5MatchesData((prev: any) => prev && { ...prev, averages: record.averages, totalGames: record.totalGames });
+        } else if (record.type === 'error') {
+          failures.push(record.matchId ? `Match ${record.matchId} could not be loaded: ${record.detail}` : record.detail);
+          setWarnings([...failures]);
+        }
       });
-
-      setLast5MatchesData(response.data);
     } catch (err: any) {
       setError(err.response?.data?.detail || err.message || 'Failed to fetch last 5 matches data');
     } finally {
@@ -102,6 +122,7 @@ function App() {
   const fetchComparePlayers = async () => {
     setLoading(true);
     setError('');
+    setWarnings([]);
     setMatchData(null);
     setLast5MatchesData(null);
     setComparisonData(null);
@@ -121,13 +142,39 @@ function App() {
         return;
       }
 
-      const response = await axios.post(`${API_URL}/api/compare-players`, {
+      // Add each player to the comparison as soon as the backend streams them
+      const playerSlots: any[] = [];
+      const failures: string[] = [];
+      await streamNdjson(`${API_URL}/api/compare-players/stream`, {
         players: filledPlayers
-      }, {
-        headers: apiKey ? { 'X-API-Key': apiKey } : {}
+      }, apiKey ? { 'X-API-Key': apiKey } : {}, (record) => {
+        if (record.type === 'player') {
+          if (record.failedMatches) {
+            failures.push(`${record.player.gameName}#${record.player.tagLine}: ${record.failedMatches.length} game(s) could not be loaded`);
+            setWarnings([...failures]);
+          }
+          const playerStats = { ...record };
+          delete playerStats.type;
+          delete playerStats.index;
+          playerSlots[record.index] = playerStats;
+          const sorted = playerSlots
+            .filter(Boolean)
+            .sort((a, b) => b.averages.mvpScore - a.averages.mvpScore);
+          setComparisonData({ players: sorted, comparedPlayers: sorted.length });
+        } else if (record.type === 'summary') {
+          const ranked = record.rankings.map((r: any) => playerSlots[r.index]);
+          // Nobody to compare: show why on the input form instead of an empty comparison
+          if (ranked.length === 0 && failures.length > 0) {
+            setError(failures.join(' • '));
+            setComparisonData(null);
+          } else {
+            setComparisonData({ players: ranked, comparedPlayers: record.comparedPlayers });
+          }
+        } else if (record.type === 'error') {
+          failures.push(record.gameName ? `${record.gameName}#${record.tagLine}: ${record.detail}` : record.detail);
+          setWarnings([...failures]);
+        }
       });
-
-      setComparisonData(response.data);
     } catch (err: any) {
       setError(err.response?.data?.detail || err.message || 'Failed to fetch comparison data');
     } finally {
@@ -253,6 +300,9 @@ function App() {
             <button onClick={() => setLast5MatchesData(null)} className="back-button">
               ← Enter New Player
             </button>
+            {warnings.length > 0 && (
+              <div className="error-message">⚠️ {warnings.join(' • ')}</div>
+            )}
             <Last5Matches data={last5MatchesData} />
           </div>
         )}
@@ -262,6 +312,9 @@ function App() {
             <button onClick={() => setComparisonData(null)} className="back-button">
               ← Enter New Players
             </button>
+            {warnings.length > 0 && (
+              <div className="error-message">⚠️ {warnings.join(' • ')}</div>
+            )}
             <PlayerComparison data={comparisonData} />
           </div>
         )}
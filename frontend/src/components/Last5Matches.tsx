@@ -53,7 +53,7 @@ interface Last5MatchesData {
     };
   };
   matches: Match[];
-  averages: Averages;
+  averages: Averages | null; // null until the streamed summary arrives
   totalGames: number;
 }
 
@@ -108,6 +108,13 @@ const Last5Matches: React.FC<Props> = ({ data }) => {
         )}
       </div>
 
+      {!data.averages && (
+        <div className="averages-section">
+          <h3>📊 Loading matches... ({data.matches.length} so far)</h3>
+        </div>
+      )}
+
+      {data.averages && (
       <div className="averages-section">
         <h3>📊 Last {data.totalGames} Games - Average Performance</h3>
         <div className="averages-grid">
@@ -144,6 +151,7 @@ const Last5Matches: React.FC<Props> = ({ data }) => {
           </div>
         </div>
       </div>
+      )}
 
       <div className="matches-list">
         <h3>🎮 Match History</h3>
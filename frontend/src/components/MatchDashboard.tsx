@@ -1,4 +1,5 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import axios from 'axios';
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, LineChart, Line } from 'recharts';
 import './MatchDashboard.css';
 
@@ -38,11 +39,31 @@ interface MatchData {
   players: PlayerStats[];
 }
 
+interface TimelineData {
+  timestamps: number[];
+  goldLead: number[];
+  objectives: { timestamp: number; type: string; teamId: number }[];
+}
+
 interface Props {
   data: MatchData;
 }
 
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
 const MatchDashboard: React.FC<Props> = ({ data }) => {
+  const [timeline, setTimeline] = useState<TimelineData | null>(null);
+
+  useEffect(() => {
+    // Timelines are optional extras - the dashboard works without one
+    let cancelled = false;
+    setTimeline(null);
+    axios.get(`${API_URL}/api/matches/${data.matchId}/timeline`, { params: { points: 40 } })
+      .then((response) => { if (!cancelled) setTimeline(response.data); })
+      .catch(() => {});
+    return () => { cancelled = true; };
+  }, [data.matchId]);
+
   const getRankingEmoji = (ranking: number) => {
     switch (ranking) {
       case 1: return '👑';
@@ -117,6 +138,13 @@ const MatchDashboard: React.FC<Props> = ({ data }) => {
     }
   ];
 
+  const goldLeadData = timeline
+    ? timeline.timestamps.map((timestamp, idx) => ({
+        minute: Math.round(timestamp / 60000),
+        'Team 1 Gold Lead': timeline.goldLead[idx]
+      }))
+    : [];
+
   return (
     <div className="dashboard">
       <div className="match-header">
@@ -443,6 +471,22 @@ const MatchDashboard: React.FC<Props> = ({ data }) => {
             </BarChart>
           </ResponsiveContainer>
         </div>
+
+        {timeline && (
+          <div className="chart-container">
+            <h3>📈 Gold Lead Over Time</h3>
+            <ResponsiveContainer width="100%" height={300}>
+              <LineChart data={goldLeadData}>
+                <CartesianGrid strokeDasharray="3 3" />
+                <XAxis dataKey="minute" unit="m" />
+                <YAxis />
+                <Tooltip />
+                <Legend />
+                <Line type="monotone" dataKey="Team 1 Gold Lead" stroke="#ffd93d" dot={false} />
+              </LineChart>
+            </ResponsiveContainer>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -0,0 +1,35 @@
+// POST to a streaming (NDJSON) endpoint and hand each record to onRecord as it arrives
+export async function streamNdjson(
+  url: string,
+  body: unknown,
+  headers: Record<string, string>,
+  onRecord: (record: any) => void
+) {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', ...headers },
+    body: JSON.stringify(body)
+  });
+
+  if (!response.ok || !response.body) {
+    const data = await response.json().catch(() => ({}));
+    throw new Error(data.detail || `Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() || '';
+    lines.filter(line => line.trim()).forEach(line => onRecord(JSON.parse(line)));
+  }
+
+  if (buffer.trim()) {
+    onRecord(JSON.parse(buffer));
+  }
+}